@@ -1,15 +1,22 @@
 import asyncio
+import json
 import logging
+import os
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # --- Corrected Imports with 'tractionbuild' package name ---
 # Fixed with relative imports
 from ..main import tractionbuildOrchestrator
+from ..core.context_bus import ContextBus
 from ..core.schemas import ProjectCreate, ProjectStatus
+from ..core.executor_errors import Overloaded
+from ..security.audit_sink import close_audit_sink
+from ..database.checkpoint_store import SQLiteCheckpointStore
 from .events import bus
 
 # --- App Initialization ---
@@ -23,6 +30,23 @@ app = FastAPI(
 )
 
 projects: Dict[str, Dict[str, Any]] = {}
+# Same database the orchestrator checkpoints into
+checkpoint_store = SQLiteCheckpointStore(os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.db"))
+# One orchestrator per process so every workflow is admitted against the same executor queue;
+# each project gets its own ContextBus
+orchestrator: Optional[tractionbuildOrchestrator] = None
+
+@app.on_event("startup")
+async def open_process_resources():
+    global orchestrator
+    orchestrator = await tractionbuildOrchestrator().__aenter__()
+
+@app.on_event("shutdown")
+async def close_process_resources():
+    """Stop the shared orchestrator, then write and close the process-wide audit sink."""
+    if orchestrator is not None:
+        await orchestrator.__aexit__(None, None, None)
+    await asyncio.to_thread(close_audit_sink)
 
 # --- Middleware ---
 app.add_middleware(
@@ -33,23 +57,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Error Handlers ---
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """A full executor queue at submission surfaces as 429 so clients back off and retry."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.message, "state": exc.state, "policy": exc.policy},
+        headers={"Retry-After": str(max(1, int(exc.retry_after)))},
+    )
+
 # --- Background Workflow Runner ---
-async def workflow_runner(project_id: str, project_data: ProjectCreate):
+async def forward_context_deltas(project_id: str, subscription):
+    """Stream ContextBus deltas to the project's WebSocket listeners as they are published."""
+    async for delta in subscription:
+        await bus.emit(project_id, {
+            "type": "context_delta",
+            "key": delta.key,
+            "old_version": delta.old_version,
+            "new_version": delta.new_version,
+            "value": json.loads(json.dumps(delta.value, default=str)),
+            "deleted": delta.deleted,
+        })
+    if subscription.dropped:
+        logger.warning(f"Dropped {subscription.dropped} context deltas for slow listeners of project {project_id}")
+
+async def _drive_workflow(project_id: str, context_bus: ContextBus, run) -> None:
+    """Await ``run`` (an orchestrator coroutine) while streaming the project's context deltas, then publish the final state."""
+    subscription = context_bus.subscribe()
+    forwarder = asyncio.create_task(forward_context_deltas(project_id, subscription))
+    try:
+        final_project_context = await run
+    finally:
+        subscription.close()
+        await forwarder
+    projects[project_id] = final_project_context
+    await bus.emit(project_id, {"type": "status_update", "state": final_project_context.get('state', 'COMPLETED')})
+
+async def workflow_runner(project_id: str, initial_project_context: Dict[str, Any]):
     logger.info(f"Starting workflow for project_id: {project_id}")
     try:
-        async with tractionbuildOrchestrator() as orchestrator:
-            initial_project_context = await orchestrator.create_project(
-                idea=project_data.description,
-                workflow_name=project_data.workflow
-            )
-            initial_project_context['id'] = project_id
-            projects[project_id] = initial_project_context
-
-            final_project_context = await orchestrator.execute_workflow(initial_project_context)
-            projects[project_id] = final_project_context
-            
-            await bus.emit(project_id, {"type": "status_update", "state": final_project_context.get('state', 'COMPLETED')})
+        context_bus = orchestrator.new_context_bus()
+        await _drive_workflow(project_id, context_bus,
+                              orchestrator.execute_workflow(initial_project_context, context_bus))
 
+    except Overloaded as e:
+        # Admitted at submission but rejected mid-run: the project has failed, polling will not change that
+        logger.warning(f"Workflow for project {project_id} rejected by executor: {e}")
+        projects[project_id] = {"id": project_id, "state": ProjectStatus.ERROR.value, "error": str(e)}
+        await bus.emit(project_id, {"type": "error", "message": str(e)})
     except Exception as e:
         logger.error(f"Workflow for project {project_id} failed: {e}", exc_info=True)
         error_state = {
@@ -60,14 +116,46 @@ async def workflow_runner(project_id: str, project_data: ProjectCreate):
         projects[project_id] = error_state
         await bus.emit(project_id, {"type": "error", "message": str(e)})
 
+async def resume_runner(project_id: str):
+    logger.info(f"Resuming workflow for project_id: {project_id}")
+    try:
+        context_bus = orchestrator.new_context_bus()
+        await _drive_workflow(project_id, context_bus, orchestrator.resume_workflow(project_id, context_bus))
+    except Exception as e:
+        logger.error(f"Resuming project {project_id} failed: {e}", exc_info=True)
+        projects[project_id] = {"id": project_id, "state": ProjectStatus.ERROR.value, "error": str(e)}
+        await bus.emit(project_id, {"type": "error", "message": str(e)})
+
 # --- API Endpoints (No changes needed here) ---
 @app.post("/api/v1/projects", status_code=202)
 async def create_project(project_data: ProjectCreate, background_tasks: BackgroundTasks):
     project_id = str(uuid.uuid4())
-    projects[project_id] = { "id": project_id, "name": project_data.name, "state": ProjectStatus.IDEA_VALIDATION.value }
-    background_tasks.add_task(workflow_runner, project_id, project_data)
+    try:
+        initial_project_context = await orchestrator.create_project(
+            idea=project_data.description,
+            workflow_name=project_data.workflow
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    initial_project_context['id'] = project_id
+    initial_project_context['name'] = project_data.name
+    # Raises Overloaded (429 via overloaded_handler) before anything is queued
+    orchestrator.check_admission(initial_project_context)
+    projects[project_id] = initial_project_context
+    background_tasks.add_task(workflow_runner, project_id, initial_project_context)
     return {"project_id": project_id, "status_url": f"/api/v1/projects/{project_id}/status"}
 
+@app.post("/api/v1/projects/{project_id}/resume", status_code=202)
+async def resume_project(project_id: str, background_tasks: BackgroundTasks):
+    """Continue a project from its last checkpoint, e.g. after the worker running it crashed."""
+    checkpoint = await checkpoint_store.load(project_id)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="No checkpoint found for project")
+    projects[project_id] = {"id": project_id, "state": checkpoint.get("state", "UNKNOWN")}
+    background_tasks.add_task(resume_runner, project_id)
+    return {"project_id": project_id, "resumed_from": checkpoint.get("state"),
+            "status_url": f"/api/v1/projects/{project_id}/status"}
+
 @app.get("/api/v1/projects/{project_id}/status")
 async def get_project_status(project_id: str):
     # ... (rest of the file is the same)
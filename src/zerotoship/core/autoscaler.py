@@ -0,0 +1,133 @@
+"""
+Autoscaler - Grows and shrinks the DistributedExecutor worker pool.
+Driven by the ``scaling_thresholds`` section of config/adaptive_config.yaml.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScalingDecision:
+    """One autoscaler evaluation; ``direction`` is "up", "down" or "hold"."""
+    direction: str
+    workers: int
+    reason: str
+    queue_depth: int
+    in_flight: int
+    latency_p95: float
+    timestamp: float
+
+
+class Autoscaler:
+    """Hysteresis-based autoscaler for a DistributedExecutor.
+
+    * Scale up by ``step`` as soon as the backlog exceeds ``up`` queued tasks per worker, or
+      when tasks are queued and p95 latency is above ``latency_target_seconds``.
+    * Scale down by ``step`` only after the pool has been under-used (nothing queued and at
+      least ``step`` workers idle) for ``down`` consecutive seconds.
+    * No further change is made within ``cooldown_seconds`` of the previous one.
+    """
+
+    def __init__(self, executor: Any, scaling_thresholds: Optional[Dict[str, Any]] = None,
+                 interval_seconds: float = 1.0, metrics: Optional[Dict[str, Any]] = None):
+        """Initialize the autoscaler.
+
+        Args:
+            executor: The DistributedExecutor to resize.
+            scaling_thresholds: ``up`` (queued tasks per worker), ``down`` (seconds of under-use
+                before shrinking), and optional ``min_workers``, ``max_workers``, ``step``,
+                ``cooldown_seconds`` and ``latency_target_seconds``.
+            interval_seconds: How often the background loop evaluates.
+            metrics: Optional Prometheus metrics (executor_workers, executor_scaling_decisions_total).
+        """
+        thresholds = scaling_thresholds or {}
+        self.executor = executor
+        self.up_threshold = float(thresholds.get("up", 2.0))
+        self.down_after_seconds = float(thresholds.get("down", 10.0))
+        self.min_workers = int(thresholds.get("min_workers", 1))
+        self.max_workers = int(thresholds.get("max_workers", max(executor.max_workers, self.min_workers)))
+        self.step = int(thresholds.get("step", 1))
+        self.cooldown_seconds = float(thresholds.get("cooldown_seconds", 2 * interval_seconds))
+        self.latency_target = thresholds.get("latency_target_seconds")
+        self.interval_seconds = interval_seconds
+        self.metrics = metrics or {}
+        self.decisions: Deque[ScalingDecision] = deque(maxlen=100)  # Recent scale-ups/downs
+        self._underused_since: Optional[float] = None
+        self._last_change = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+
+    def _decide(self, now: float, workers: int, queue_depth: int, in_flight: int, p95: float):
+        if now - self._last_change < self.cooldown_seconds:
+            return "hold", workers, "cooldown"
+
+        if workers < self.max_workers:
+            if queue_depth > self.up_threshold * workers:
+                return "up", min(self.max_workers, workers + self.step), "queue_depth"
+            if self.latency_target is not None and queue_depth and p95 > float(self.latency_target):
+                return "up", min(self.max_workers, workers + self.step), "latency_p95"
+
+        underused = queue_depth == 0 and workers - in_flight >= self.step
+        if not underused:
+            self._underused_since = None
+            return "hold", workers, "busy"
+        if self._underused_since is None:
+            self._underused_since = now
+        if workers > self.min_workers and now - self._underused_since >= self.down_after_seconds:
+            return "down", max(self.min_workers, workers - self.step), "idle"
+        return "hold", workers, "idle"
+
+    async def evaluate(self, now: Optional[float] = None) -> ScalingDecision:
+        """Take one scaling decision and apply it to the executor."""
+        now = time.monotonic() if now is None else now
+        workers = self.executor.max_workers
+        queue_depth = self.executor.queue_depth()
+        in_flight = self.executor.in_flight
+        p95 = self.executor.latency_p95()
+
+        direction, target, reason = self._decide(now, workers, queue_depth, in_flight, p95)
+        # Keep the pool inside the configured bounds even when no scaling signal fired
+        if direction == "hold" and not self.min_workers <= workers <= self.max_workers:
+            target = min(self.max_workers, max(self.min_workers, workers))
+            direction, reason = ("up" if target > workers else "down"), "bounds"
+
+        if direction != "hold":
+            await self.executor.resize(target)
+            self._last_change = now
+            self._underused_since = None
+            logger.info(f"Autoscaler scaled {direction} to {target} workers ({reason}; queue={queue_depth}, "
+                        f"in_flight={in_flight}, p95={p95:.2f}s)")
+            if "executor_scaling_decisions_total" in self.metrics:
+                self.metrics["executor_scaling_decisions_total"].labels(direction=direction, reason=reason).inc()
+        if "executor_workers" in self.metrics:
+            self.metrics["executor_workers"].set(target)
+
+        decision = ScalingDecision(direction, target, reason, queue_depth, in_flight, p95, now)
+        if direction != "hold":
+            self.decisions.append(decision)
+        return decision
+
+    async def _run(self):
+        while True:
+            try:
+                await self.evaluate()
+            except Exception as e:
+                logger.warning(f"Autoscaler evaluation failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Autoscaler started ({self.min_workers}-{self.max_workers} workers).")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,182 @@
+"""
+Content-addressed blob store for large context values.
+Values whose encoded size exceeds a threshold are written once (compressed, keyed by
+their SHA-256) and replaced by a small reference that is resolved lazily on access.
+Values are encoded with the shared codec, so a blob comes back with the types it went in with.
+"""
+
+import os
+import zlib
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+from .codec import Codec
+
+logger = logging.getLogger(__name__)
+
+BLOB_MARKER = "__blob__"
+_CODEC_PREFIX = {"zstd": b"Z", "zlib": b"D", "none": b"N"}
+_PREFIX_CODEC = {prefix: codec for codec, prefix in _CODEC_PREFIX.items()}
+
+
+class BlobRef(dict):
+    """Reference to a stored blob.
+
+    A plain dict (``{"__blob__": digest, "size": n}``) so it survives JSON snapshots,
+    checkpoints and task payloads unchanged; ``BlobStore.resolve`` turns it back into the value.
+    """
+
+    def __init__(self, digest: str, size: int):
+        super().__init__({BLOB_MARKER: digest, "size": size})
+
+    @property
+    def digest(self) -> str:
+        return self[BLOB_MARKER]
+
+    @property
+    def size(self) -> int:
+        return self["size"]
+
+    @staticmethod
+    def is_ref(value: Any) -> bool:
+        return isinstance(value, dict) and BLOB_MARKER in value and len(value) == 2 and "size" in value
+
+
+class BlobStore:
+    """Filesystem blob store with a size threshold.
+
+    Recently read blobs are cached decompressed; every ``get`` decodes a fresh copy so
+    callers may mutate what they receive.
+    """
+
+    def __init__(self, root: str = "data/blobs", threshold_bytes: int = 64 * 1024,
+                 codec: Optional[str] = None, cache_entries: int = 64):
+        """Initialize the store.
+
+        Args:
+            root: Directory holding the blobs (sharded by the first two digest characters).
+            threshold_bytes: Encoded size above which a value is offloaded.
+            codec: "zstd", "zlib" or "none"; defaults to zstd when installed, else zlib.
+            cache_entries: Number of decompressed blobs kept in memory.
+        """
+        self.root = root
+        self.threshold_bytes = threshold_bytes
+        self.codec = codec or ("zstd" if ZSTD_AVAILABLE else "zlib")
+        if self.codec == "zstd" and not ZSTD_AVAILABLE:
+            raise ValueError("zstd codec requested but the 'zstandard' package is not installed")
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        # The store compresses whole blobs itself; strict, so untagged types stay inline
+        self._value_codec = Codec(compression="none", strict=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return _CODEC_PREFIX["zstd"] + zstandard.ZstdCompressor().compress(data)
+        if self.codec == "zlib":
+            return _CODEC_PREFIX["zlib"] + zlib.compress(data)
+        return _CODEC_PREFIX["none"] + data
+
+    @staticmethod
+    def _decompress(blob: bytes) -> bytes:
+        codec, payload = _PREFIX_CODEC.get(blob[:1]), blob[1:]
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Blob is zstd-compressed but the 'zstandard' package is not installed")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        if codec == "zlib":
+            return zlib.decompress(payload)
+        if codec == "none":
+            return payload
+        raise ValueError("Unknown blob codec")
+
+    def _encode(self, value: Any) -> bytes:
+        return self._value_codec.encode(value, schema="blob")
+
+    def _remember(self, digest: str, data: bytes):
+        self._cache[digest] = data
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    def put(self, value: Any) -> BlobRef:
+        """Store ``value`` unconditionally and return its reference.
+
+        Raises:
+            TypeError: If ``value`` holds a type the codec cannot round-trip.
+        """
+        return self._put_encoded(self._encode(value))
+
+    def _put_encoded(self, data: bytes) -> BlobRef:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):  # Content-addressed: identical values are stored once
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            with open(tmp_path, "wb") as f:
+                f.write(self._compress(data))
+            os.replace(tmp_path, path)
+        return BlobRef(digest, len(data))
+
+    def offload(self, value: Any) -> Any:
+        """Return a BlobRef for values above the threshold, or the value itself.
+
+        Values the codec cannot round-trip (arbitrary objects) are never offloaded.
+        """
+        if value is None or isinstance(value, (bool, int, float)) or BlobRef.is_ref(value):
+            return value
+        if isinstance(value, str) and len(value) * 6 <= self.threshold_bytes:
+            return value  # Even fully \u-escaped, this string cannot exceed the threshold
+        try:
+            data = self._encode(value)
+        except (TypeError, ValueError):
+            return value
+        if len(data) <= self.threshold_bytes:
+            return value
+        return self._put_encoded(data)
+
+    def offload_fields(self, data: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Return a shallow copy of ``data`` with large top-level values (or just ``fields``) offloaded."""
+        keys = data.keys() if fields is None else [f for f in fields if f in data]
+        offloaded = dict(data)
+        for key in keys:
+            offloaded[key] = self.offload(data[key])
+        return offloaded
+
+    def get(self, digest: str) -> Any:
+        """Load the value stored under ``digest``."""
+        data = self._cache.get(digest)
+        if data is None:
+            with open(self._path(digest), "rb") as f:
+                data = self._decompress(f.read())
+            self._remember(digest, data)
+        else:
+            self._cache.move_to_end(digest)
+        # Blobs written before the codec are plain JSON, which the codec still reads
+        return self._value_codec.decode(data, schema="blob")
+
+    def resolve(self, value: Any) -> Any:
+        """Return the stored value if ``value`` is a reference, else ``value`` unchanged."""
+        if BlobRef.is_ref(value):
+            return self.get(value[BLOB_MARKER])
+        return value
+
+    def resolve_all(self, value: Any) -> Any:
+        """Recursively resolve every reference inside dicts and lists, e.g. before a human-facing export."""
+        value = self.resolve(value)
+        if isinstance(value, dict):
+            return {key: self.resolve_all(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve_all(item) for item in value]
+        return value
@@ -0,0 +1,331 @@
+"""
+Binary codec for everything tractionbuild writes to disk or sends between processes.
+Payloads are wrapped in a schema-versioned envelope and packed with msgpack (or a compact
+stdlib JSON fallback), and compressed with zstd (zlib when zstandard is missing). datetime, date, set, bytes and Enum values
+survive the round trip through type tags. Set CODEC_FORMAT=json for readable payloads while
+debugging; plain JSON written before this codec existed is still decoded.
+"""
+
+import os
+import sys
+import json
+import zlib
+import base64
+import logging
+import threading
+from datetime import date, datetime
+from functools import partial
+from enum import Enum
+from typing import Dict, Any, NamedTuple, Optional, Union
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TB"
+ENVELOPE_VERSION = 1
+FORMATS = ("msgpack", "compact", "json")
+COMPRESSIONS = ("none", "zlib", "zstd")
+_HEADER_SIZE = len(MAGIC) + 3
+_TAG = "__t__"
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_SET = 3
+_EXT_ENUM = 4
+
+
+class CodecError(ValueError):
+    """A payload could not be decoded (corrupt, unsupported format, or wrong schema)."""
+
+
+class Envelope(NamedTuple):
+    """A decoded payload. ``version`` is 0 for plain JSON written before the codec."""
+    schema: str
+    version: int
+    data: Any
+
+
+def _enum_parts(value: Enum) -> list:
+    cls = type(value)
+    return [cls.__module__, cls.__qualname__, value.value]
+
+
+def _resolve_enum(module: str, qualname: str, value: Any) -> Any:
+    """Rebuild an Enum member from an already-imported module; payloads never trigger imports."""
+    target = sys.modules.get(module)
+    for name in qualname.split("."):
+        target = getattr(target, name, None)
+    if isinstance(target, type) and issubclass(target, Enum):
+        try:
+            return target(value)
+        except ValueError:
+            pass
+    return value
+
+
+# Tagged JSON ("compact" and "json" formats)
+
+def _unrepresentable(obj: Any, strict: bool) -> str:
+    """Values with no type tag become their ``str()``, or raise TypeError in strict mode."""
+    if strict:
+        raise TypeError(f"Cannot encode {type(obj).__name__} values")
+    return str(obj)
+
+
+def _tag(obj: Any, strict: bool = False) -> Any:
+    """Convert to plain JSON types, tagging values JSON cannot represent."""
+    if isinstance(obj, Enum):
+        return {_TAG: "enum", "v": _enum_parts(obj)[:2] + [_tag(obj.value, strict)]}
+    if obj is None or type(obj) in (str, int, float, bool):
+        return obj
+    if isinstance(obj, dict):
+        if all(type(key) is str for key in obj) and _TAG not in obj:
+            return {key: _tag(value, strict) for key, value in obj.items()}
+        return {_TAG: "map", "v": [[_tag(key, strict), _tag(value, strict)] for key, value in obj.items()]}
+    if isinstance(obj, (list, tuple)):
+        return [_tag(item, strict) for item in obj]
+    if isinstance(obj, datetime):
+        return {_TAG: "datetime", "v": obj.isoformat()}
+    if isinstance(obj, date):
+        return {_TAG: "date", "v": obj.isoformat()}
+    if isinstance(obj, (set, frozenset)):
+        return {_TAG: "set", "v": [_tag(item, strict) for item in obj]}
+    if isinstance(obj, (bytes, bytearray)):
+        return {_TAG: "bytes", "v": base64.b64encode(obj).decode()}
+    if isinstance(obj, (str, int, float)):
+        return obj
+    return _unrepresentable(obj, strict)
+
+
+def _untag_object(obj: Dict[str, Any]) -> Any:
+    """``object_hook`` for tagged JSON: children are already decoded."""
+    tag = obj.get(_TAG)
+    if tag is None or len(obj) != 2 or "v" not in obj:
+        return obj
+    value = obj["v"]
+    if tag == "datetime":
+        return datetime.fromisoformat(value)
+    if tag == "date":
+        return date.fromisoformat(value)
+    if tag == "set":
+        return set(value)
+    if tag == "bytes":
+        return base64.b64decode(value)
+    if tag == "enum":
+        return _resolve_enum(*value)
+    if tag == "map":
+        return {_hashable(key): item for key, item in value}
+    return obj
+
+
+def _hashable(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+# msgpack
+
+def _ext_default(obj: Any, strict: bool = False) -> Any:
+    if isinstance(obj, Enum):
+        return msgpack.ExtType(_EXT_ENUM, _packb(_enum_parts(obj), strict))
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, (set, frozenset)):
+        return msgpack.ExtType(_EXT_SET, _packb(list(obj), strict))
+    # strict_types routes subclasses here: a str-based Enum is handled above, the rest are plain values
+    for base in (str, bytes, int, float, dict, list, tuple):
+        if isinstance(obj, base):
+            return list(obj) if base is tuple else base(obj)
+    return _unrepresentable(obj, strict)
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_SET:
+        return set(_unpackb(data))
+    if code == _EXT_ENUM:
+        return _resolve_enum(*_unpackb(data))
+    return msgpack.ExtType(code, data)
+
+
+def _packb(obj: Any, strict: bool = False) -> bytes:
+    default = partial(_ext_default, strict=True) if strict else _ext_default
+    return msgpack.packb(obj, default=default, strict_types=True, use_bin_type=True)
+
+
+def _unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False, use_list=True)
+
+
+class Codec:
+    """Encode and decode schema-versioned payloads.
+
+    Binary payloads start with a 5-byte header: ``b"TB"``, the envelope version, the
+    format and the compression, followed by ``[schema, version, data]`` in that format.
+    The "json" format writes a readable envelope object with no header instead.
+    """
+
+    def __init__(self, format: Optional[str] = None, compression: Optional[str] = None,
+                 compress_threshold: int = 1024, strict: bool = False):
+        """Initialize the codec.
+
+        Args:
+            format: "msgpack" (default when installed), "compact" (tagged stdlib JSON) or
+                "json" (indented, uncompressed; for debugging).
+            compression: "zstd" (default when installed), "zlib" (default otherwise) or "none".
+            compress_threshold: Bodies smaller than this many bytes are stored uncompressed.
+            strict: Raise TypeError for values with no type tag instead of storing their ``str()``.
+        """
+        format = format or ("msgpack" if MSGPACK_AVAILABLE else "compact")
+        compression = compression or ("zstd" if ZSTD_AVAILABLE else "zlib")
+        if format not in FORMATS:
+            raise ValueError(f"Unknown codec format '{format}'. Expected one of {FORMATS}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown codec compression '{compression}'. Expected one of {COMPRESSIONS}")
+        if format == "msgpack" and not MSGPACK_AVAILABLE:
+            logger.warning("msgpack not available - falling back to the compact JSON format")
+            format = "compact"
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not available - falling back to zlib compression")
+            compression = "zlib"
+        self.format = format
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.strict = strict
+
+    # Encoding
+
+    def encode(self, data: Any, schema: str = "", version: int = 1) -> bytes:
+        """Pack ``data`` into an envelope tagged with its schema name and version."""
+        if self.format == "json":
+            envelope = {"__codec__": ENVELOPE_VERSION, "schema": schema, "version": version, "data": _tag(data, self.strict)}
+            return json.dumps(envelope, indent=2, ensure_ascii=False).encode()
+
+        if self.format == "msgpack":
+            body = _packb([schema, version, data], self.strict)
+        else:
+            body = json.dumps([schema, version, _tag(data, self.strict)], separators=(",", ":"), ensure_ascii=False).encode()
+
+        compression = self.compression if len(body) >= self.compress_threshold else "none"
+        if compression == "zstd":
+            body = zstandard.ZstdCompressor().compress(body)
+        elif compression == "zlib":
+            body = zlib.compress(body)
+        header = MAGIC + bytes([ENVELOPE_VERSION, FORMATS.index(self.format), COMPRESSIONS.index(compression)])
+        return header + body
+
+    # Decoding
+
+    def decode_envelope(self, blob: Union[bytes, str]) -> Envelope:
+        """Unpack any payload this codec (or plain ``json.dump``) wrote, whatever the current settings."""
+        if isinstance(blob, str):
+            blob = blob.encode()
+        if not blob.startswith(MAGIC):
+            return self._decode_json(blob)
+        if len(blob) < _HEADER_SIZE or blob[2] != ENVELOPE_VERSION:
+            raise CodecError(f"Unsupported envelope version {blob[2] if len(blob) > 2 else None}")
+        try:
+            format, compression = FORMATS[blob[3]], COMPRESSIONS[blob[4]]
+        except IndexError:
+            raise CodecError(f"Unknown format or compression id in header {blob[:_HEADER_SIZE]!r}")
+
+        body = blob[_HEADER_SIZE:]
+        try:
+            if compression == "zstd":
+                if not ZSTD_AVAILABLE:
+                    raise CodecError("Payload is zstd-compressed but zstandard is not installed")
+                body = zstandard.ZstdDecompressor().decompress(body)
+            elif compression == "zlib":
+                body = zlib.decompress(body)
+
+            if format == "msgpack":
+                if not MSGPACK_AVAILABLE:
+                    raise CodecError("Payload is msgpack-encoded but msgpack is not installed")
+                schema, version, data = _unpackb(body)
+            else:
+                schema, version, data = json.loads(body, object_hook=_untag_object)
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Corrupt {format} payload: {e}") from e
+        return Envelope(schema, version, data)
+
+    @staticmethod
+    def _decode_json(blob: bytes) -> Envelope:
+        try:
+            data = json.loads(blob)
+        except ValueError as e:
+            raise CodecError(f"Payload is neither a codec envelope nor JSON: {e}") from e
+        if isinstance(data, dict) and data.get("__codec__") == ENVELOPE_VERSION:
+            return Envelope(data["schema"], data["version"], _untag(data["data"]))
+        return Envelope("", 0, data)
+
+    def decode(self, blob: Union[bytes, str], schema: Optional[str] = None) -> Any:
+        """Unpack a payload and return its data, checking the schema name when given.
+
+        Legacy plain JSON carries no schema name and is accepted for any schema.
+        """
+        envelope = self.decode_envelope(blob)
+        if schema is not None and envelope.version and envelope.schema != schema:
+            raise CodecError(f"Expected a '{schema}' payload, got '{envelope.schema}'")
+        return envelope.data
+
+    # Files
+
+    def dump(self, data: Any, path: str, schema: str = "", version: int = 1):
+        """Atomically write an encoded payload to ``path``."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.encode(data, schema, version))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str, schema: Optional[str] = None) -> Any:
+        with open(path, "rb") as f:
+            return self.decode(f.read(), schema)
+
+
+def _untag(obj: Any) -> Any:
+    """Decode tags in an already-parsed JSON value (the debug envelope's data)."""
+    if isinstance(obj, list):
+        return [_untag(item) for item in obj]
+    if isinstance(obj, dict):
+        return _untag_object({key: _untag(value) for key, value in obj.items()})
+    return obj
+
+
+_codec: Optional[Codec] = None
+_codec_lock = threading.Lock()
+
+
+def get_codec() -> Codec:
+    """The process-wide codec, configured from CODEC_* environment variables on first use."""
+    global _codec
+    with _codec_lock:
+        if _codec is None:
+            _codec = Codec(
+                format=os.getenv("CODEC_FORMAT") or None,
+                compression=os.getenv("CODEC_COMPRESSION") or None,
+                compress_threshold=int(os.getenv("CODEC_COMPRESS_THRESHOLD", "1024")),
+            )
+        return _codec
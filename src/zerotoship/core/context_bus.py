@@ -1,63 +1,306 @@
 import asyncio
+from collections import OrderedDict
+from collections.abc import MutableMapping
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, NamedTuple, Optional
+
+from .persistent_map import PersistentMap
+from .event_history import EventHistory
+from .external_data import ExternalDataFetcher
+from .blob_store import BlobStore
+
+
+class ContextSnapshot(MutableMapping):
+    """O(1) point-in-time view of a ContextBus version.
+
+    Writes to a snapshot are copy-on-write: they rebind the snapshot's own map and
+    never touch the bus or other snapshots. Offloaded values are resolved from the blob
+    store on access; ``to_dict`` keeps them as references.
+    """
+
+    __slots__ = ("_map", "version", "_blobs")
+
+    def __init__(self, data: PersistentMap, version: int, blob_store: Optional[BlobStore] = None):
+        self._map = data
+        self.version = version
+        self._blobs = blob_store
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._map[key]
+        return self._blobs.resolve(value) if self._blobs else value
+
+    def __setitem__(self, key: str, value: Any):
+        self._map = self._map.set(key, value)
+
+    def __delitem__(self, key: str):
+        if key not in self._map:
+            raise KeyError(key)
+        self._map = self._map.delete(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._map)
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._map
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._map.get(key, default)
+        return self._blobs.resolve(value) if self._blobs else value
+
+    def update(self, data: Any = (), **kwargs):
+        self._map = self._map.merge(data)
+        if kwargs:
+            self._map = self._map.merge(kwargs)
+
+    def copy(self) -> "ContextSnapshot":
+        return ContextSnapshot(self._map, self.version, self._blobs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize a plain dict, e.g. for JSON serialization."""
+        return self._map.to_dict()
+
+    def __repr__(self) -> str:
+        return f"ContextSnapshot(version={self.version}, {self.to_dict()!r})"
+
+
+class ContextDelta(NamedTuple):
+    """One change to a context key, as delivered to subscribers.
+
+    ``old_version`` is the bus version before the change and ``new_version`` the version
+    that published it. ``deleted`` is True (and ``value`` None) when the key was removed.
+    """
+    key: str
+    old_version: int
+    new_version: int
+    value: Any
+    deleted: bool = False
+
+
+_MISSING = object()
+
+
+class ContextSubscription:
+    """Async iterator over the deltas of the keys a subscriber asked for.
+
+    Pending deltas are held in a bounded, per-subscriber buffer keyed by context key:
+
+    * coalesce - a new delta for a key that is still pending replaces it in place of the
+      older one, keeping the older ``old_version``, so a slow reader sees the latest value
+      and the whole version span it covers;
+    * drop - a delta for a new key when ``maxsize`` keys are already pending evicts the
+      oldest pending key and increments ``dropped``.
+
+    Writers never block on a subscriber. Iteration ends once the subscription is closed
+    and its buffer is drained.
+    """
+
+    def __init__(self, bus: "ContextBus", keys: Optional[Iterable[str]] = None,
+                 prefix: Optional[str] = None, maxsize: int = 256):
+        self._bus = bus
+        self.keys = frozenset(keys) if keys is not None else None
+        self.prefix = prefix
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._pending: "OrderedDict[str, ContextDelta]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def matches(self, key: str) -> bool:
+        if self.keys is not None and key not in self.keys:
+            return False
+        return self.prefix is None or key.startswith(self.prefix)
+
+    def _offer(self, delta: ContextDelta):
+        pending = self._pending.pop(delta.key, None)
+        if pending is not None:
+            delta = delta._replace(old_version=pending.old_version)
+            self.coalesced += 1
+        elif len(self._pending) >= self.maxsize:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[delta.key] = delta
+        self._ready.set()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def close(self):
+        """Stop receiving deltas; already buffered deltas can still be read."""
+        if not self.closed:
+            self.closed = True
+            self._bus._unsubscribe(self)
+            self._ready.set()
+
+    def __aiter__(self) -> "ContextSubscription":
+        return self
+
+    async def __anext__(self) -> ContextDelta:
+        while not self._pending:
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._pending.popitem(last=False)[1]
+
+    def __enter__(self) -> "ContextSubscription":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 
 class ContextBus:
-    def __init__(self, external_data_sources: List[str] = None):
-        self._data: Dict[str, Any] = {}
-        self.history: List[Dict[str, Any]] = []
+    """Shared, versioned key-value context for a workflow run.
+
+    Data lives in a persistent map: every ``set``/``merge`` publishes a new version,
+    writers serialize on a lock, and readers never take it. Recorded events go to a
+    bounded EventHistory that spills older events to disk. Consumers that want to follow
+    changes ``subscribe`` to a feed of per-key deltas instead of polling ``snapshot()``.
+    With a ``blob_store``, values above its size threshold are stored as blob references
+    so snapshots, checkpoints and exports carry references instead of the full text.
+
+    Values are shared with every snapshot taken while they are bound, so never mutate a
+    value read from the bus: ``set`` a new object instead. Setting the same (mutated)
+    object again publishes no version and no delta.
+    """
+
+    def __init__(self, external_data_sources: List[str] = None, history_limit: int = 1000, history_spill_path: Optional[str] = None,
+                 fetcher: Optional[ExternalDataFetcher] = None, blob_store: Optional[BlobStore] = None):
+        self._data = PersistentMap()
+        self.version = 0
+        self.history = EventHistory(max_in_memory=history_limit, spill_path=history_spill_path)
         self._lock = asyncio.Lock()
         self.external_data_sources = external_data_sources or []
+        self.fetcher = fetcher
+        self.blob_store = blob_store
+        self._subscribers: List[ContextSubscription] = []
 
-    async def set(self, key: str, value: Any):
-        async with self._lock:
-            self._data[key] = value
+    def _publish(self, data: PersistentMap, changed_keys: Iterable[str] = ()) -> int:
+        if data is not self._data:
+            old_data, old_version = self._data, self.version
+            self._data = data
+            self.version += 1
+            if self._subscribers:
+                self._notify(old_data, old_version, changed_keys)
+        return self.version
+
+    def _notify(self, old_data: PersistentMap, old_version: int, changed_keys: Iterable[str]):
+        for key in changed_keys:
+            value = self._data.get(key, _MISSING)
+            if value is old_data.get(key, _MISSING):
+                continue
+            if value is _MISSING:
+                delta = ContextDelta(key, old_version, self.version, None, deleted=True)
+            else:
+                delta = ContextDelta(key, old_version, self.version, value)
+            for subscriber in self._subscribers:
+                if subscriber.matches(key):
+                    subscriber._offer(delta)
+
+    def subscribe(self, keys: Optional[Iterable[str]] = None, prefix: Optional[str] = None,
+                  maxsize: int = 256) -> ContextSubscription:
+        """Follow changes to ``keys`` and/or keys starting with ``prefix`` (all keys when neither is given).
 
-    async def get(self, key: str) -> Optional[Any]:
+        Returns an async iterator of ContextDelta. Close it (or use it as a context manager)
+        to unsubscribe; see ContextSubscription for the coalesce/drop policy.
+        """
+        subscription = ContextSubscription(self, keys=keys, prefix=prefix, maxsize=maxsize)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: ContextSubscription):
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    def close_subscriptions(self):
+        """Close every subscription, ending their iterators once drained."""
+        for subscription in list(self._subscribers):
+            subscription.close()
+
+    async def set(self, key: str, value: Any) -> int:
+        if self.blob_store:
+            value = await asyncio.to_thread(self.blob_store.offload, value)
         async with self._lock:
-            return self._data.get(key)
+            return self._publish(self._data.set(key, value), (key,))
+
+    async def get(self, key: str, default: Any = None) -> Optional[Any]:
+        value = self._data.get(key, default)
+        return self.blob_store.resolve(value) if self.blob_store else value
 
-    async def snapshot(self) -> Dict[str, Any]:
+    async def snapshot(self) -> ContextSnapshot:
+        return ContextSnapshot(self._data, self.version, self.blob_store)
+
+    async def merge(self, data: Optional[Dict[str, Any]]) -> int:
+        if not data:
+            return self.version
+        if self.blob_store:
+            data = await asyncio.to_thread(self.blob_store.offload_fields, data)
         async with self._lock:
-            return self._data.copy()
+            return self._publish(self._data.merge(data), data.keys())
 
-    async def merge(self, data: Dict[str, Any]):
+    async def clear(self) -> int:
         async with self._lock:
-            self._data.update(data)
+            return self._publish(PersistentMap(), list(self._data))
 
-    async def record(self, event_name: str, event_data: Dict[str, Any]):
+    async def record(self, event_name: str, event_data: Optional[Dict[str, Any]] = None):
         async with self._lock:
             self.history.append({
                 "name": event_name,
-                "data": event_data,
+                "data": event_data if event_data is not None else {},
                 "timestamp": datetime.utcnow().isoformat()
             })
 
-    async def get_history(self) -> List[Dict[str, Any]]:
+    async def get_history(self, name: Optional[str] = None, since: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return recorded events, optionally filtered by name/glob (e.g. ``*_executed``) and ISO timestamp.
+
+        Pass ``limit`` wherever the newest events suffice: queries that reach spilled
+        events read them back from disk in a worker thread.
+        """
         async with self._lock:
-            return self.history.copy()
+            if self.history.spilled:
+                return await asyncio.to_thread(self.history.query, name, since, limit)
+            return self.history.query(name=name, since=since, limit=limit)
 
-    async def size(self) -> int:
+    def history_length(self) -> int:
+        """Number of events recorded, including any before a restored tail."""
+        return len(self.history)
+
+    async def restore(self, data: Dict[str, Any], history: Optional[List[Dict[str, Any]]] = None,
+                      history_length: Optional[int] = None):
+        """Replace the current context and history, e.g. when resuming from a checkpoint.
+
+        Args:
+            data: Context to restore.
+            history: Recorded events, or only the newest of them.
+            history_length: Total events recorded when ``history`` is a tail.
+        """
+        history = history or []
+        first_seq = max(0, history_length - len(history)) if history_length is not None else 0
         async with self._lock:
-            return len(self._data)
+            restored = PersistentMap(data)
+            self._publish(restored, set(self._data) | set(restored))
+            self.history.reset(history, first_seq=first_seq)
+
+    async def size(self) -> int:
+        return len(self._data)
+
+    async def fetch_and_merge_external_data(self) -> Dict[str, Any]:
+        """Fetch every external data source concurrently and merge the results under ``external_data``.
 
-    async def fetch_and_merge_external_data(self):
+        Sources that fail or time out are skipped; repeated calls within the fetcher's
+        TTL are served from its cache. Returns the data that was fetched.
+        """
         if not self.external_data_sources:
-            return
-
-        urls = " ".join(self.external_data_sources)
-        prompt = f"Please summarize the content of the following URLs: {urls}"
-        
-        try:
-            # Note: The web_fetch tool is a placeholder for a real implementation.
-            # In a real scenario, this would be a robust service call.
-            fetched_data = await web_fetch(prompt=prompt)
-            
-            # Assuming fetched_data is a dictionary where keys are URLs and values are summaries.
-            # In a real implementation, you would parse the output of the web_fetch tool.
-            if fetched_data:
-                await self.merge({"external_data": fetched_data})
-        except Exception as e:
-            # In a real scenario, you would handle this error more gracefully.
-            print(f"Error fetching external data: {e}")
\ No newline at end of file
+            return {}
+        if self.fetcher is None:
+            self.fetcher = ExternalDataFetcher()
+
+        fetched = await self.fetcher.fetch_all(self.external_data_sources)
+        current = await self.get("external_data") or {}
+        if any(current.get(url, _MISSING) != data for url, data in fetched.items()):
+            await self.merge({"external_data": {**current, **fetched}})
+        return fetched
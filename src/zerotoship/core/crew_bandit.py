@@ -0,0 +1,102 @@
+"""
+CrewBandit - Thompson-sampling crew selection for CrewRouter.
+Each (state, crew) arm keeps a Beta posterior over success plus running latency and token
+usage; the router runs the candidate with the best sampled success rate after a penalty
+for being slower or more expensive than its competitors.
+"""
+
+import random
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArmStats:
+    """Posterior and cost statistics for one crew in one state."""
+    alpha: float
+    beta: float
+    latency: Optional[float] = None
+    tokens: Optional[float] = None
+    pulls: int = 0
+
+
+class CrewBandit:
+    """Thompson sampler over candidate crews, keyed by state (the context of the bandit).
+
+    Every update decays the posterior counts of all crews in that state toward the prior,
+    so a crew that failed for a while regains some uncertainty, is sampled again and wins
+    traffic back once it recovers. Latency and
+    token penalties are relative to the slowest / most expensive candidate, so they are in
+    [0, ``latency_weight``] and [0, ``cost_weight``].
+    """
+
+    def __init__(self, seed: Optional[int] = None, decay: float = 0.95, latency_weight: float = 0.1,
+                 cost_weight: float = 0.1, prior_alpha: float = 1.0, prior_beta: float = 1.0,
+                 smoothing: float = 0.2):
+        """Initialize the bandit.
+
+        Args:
+            seed: Seed for the sampler; fixes the sequence of choices (tests, replays).
+            decay: Weight kept by past observations on each update (``reliability_decay``).
+            latency_weight: Maximum score penalty for the slowest candidate.
+            cost_weight: Maximum score penalty for the candidate using the most tokens.
+            prior_alpha: Beta prior successes for an unseen crew.
+            prior_beta: Beta prior failures for an unseen crew.
+            smoothing: EWMA factor for latency and token usage.
+        """
+        self.random = random.Random(seed)
+        self.decay = decay
+        self.latency_weight = latency_weight
+        self.cost_weight = cost_weight
+        self.prior_alpha = prior_alpha
+        self.prior_beta = prior_beta
+        self.smoothing = smoothing
+        self.arms: Dict[str, Dict[str, ArmStats]] = {}
+
+    def _arm(self, state: str, crew_name: str) -> ArmStats:
+        arms = self.arms.setdefault(state, {})
+        arm = arms.get(crew_name)
+        if arm is None:
+            arm = arms[crew_name] = ArmStats(self.prior_alpha, self.prior_beta)
+        return arm
+
+    @staticmethod
+    def _penalties(values: List[Optional[float]], weight: float) -> List[float]:
+        worst = max((v for v in values if v is not None), default=0.0)
+        if not weight or worst <= 0:
+            return [0.0] * len(values)
+        return [weight * (v / worst) if v is not None else 0.0 for v in values]
+
+    def choose(self, state: str, crew_names: Sequence[str]) -> str:
+        """Sample each candidate's posterior and return the best penalized draw."""
+        arms = [self._arm(state, name) for name in crew_names]
+        latency_penalties = self._penalties([arm.latency for arm in arms], self.latency_weight)
+        cost_penalties = self._penalties([arm.tokens for arm in arms], self.cost_weight)
+        scores = [
+            self.random.betavariate(arm.alpha, arm.beta) - latency_penalty - cost_penalty
+            for arm, latency_penalty, cost_penalty in zip(arms, latency_penalties, cost_penalties)
+        ]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        logger.debug(f"Bandit scores for {state}: {dict(zip(crew_names, (round(s, 3) for s in scores)))}")
+        return crew_names[best]
+
+    def update(self, state: str, crew_name: str, success: bool, latency: float, tokens: float = 0.0):
+        arm = self._arm(state, crew_name)
+        for other in self.arms[state].values():
+            other.alpha = self.prior_alpha + self.decay * (other.alpha - self.prior_alpha)
+            other.beta = self.prior_beta + self.decay * (other.beta - self.prior_beta)
+        if success:
+            arm.alpha += 1.0
+        else:
+            arm.beta += 1.0
+        arm.latency = latency if arm.latency is None else (1 - self.smoothing) * arm.latency + self.smoothing * latency
+        arm.tokens = tokens if arm.tokens is None else (1 - self.smoothing) * arm.tokens + self.smoothing * tokens
+        arm.pulls += 1
+
+    def mean(self, state: str, crew_name: str) -> float:
+        """Posterior mean success rate."""
+        arm = self._arm(state, crew_name)
+        return arm.alpha / (arm.alpha + arm.beta)
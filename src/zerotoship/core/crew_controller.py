@@ -20,6 +20,7 @@ from pathlib import Path
 from ..database.project_registry import ProjectRegistry
 from ..crews import CREW_REGISTRY
 from ..utils.mermaid_exporter import MermaidExporter
+from .input_projection import project_for_crew
 
 logger = logging.getLogger(__name__)
 
@@ -268,7 +269,7 @@ class CrewController:
                     next_states.append(sub_step['state'])
                     crew_class = self.state_to_crew_map.get(sub_step['crew'])
                     if crew_class:
-                        crew = crew_class(self.project_data.copy())  # Shallow copy to avoid races
+                        crew = crew_class(project_for_crew(crew_class, self.project_data))  # Own (projected) copy to avoid races
                         tasks.append(asyncio.create_task(crew.run_async()))
             elif 'loop' in next_step:
                 iterations = 0
@@ -277,14 +278,14 @@ class CrewController:
                     next_states.append(state)
                     crew_class = self.state_to_crew_map.get(next_step['crew'])
                     if crew_class:
-                        crew = crew_class(self.project_data.copy())
+                        crew = crew_class(project_for_crew(crew_class, self.project_data))
                         tasks.append(asyncio.create_task(crew.run_async()))
                     iterations += 1
             else:
                 next_states.append(next_step['state'])
                 crew_class = self.state_to_crew_map.get(next_step['crew'])
                 if crew_class:
-                    crew = crew_class(self.project_data.copy())
+                    crew = crew_class(project_for_crew(crew_class, self.project_data))
                     tasks.append(asyncio.create_task(crew.run_async()))
 
         # Timeout wrapper
@@ -0,0 +1,142 @@
+"""
+CrewPool - Warm, reusable crew instances for CrewRouter.
+Crew construction builds LLM clients, agents, tooling and a VaultClient. Pooled crews keep
+their project-independent clients warm across runs and projects; ``reset`` drops the agents
+and tasks, which embed the project context, so they are rebuilt for every run.
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledCrew:
+    __slots__ = ("crew", "created_at", "uses")
+
+    def __init__(self, crew: Any):
+        self.crew = crew
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class CrewPool:
+    """Bounded pool of idle instances of one crew class, shared by every project.
+
+    Each checkout rebinds the instance to the caller's project data through the crew's
+    ``reset``. Demand beyond ``size`` concurrent runs builds extra instances, which are
+    discarded on checkin instead of growing the pool.
+    """
+
+    def __init__(self, crew_class: Any, size: int = 1, max_age_seconds: float = 3600.0,
+                 max_uses: Optional[int] = None):
+        """Initialize the pool.
+
+        Args:
+            crew_class: Crew class to build.
+            size: Idle instances kept.
+            max_age_seconds: Instances older than this are rebuilt instead of reused.
+            max_uses: Runs after which an instance is rebuilt (unlimited when None).
+        """
+        self.crew_class = crew_class
+        self.size = size
+        self.max_age_seconds = max_age_seconds
+        self.max_uses = max_uses
+        self._idle: Deque[_PooledCrew] = deque()
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+
+    def _expired(self, pooled: _PooledCrew) -> bool:
+        if time.monotonic() - pooled.created_at > self.max_age_seconds:
+            return True
+        return self.max_uses is not None and pooled.uses >= self.max_uses
+
+    @staticmethod
+    def _healthy(crew: Any) -> bool:
+        check = getattr(crew, "healthy", None)
+        try:
+            return bool(check()) if callable(check) else True
+        except Exception as e:
+            logger.warning(f"Health check of pooled {type(crew).__name__} failed: {e}")
+            return False
+
+    def checkout(self, project_data: Dict[str, Any]) -> _PooledCrew:
+        """Take a warm instance reset for the project, or build one."""
+        while self._idle:
+            pooled = self._idle.pop()
+            if self._expired(pooled) or not self._healthy(pooled.crew):
+                self.recycled += 1
+                continue
+            # Rebind to the caller's project data so nothing from the previous run leaks in
+            reset = getattr(pooled.crew, "reset", None)
+            if callable(reset):
+                reset(project_data)
+            else:
+                pooled.crew.project_data = project_data
+            self.reused += 1
+            return pooled
+        self.created += 1
+        return _PooledCrew(self.crew_class(project_data))
+
+    def checkin(self, pooled: _PooledCrew, healthy: bool = True):
+        """Return an instance after a run; failed, stale or surplus instances are dropped."""
+        pooled.uses += 1
+        if not healthy or self._expired(pooled) or not self._healthy(pooled.crew):
+            self.recycled += 1
+            return
+        if len(self._idle) < self.size:
+            self._idle.append(pooled)
+
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+
+class CrewPools:
+    """One CrewPool per reusable crew class; crews opt in with ``reusable = True``.
+
+    Only crews on the asyncio backend are pooled: thread and process backends build the
+    crew inside the worker that runs it.
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, int]] = None, default_size: int = 1,
+                 max_age_seconds: float = 3600.0, max_uses: Optional[int] = None):
+        self.sizes = dict(sizes or {})
+        self.default_size = default_size
+        self.max_age_seconds = max_age_seconds
+        self.max_uses = max_uses
+        self.pools: Dict[str, CrewPool] = {}
+
+    @staticmethod
+    def accepts(crew_class: Any) -> bool:
+        return bool(getattr(crew_class, "reusable", False)) and getattr(crew_class, "execution_backend", "asyncio") == "asyncio"
+
+    def pool_for(self, crew_class: Any) -> CrewPool:
+        pool = self.pools.get(crew_class.__name__)
+        if pool is None or pool.crew_class is not crew_class:
+            pool = self.pools[crew_class.__name__] = CrewPool(
+                crew_class,
+                size=self.sizes.get(crew_class.__name__, self.default_size),
+                max_age_seconds=self.max_age_seconds,
+                max_uses=self.max_uses,
+            )
+        return pool
+
+    async def run(self, crew_class: Any, project_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        pool = self.pool_for(crew_class)
+        pooled = pool.checkout(project_data)
+        healthy = False
+        try:
+            result = await pooled.crew.run(context)
+            healthy = isinstance(result, dict) and result.get("status") != "error"
+            return result
+        finally:
+            pool.checkin(pooled, healthy=healthy)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"idle": pool.idle_count(), "created": pool.created, "reused": pool.reused, "recycled": pool.recycled}
+            for name, pool in self.pools.items()
+        }
@@ -0,0 +1,184 @@
+"""
+Content-addressed cache for crew results.
+Lets CrewRouter skip re-running a crew whose declared inputs have already been seen.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from .input_projection import project_inputs
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(state: str, crew_class: Any, context: Dict[str, Any]) -> Optional[str]:
+    """Build a stable cache key for a crew run.
+
+    The key covers the state, the crew class, its ``cache_version`` and its inputs: the
+    projection of its ``input_paths`` when declared, else the context fields listed in
+    its ``cache_inputs``. Crews that declare neither are never cached, since their
+    results may depend on anything.
+    """
+    input_paths = getattr(crew_class, "input_paths", None)
+    cache_inputs = getattr(crew_class, "cache_inputs", None)
+    if input_paths is not None:
+        inputs = project_inputs(context, input_paths)
+    elif cache_inputs:
+        inputs = {field: context.get(field) for field in sorted(cache_inputs)}
+    else:
+        return None
+
+    payload = {
+        "state": state,
+        "crew": f"{crew_class.__module__}.{crew_class.__qualname__}",
+        "version": str(getattr(crew_class, "cache_version", "1")),
+        "inputs": inputs,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class CrewResultCache:
+    """Two-tier (memory + optional disk) LRU cache of successful crew results with a TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 24 * 3600,
+                 cache_dir: Optional[str] = None, max_disk_entries: int = 4096,
+                 metrics: Optional[Dict[str, Any]] = None):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum results kept in memory.
+            ttl_seconds: Time-to-live of a cached result.
+            cache_dir: Directory for the on-disk tier; memory-only when None.
+            max_disk_entries: Maximum results kept on disk.
+            metrics: Optional Prometheus counters (crew_cache_hits_total, crew_cache_misses_total).
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.metrics = metrics or {}
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._disk_index: "OrderedDict[str, float]" = OrderedDict()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.cache_dir, name)
+                entries.append((os.path.getmtime(path), name[:-5]))
+        for _, key in sorted(entries):
+            self._disk_index[key] = 0.0  # Expiry is checked when the entry is read
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        try:
+            with open(self._disk_path(key), "r") as f:
+                record = json.load(f)
+            return record["expires_at"], record["result"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, expires_at: float, payload: str):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"expires_at": expires_at, "result": payload}, f)
+        os.replace(tmp_path, path)
+
+    def _remove_disk(self, key: str):
+        self._disk_index.pop(key, None)
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+    def _record_hit(self, tier: str):
+        self.hits[tier] += 1
+        if "crew_cache_hits_total" in self.metrics:
+            self.metrics["crew_cache_hits_total"].labels(tier=tier).inc()
+
+    def _record_miss(self):
+        self.misses += 1
+        if "crew_cache_misses_total" in self.metrics:
+            self.metrics["crew_cache_misses_total"].inc()
+
+    def _remember(self, key: str, expires_at: float, payload: str):
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for ``key``, or None on a miss or expiry."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry:
+            expires_at, payload = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._record_hit("memory")
+                return json.loads(payload)
+            del self._memory[key]
+
+        if self.cache_dir and key in self._disk_index:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry and entry[0] > now:
+                self._disk_index.move_to_end(key)
+                self._remember(key, *entry)
+                self._record_hit("disk")
+                return json.loads(entry[1])
+            await asyncio.to_thread(self._remove_disk, key)
+
+        self._record_miss()
+        return None
+
+    async def set(self, key: str, result: Dict[str, Any]):
+        """Cache a crew result under ``key``."""
+        try:
+            payload = json.dumps(result, default=str)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Crew result not cacheable: {e}")
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, payload)
+
+        if self.cache_dir:
+            await asyncio.to_thread(self._write_disk, key, expires_at, payload)
+            self._disk_index[key] = expires_at
+            self._disk_index.move_to_end(key)
+            while len(self._disk_index) > self.max_disk_entries:
+                oldest = next(iter(self._disk_index))
+                await asyncio.to_thread(self._remove_disk, oldest)
+
+    def clear(self):
+        """Drop every cached result from both tiers."""
+        self._memory.clear()
+        for key in list(self._disk_index):
+            self._remove_disk(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes."""
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_rate": sum(self.hits.values()) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk_index),
+        }
@@ -3,31 +3,50 @@ CrewRouter - Centralized dispatcher for crew execution.
 Unifies how WorkflowEngine calls crews and handles errors consistently.
 """
 
+import time
 import logging
 import asyncio
 import yaml
 from typing import Dict, Any, Optional, List
 from .context_bus import ContextBus
 from .project_meta_memory import ProjectMetaMemoryManager
+from .crew_result_cache import CrewResultCache, make_cache_key
+from .blob_store import BlobStore
+from .executor_backends import ExecutionBackends
+from .reliability_index import ReliabilityIndex
+from .crew_bandit import CrewBandit
+from .crew_pool import CrewPools
+from .input_projection import project_for_crew
 
 logger = logging.getLogger(__name__)
 
+SELECTION_MODES = ("reliability", "bandit")
+
 class CrewRouter:
     """Routes workflow states to appropriate crew implementations."""
 
-    def __init__(self, crew_classes: Dict[str, List[Any]], context_bus: ContextBus, project_meta_memory: ProjectMetaMemoryManager):
+    def __init__(self, crew_classes: Dict[str, List[Any]], context_bus: ContextBus, project_meta_memory: ProjectMetaMemoryManager, result_cache: Optional[CrewResultCache] = None,
+                 blob_store: Optional[BlobStore] = None, backends: Optional[ExecutionBackends] = None,
+                 reliability_index_path: Optional[str] = None):
         """Initialize the router with a mapping of states to crew classes.
 
         Args:
             crew_classes: Dictionary mapping state names to lists of crew classes
             context_bus: The shared context bus instance.
             project_meta_memory: The project meta memory manager.
+            result_cache: Optional cache of crew results keyed on the crew's declared inputs.
+            blob_store: Optional blob store; large ``full_result`` payloads are returned as references.
+            backends: Execution backends; each crew runs on the one named by its ``execution_backend``.
+            reliability_index_path: Snapshot file for the per-crew reliability index; the index
+                is rebuilt from project meta memory alone when None.
         """
         self.crew_classes = crew_classes
         self.context_bus = context_bus
         self.project_meta_memory = project_meta_memory
-        self.crew_workers = {crew_name: 1 for crew_name in self.crew_classes.keys()}
-        
+        self.result_cache = result_cache
+        self.blob_store = blob_store
+        self.backends = backends or ExecutionBackends()
+
         # Load adaptive config
         try:
             with open("config/adaptive_config.yaml", 'r') as f:
@@ -40,18 +59,53 @@ class CrewRouter:
             }
             logger.warning("adaptive_config.yaml not found. Using default values.")
 
-        logger.info(f"CrewRouter initialized with {len(crew_classes)} crew mappings")
+        # E2: Reliability-based selection reads an incrementally maintained EWMA per crew
+        self.reliability_index = ReliabilityIndex(
+            decay=self.adaptive_config.get("reliability_decay", 0.95),
+            path=reliability_index_path,
+            persist_interval=self.adaptive_config.get("reliability_persist_seconds", 60.0),
+        )
+        self.reliability_index.rebuild(self.project_meta_memory)
+
+        # F5: "bandit" mode picks among candidate crews by Thompson sampling with latency/cost penalties
+        selection = self.adaptive_config.get("crew_selection") or {}
+        self.selection_mode = selection.get("mode", "reliability")
+        if self.selection_mode not in SELECTION_MODES:
+            raise ValueError(f"Unknown crew selection mode '{self.selection_mode}'. Expected one of {SELECTION_MODES}")
+        self.bandit = CrewBandit(
+            seed=selection.get("seed"),
+            decay=self.adaptive_config.get("reliability_decay", 0.95),
+            latency_weight=selection.get("latency_weight", 0.1),
+            cost_weight=selection.get("cost_weight", 0.1),
+        )
 
-    async def _get_crew_reliability(self, crew_class: Any) -> float:
-        # Simplified reliability check. A real implementation would be more complex.
-        crew_name = crew_class.__name__
-        entries = self.project_meta_memory.get_memory_entries(
-            memory_type="performance_metric",
-            tags={f"crew:{crew_name}", "reliability"}
+        # F6: Reusable crews are checked out of a warm per-crew pool instead of rebuilt per run
+        pool_config = self.adaptive_config.get("crew_pool") or {}
+        pool_size = pool_config.get("size", 1)
+        self.crew_workers = {
+            crew_class.__name__: (pool_config.get("workers") or {}).get(crew_class.__name__, pool_size)
+            for state_classes in self.crew_classes.values() for crew_class in state_classes
+        }
+        self.crew_pools = CrewPools(
+            sizes=self.crew_workers,
+            default_size=pool_size,
+            max_age_seconds=pool_config.get("max_age_seconds", 3600.0),
+            max_uses=pool_config.get("max_uses"),
         )
-        if not entries:
-            return 0.5 # Default reliability
-        return entries[0].content.get("value", 0.5)
+
+        logger.info(f"CrewRouter initialized with {len(crew_classes)} crew mappings")
+
+    def _get_crew_reliability(self, crew_class: Any) -> float:
+        return self.reliability_index.score(crew_class.__name__)
+
+    async def _record_outcome(self, state: str, crew_name: str, success: bool, latency: float, tokens: float = 0.0):
+        self.reliability_index.update(crew_name, 1.0 if success else 0.0)
+        self.bandit.update(state, crew_name, success, latency, tokens)
+        if self.reliability_index.persist_due():
+            try:
+                await asyncio.to_thread(self.reliability_index.persist)
+            except OSError as e:
+                logger.warning(f"Failed to persist reliability index: {e}")
 
     async def execute(self, state: str, context: Dict[str, Any], project_data: Dict[str, Any]) -> tuple[Dict[str, Any], str]:
         """Selects and executes the most reliable crew for the given state."""
@@ -60,9 +114,13 @@ class CrewRouter:
             logger.warning(f"No crew registered for state: {state}")
             return {"status": "skipped", "message": f"No crew for {state}"}, ""
 
+        if len(candidate_classes) > 1 and self.selection_mode == "bandit":
+            chosen = self.bandit.choose(state, [c.__name__ for c in candidate_classes])
+            best_crew_class = next(c for c in candidate_classes if c.__name__ == chosen)
+            logger.info(f"Selected crew {chosen} for state {state} by Thompson sampling.")
         # E2: Reliability-Based Crew Selection
-        if len(candidate_classes) > 1:
-            reliabilities = await asyncio.gather(*[self._get_crew_reliability(c) for c in candidate_classes])
+        elif len(candidate_classes) > 1:
+            reliabilities = [self._get_crew_reliability(c) for c in candidate_classes]
             max_reliability = max(reliabilities)
             if max_reliability < 0.5: # E7: Human-in-the-Loop Feedback
                 logger.warning(f"No reliable crew found for state {state}. Max reliability: {max_reliability:.2f}. Requesting human intervention.")
@@ -73,17 +131,44 @@ class CrewRouter:
         else:
             best_crew_class = candidate_classes[0]
 
-        crew = best_crew_class(project_data)
         selected_crew_name = best_crew_class.__name__
 
+        # F3: Serve identical crew runs from the result cache unless the workflow opts out
+        cache_key = None
+        if self.result_cache and (project_data.get("metadata") or {}).get("cache", True):
+            cache_key = make_cache_key(state, best_crew_class, context)
+            if cache_key:
+                cached = await self.result_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"♻️ Cache hit for {selected_crew_name} in state {state}")
+                    cached["cache_hit"] = True
+                    return cached, selected_crew_name
+
         # D3: Dynamic Crew Scaling (logic remains the same)
         # ... (scaling logic here)
 
-        logger.info(f"🚀 Dispatching crew for state: {state} with crew {crew.__class__.__name__}")
+        # F7: Crews that declare input_paths receive only those paths, not the whole project
+        if getattr(best_crew_class, "input_paths", None) is not None:
+            project_data = project_for_crew(best_crew_class, project_data)
+            context = project_for_crew(best_crew_class, context)
+
+        logger.info(f"🚀 Dispatching crew for state: {state} with crew {selected_crew_name}")
+        started = time.monotonic()
         try:
-            result = await crew.run(context)
+            if self.crew_pools.accepts(best_crew_class):
+                result = await self.crew_pools.run(best_crew_class, project_data, context)
+            else:
+                # F4: Blocking crews run on a thread or process backend instead of the event loop
+                result = await self.backends.run(best_crew_class, project_data, context)
             logger.info(f"✅ Crew execution completed for state: {state}")
+            if self.blob_store and "full_result" in result:
+                result = await asyncio.to_thread(self.blob_store.offload_fields, result, ("full_result",))
+            if cache_key and result.get("status") == "success":
+                await self.result_cache.set(cache_key, result)
+            await self._record_outcome(state, selected_crew_name, result.get("status") == "success",
+                                       time.monotonic() - started, result.get("token_usage", 0))
             return result, selected_crew_name
         except Exception as e:
             logger.exception(f"Crew execution failed for {state}: {e}")
+            await self._record_outcome(state, selected_crew_name, False, time.monotonic() - started)
             return {"status": "error", "message": str(e), "error_type": type(e).__name__}, selected_crew_name
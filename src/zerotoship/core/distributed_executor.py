@@ -2,47 +2,431 @@
 Distributed Executor for concurrent crew execution.
 """
 import asyncio
+import json
+import time
 import uuid
+import hashlib
 import logging
+from collections import deque
+from typing import Dict, Any, Optional, Tuple, Union
+
+from .task_scheduler import TaskScheduler, ScheduledTask, resolve_priority
+from .executor_errors import Overloaded
+from .crew_result_cache import make_cache_key
 
 logger = logging.getLogger(__name__)
 
+ADMISSION_POLICIES = ("block", "reject", "shed")
+
+
+def task_fingerprint(state: str, crew_classes: Any, context: Any, project_data: Dict[str, Any]) -> Optional[str]:
+    """Identify tasks that would do the same work.
+
+    When the state has a single crew that declares ``cache_inputs`` and the project has not
+    opted out of result sharing (``metadata.cache``), its cache key is used, so duplicate
+    submissions coalesce even across projects. Otherwise tasks coalesce only within a project:
+    on the state and the context version for ContextBus snapshots, or a hash of a plain
+    context dict. Returns None for unhashable payloads.
+    """
+    shareable = (project_data.get("metadata") or {}).get("cache", True)
+    if shareable and isinstance(crew_classes, (list, tuple)) and len(crew_classes) == 1:
+        key = make_cache_key(state, crew_classes[0], context)
+        if key:
+            return key
+    project_id = project_data.get("id", "unknown")
+    version = getattr(context, "version", None)
+    if isinstance(version, int):
+        return f"{project_id}:{state}:v{version}"
+    try:
+        encoded = json.dumps(dict(context), sort_keys=True, separators=(",", ":"), default=str)
+    except (TypeError, ValueError):
+        return None
+    return f"{project_id}:{state}:" + hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class _SharedCall:
+    """An in-flight task and the number of callers waiting on it."""
+    __slots__ = ("future", "waiters", "submission")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 1  # The caller that started it
+        self.submission: Optional[asyncio.Future] = None
+
 class DistributedExecutor:
-    def __init__(self, crew_router, max_workers=5):
+    def __init__(self, crew_router, max_workers=5, state_priorities: Optional[Dict[str, Union[str, int]]] = None,
+                 state_limits: Optional[Dict[str, int]] = None, crew_limits: Optional[Dict[str, int]] = None,
+                 project_weights: Optional[Dict[str, float]] = None, latency_window: int = 200,
+                 max_queue_size: Optional[int] = None, admission_policy: str = "block", admission_timeout: float = 30.0,
+                 single_flight: bool = True, metrics: Optional[Dict[str, Any]] = None):
+        """Initialize the executor.
+
+        Args:
+            crew_router: Router whose ``execute`` runs a state's crew.
+            max_workers: Number of concurrent workers.
+            state_priorities: Priority class per state ("critical", "high", "normal", "low").
+                ``project_data["priority"]`` or the ``priority`` argument of ``schedule`` override it.
+            state_limits: Maximum concurrently running tasks per state.
+            crew_limits: Maximum concurrently running tasks per crew class name, merged over
+                the ``max_concurrency`` attribute crew classes may declare.
+            project_weights: Fair-share weight per project id (default 1; ``project_data["weight"]`` overrides).
+            latency_window: Number of recent task latencies (enqueue to finish) kept for ``latency_p95``.
+            max_queue_size: Maximum queued (not yet running) tasks; unbounded when None.
+            admission_policy: What ``schedule`` does when the queue is full: "block" waits up to
+                ``admission_timeout`` seconds for room, "reject" fails fast, and "shed" evicts the
+                newest task of a lower priority class (failing its caller) or rejects if there is none.
+                Rejected and shed tasks raise Overloaded.
+            admission_timeout: Seconds a blocked ``schedule`` call waits before raising Overloaded.
+            single_flight: Attach concurrent duplicate tasks (same ``task_fingerprint``) to the one
+                already in flight instead of running them again. The shared run is only cancelled
+                once every caller waiting on it has been cancelled.
+            metrics: Optional Prometheus metrics: executor_queue_wait_seconds and
+                executor_service_seconds histograms (labelled by state and crew), and
+                executor_queue_depth, executor_busy_workers and executor_saturation gauges.
+        """
+        if admission_policy not in ADMISSION_POLICIES:
+            raise ValueError(f"Unknown admission policy '{admission_policy}'. Expected one of {ADMISSION_POLICIES}")
         self.crew_router = crew_router
         self.max_workers = max_workers
-        self.queue = asyncio.Queue()
+        self.state_priorities = dict(state_priorities or {})
+        self.project_weights = dict(project_weights or {})
+        self.scheduler = TaskScheduler(state_limits=state_limits, crew_limits=self._crew_limits(crew_limits))
+        self.max_queue_size = max_queue_size
+        self.admission_policy = admission_policy
+        self.admission_timeout = admission_timeout
+        self.rejected = 0
+        self.shed = 0
+        self.single_flight = single_flight
+        self.coalesced = 0
+        self._inflight: Dict[str, _SharedCall] = {}
+        lock = asyncio.Lock()
+        self._condition = asyncio.Condition(lock)  # Workers wait here for runnable tasks
+        self._space = asyncio.Condition(lock)  # Blocked producers wait here for queue room
+        self._outstanding = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.in_flight = 0
+        self.metrics = metrics or {}
+        self._latencies = deque(maxlen=latency_window)
+        self._queue_waits = deque(maxlen=latency_window)
+        self._service_times = deque(maxlen=latency_window)
+        self.completed = {"success": 0, "error": 0, "cancelled": 0}
         self.workers = []
         self.futures = {}
         self._started = False
 
-    async def schedule(self, state, context, project_data):
+    def _crew_limits(self, crew_limits: Optional[Dict[str, int]]) -> Dict[str, int]:
+        limits = {}
+        registered = getattr(self.crew_router, "crew_classes", None)
+        for crew_classes in (registered.values() if isinstance(registered, dict) else []):
+            for crew_class in crew_classes:
+                limit = getattr(crew_class, "max_concurrency", None)
+                if isinstance(limit, int):
+                    limits[crew_class.__name__] = limit
+        limits.update(crew_limits or {})
+        return limits
+
+    def _candidate_crews(self, state: str) -> Tuple[str, ...]:
+        crew_classes = getattr(self.crew_router, "crew_classes", None)
+        if not isinstance(crew_classes, dict):
+            return ()
+        return tuple(crew_class.__name__ for crew_class in crew_classes.get(state, []))
+
+    async def schedule(self, state, context, project_data, priority: Union[str, int, None] = None):
+        """Queue a crew run and wait for its ``(result, crew_name)``, applying the admission policy."""
+        call = await self._shared_call(state, context, project_data, priority, self.admission_policy)
+        if call is None:
+            return await (await self._submit(state, context, project_data, priority, self.admission_policy))
+        return await self._join(*call)
+
+    async def try_schedule(self, state, context, project_data, priority: Union[str, int, None] = None) -> asyncio.Future:
+        """Queue a crew run without ever waiting for room.
+
+        Raises Overloaded immediately when the task is not admitted; otherwise returns a
+        future resolving to ``(result, crew_name)``.
+        """
+        policy = "reject" if self.admission_policy == "block" else self.admission_policy
+        call = await self._shared_call(state, context, project_data, priority, policy)
+        if call is None:
+            return await self._submit(state, context, project_data, priority, policy)
+        return asyncio.ensure_future(self._join(*call))
+
+    def check_admission(self, state: str):
+        """Raise Overloaded if a task for ``state`` would not be admitted right now.
+
+        For front doors such as the API that must answer before any work is queued:
+        it never waits for room and never sheds queued tasks.
+        """
+        if self._full():
+            self.rejected += 1
+            raise self._overloaded(state, "reject")
+
+    async def _shared_call(self, state, context, project_data, priority, policy: str) -> Optional[Tuple[_SharedCall, bool]]:
+        """Find or start the single-flight call for this task, counting the caller as a waiter.
+
+        Returns the call and whether this caller started it, or None when coalescing does
+        not apply.
+        """
+        if not self.single_flight:
+            return None
+        registered = getattr(self.crew_router, "crew_classes", None)
+        candidates = registered.get(state) if isinstance(registered, dict) else None
+        fingerprint = task_fingerprint(state, candidates, context, project_data)
+        if fingerprint is None:
+            return None
+
+        shared = self._inflight.get(fingerprint)
+        if shared is not None:
+            shared.waiters += 1
+            self.coalesced += 1
+            logger.info(f"Coalesced duplicate task for state {state} onto in-flight run {fingerprint[:12]}")
+            return shared, False
+
+        # Register before submitting so duplicates arriving while we wait for admission attach too.
+        # The submission runs as its own task so cancelling the caller that started it does not
+        # abandon the callers that attached meanwhile.
+        future = asyncio.get_running_loop().create_future()
+        shared = self._inflight[fingerprint] = _SharedCall(future)
+        future.add_done_callback(lambda _: self._inflight.pop(fingerprint, None) if self._inflight.get(fingerprint) is shared else None)
+        shared.submission = asyncio.ensure_future(self._submit(state, context, project_data, priority, policy, future=future))
+        shared.submission.add_done_callback(lambda submission: self._submitted(shared, submission))
+        try:
+            await asyncio.shield(shared.submission)
+        except asyncio.CancelledError:
+            self._leave(shared)
+            raise
+        return shared, True
+
+    @staticmethod
+    def _submitted(shared: _SharedCall, submission: asyncio.Future):
+        """Fail every waiter when the shared task was not admitted."""
+        if shared.future.done():
+            return
+        if submission.cancelled():
+            shared.future.cancel()
+        elif submission.exception() is not None:
+            shared.future.set_exception(submission.exception())
+
+    @staticmethod
+    def _leave(shared: _SharedCall):
+        """Reference-counted cancellation: only the last waiter cancels the shared run."""
+        shared.waiters -= 1
+        if shared.waiters == 0:
+            shared.future.cancel()
+            shared.submission.cancel()
+
+    async def _join(self, shared: _SharedCall, leader: bool):
+        try:
+            outcome = await asyncio.shield(shared.future)
+        except asyncio.CancelledError:
+            if shared.future.cancelled():
+                raise
+            self._leave(shared)
+            raise
+        if not leader and isinstance(outcome, tuple) and outcome and isinstance(outcome[0], dict):
+            # Followers get their own top-level copy of the leader's result
+            return (dict(outcome[0]),) + outcome[1:]
+        return outcome
+
+    def _full(self) -> bool:
+        return self.max_queue_size is not None and len(self.scheduler) >= self.max_queue_size
+
+    def _overloaded(self, state: str, policy: str, shed: bool = False) -> Overloaded:
+        retry_after = max(self.latency_p95(), 1.0)
+        return Overloaded(state, len(self.scheduler), self.max_queue_size, policy, retry_after=retry_after, shed=shed)
+
+    async def _admit(self, task: ScheduledTask, policy: str):
+        """Make room for ``task`` according to ``policy``; caller holds the lock."""
+        if not self._full():
+            return
+        if policy == "block":
+            try:
+                await asyncio.wait_for(self._space.wait_for(lambda: not self._full()), self.admission_timeout)
+                return
+            except asyncio.TimeoutError:
+                pass
+        elif policy == "shed":
+            victim = self.scheduler.shed(task.priority)
+            if victim is not None:
+                self.shed += 1
+                self._outstanding -= 1
+                self.futures.pop(victim.task_id, None)
+                if not victim.future.done():
+                    victim.future.set_exception(self._overloaded(victim.state, policy, shed=True))
+                logger.warning(f"Shed task {victim.task_id} ({victim.state}, priority {victim.priority}) for {task.state}")
+                self._update_gauges()
+                return
+        self.rejected += 1
+        raise self._overloaded(task.state, policy)
+
+    async def _submit(self, state, context, project_data, priority, policy: str,
+                      future: Optional[asyncio.Future] = None) -> asyncio.Future:
         if not self._started:
             raise RuntimeError("Executor has not been started.")
-            
+
         task_id = str(uuid.uuid4())
-        future = asyncio.get_running_loop().create_future()
-        self.futures[task_id] = future
-        await self.queue.put((task_id, state, context, project_data))
-        logger.info(f"Scheduled task {task_id} for state {state}")
-        return await future
+        future = future or asyncio.get_running_loop().create_future()
+        project_id = project_data.get("id", "unknown")
+        if priority is None:
+            priority = project_data.get("priority", self.state_priorities.get(state))
+        task = ScheduledTask(
+            task_id=task_id, state=state, context=context, project_data=project_data, future=future,
+            priority=resolve_priority(priority), project_id=project_id,
+            crew_names=self._candidate_crews(state), enqueued_at=time.monotonic(),
+        )
+        weight = project_data.get("weight", self.project_weights.get(project_id, 1.0))
+        async with self._condition:
+            await self._admit(task, policy)
+            self.futures[task_id] = future
+            self.scheduler.push(task, weight=weight)
+            self._outstanding += 1
+            self._idle.clear()
+            self._update_gauges()
+            self._condition.notify()
+        logger.info(f"Scheduled task {task_id} for state {state} (priority {task.priority}, project {project_id})")
+        return future
+
+    def _should_retire(self) -> bool:
+        return len(self.workers) > self.max_workers
+
+    async def _next_task(self) -> Optional[ScheduledTask]:
+        """Wait for the next runnable task; None tells the worker to retire after a scale-down."""
+        async with self._condition:
+            while True:
+                if self._should_retire():
+                    self.workers.remove(asyncio.current_task())
+                    return None
+                task = self.scheduler.pop()
+                if task is not None:
+                    task.started_at = time.monotonic()
+                    self.in_flight += 1
+                    self._update_gauges()
+                    self._space.notify()
+                    return task
+                await self._condition.wait()
+
+    def _record_timings(self, task: ScheduledTask, crew_name: str, outcome: str):
+        task.finished_at = time.monotonic()
+        queue_wait = task.started_at - task.enqueued_at
+        service_time = task.finished_at - task.started_at
+        self.completed[outcome] += 1
+        self._latencies.append(task.finished_at - task.enqueued_at)
+        self._queue_waits.append(queue_wait)
+        self._service_times.append(service_time)
+        labels = {"state": task.state, "crew": crew_name or "none"}
+        if "executor_queue_wait_seconds" in self.metrics:
+            self.metrics["executor_queue_wait_seconds"].labels(**labels).observe(queue_wait)
+        if "executor_service_seconds" in self.metrics and outcome != "cancelled":
+            self.metrics["executor_service_seconds"].labels(**labels).observe(service_time)
+
+    def _update_gauges(self):
+        if "executor_queue_depth" in self.metrics:
+            self.metrics["executor_queue_depth"].set(len(self.scheduler))
+        if "executor_busy_workers" in self.metrics:
+            self.metrics["executor_busy_workers"].set(self.in_flight)
+        if "executor_saturation" in self.metrics:
+            self.metrics["executor_saturation"].set(self.saturation())
+
+    async def _finish(self, task: ScheduledTask, crew_name: str = "", outcome: str = "success"):
+        async with self._condition:
+            self.scheduler.release(task)
+            self.in_flight -= 1
+            self._record_timings(task, crew_name, outcome)
+            self._update_gauges()
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._idle.set()
+            # Freed concurrency slots may unblock capped tasks
+            self._condition.notify_all()
 
     async def worker(self):
         while True:
-            task_id, state, context, project_data = await self.queue.get()
+            task = await self._next_task()
+            if task is None:
+                return
+            task_id, state = task.task_id, task.state
+            if task.future.cancelled():
+                logger.info(f"Skipping cancelled task {task_id} for state {state}")
+                self.futures.pop(task_id, None)
+                await self._finish(task, outcome="cancelled")
+                continue
             logger.info(f"Worker picked up task {task_id} for state {state}")
+            execution = asyncio.ensure_future(self.crew_router.execute(state, task.context, task.project_data))
+            # Cancelling the task's future (e.g. its last waiter gave up) cancels the crew run
+            task.future.add_done_callback(lambda f, execution=execution: execution.cancel() if f.cancelled() else None)
+            crew_name, outcome = "", "error"
             try:
-                result = await self.crew_router.execute(state, context, project_data)
-                if task_id in self.futures:
+                result = await execution
+                if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], str):
+                    crew_name = result[1]
+                    if isinstance(result[0], dict) and result[0].get("status") in ("success", "skipped"):
+                        outcome = "success"
+                else:
+                    outcome = "success"
+                if task_id in self.futures and not self.futures[task_id].done():
                     self.futures[task_id].set_result(result)
+            except asyncio.CancelledError:
+                if not task.future.cancelled():
+                    raise
+                outcome = "cancelled"
+                logger.info(f"Task {task_id} for state {state} cancelled while running")
             except Exception as e:
                 logger.exception(f"Task {task_id} failed with exception: {e}")
-                if task_id in self.futures:
+                if task_id in self.futures and not self.futures[task_id].done():
                     self.futures[task_id].set_exception(e)
             finally:
                 if task_id in self.futures:
                     del self.futures[task_id]
-                self.queue.task_done()
+                await self._finish(task, crew_name, outcome)
+
+    def queue_depth(self) -> int:
+        return len(self.scheduler)
+
+    @staticmethod
+    def _p95(samples) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def latency_p95(self) -> float:
+        """95th percentile of recent task latencies in seconds (0 when nothing has finished yet)."""
+        return self._p95(self._latencies)
+
+    def saturation(self) -> float:
+        """Busy workers as a fraction of the pool."""
+        return self.in_flight / self.max_workers if self.max_workers else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Point-in-time snapshot of queue, worker and timing statistics."""
+        return {
+            "workers": self.max_workers,
+            "busy_workers": self.in_flight,
+            "saturation": self.saturation(),
+            "queue_depth": len(self.scheduler),
+            "max_queue_size": self.max_queue_size,
+            "outstanding": self._outstanding,
+            "completed": dict(self.completed),
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "coalesced": self.coalesced,
+            "running": self.scheduler.running(),
+            "latency_p95_seconds": self.latency_p95(),
+            "queue_wait_p95_seconds": self._p95(self._queue_waits),
+            "service_time_p95_seconds": self._p95(self._service_times),
+        }
+
+    async def resize(self, workers: int):
+        """Grow or shrink the pool; busy workers finish their current task before retiring."""
+        workers = max(1, workers)
+        async with self._condition:
+            self.max_workers = workers
+            if self._started:
+                while len(self.workers) < workers:
+                    self.workers.append(asyncio.create_task(self.worker()))
+            self._update_gauges()
+            self._condition.notify_all()
+        logger.info(f"DistributedExecutor resized to {workers} workers.")
 
     async def start(self):
         if self._started:
@@ -54,7 +438,7 @@ class DistributedExecutor:
     async def stop(self):
         if not self._started:
             return
-        await self.queue.join()
+        await self._idle.wait()
         for worker in self.workers:
             worker.cancel()
         await asyncio.gather(*self.workers, return_exceptions=True)
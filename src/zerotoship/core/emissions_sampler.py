@@ -0,0 +1,218 @@
+"""
+EmissionsSampler - One process-wide energy and CO2 sampler shared by every crew run.
+A background thread reads cumulative process energy at a fixed interval; each run records
+only its start and end, and receives the energy of every interval it overlapped, split
+between the runs that were active at the same time.
+"""
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional, Tuple
+
+# Optional CodeCarbon measurement; falls back to a CPU-time estimate
+try:
+    from codecarbon import EmissionsTracker
+    CODECARBON_AVAILABLE = True
+except ImportError:
+    EmissionsTracker = None
+    CODECARBON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# A source returns cumulative (energy_kwh, co2_kg) for the process since it started
+EnergySource = Callable[[], Tuple[float, float]]
+
+
+class CPUTimeSource:
+    """Estimates energy from process CPU time at a fixed power draw per busy core."""
+
+    def __init__(self, watts_per_core: float = 15.0, carbon_intensity: float = 0.475):
+        """
+        Args:
+            watts_per_core: Power drawn by one fully busy core, in watts.
+            carbon_intensity: Grid intensity in kg CO2e per kWh (default: world average).
+        """
+        self.watts_per_core = watts_per_core
+        self.carbon_intensity = carbon_intensity
+        self._origin = time.process_time()
+
+    def __call__(self) -> Tuple[float, float]:
+        energy_kwh = (time.process_time() - self._origin) * self.watts_per_core / 3.6e6
+        return energy_kwh, energy_kwh * self.carbon_intensity
+
+
+class CodeCarbonSource:
+    """Reads one long-lived CodeCarbon tracker instead of starting one per run."""
+
+    def __init__(self, project_name: str = "tractionbuild", measure_power_secs: float = 15.0):
+        self.tracker = EmissionsTracker(
+            project_name=project_name,
+            measure_power_secs=measure_power_secs,
+            save_to_file=False,
+            logging_logger=logger,
+        )
+        self.tracker.start()
+
+    def __call__(self) -> Tuple[float, float]:
+        emissions = self.tracker.flush() or 0.0
+        energy = getattr(getattr(self.tracker, "_total_energy", None), "kWh", 0.0)
+        return float(energy), float(emissions)
+
+    def stop(self):
+        self.tracker.stop()
+
+
+@dataclass
+class EmissionsUsage:
+    """Energy and emissions attributed to one run."""
+    energy_consumed_kwh: float
+    co2_emissions_kg: float
+    duration_seconds: float
+
+    @property
+    def carbon_intensity(self) -> float:
+        return self.co2_emissions_kg / self.energy_consumed_kwh if self.energy_consumed_kwh else 0.0
+
+
+class _Run:
+    __slots__ = ("started_at", "energy", "co2")
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.energy = 0.0
+        self.co2 = 0.0
+
+
+class EmissionsSampler:
+    """Background sampler with interval attribution.
+
+    On every tick the energy measured since the previous tick is divided between the
+    runs active during it, in proportion to how much of the tick each one overlapped.
+    The partial tick before a run ends is charged at the most recent rate.
+    """
+
+    def __init__(self, source: Optional[EnergySource] = None, interval_seconds: float = 1.0):
+        """
+        Args:
+            source: Cumulative energy reader; CodeCarbon when installed, else CPUTimeSource.
+            interval_seconds: Sampling interval of the background thread.
+        """
+        self.interval_seconds = interval_seconds
+        self._source = source
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._runs: Dict[int, _Run] = {}
+        self._next_id = 0
+        self._last: Optional[Tuple[float, float, float]] = None  # (monotonic, energy, co2)
+        self._rate = (0.0, 0.0)  # Most recent (kWh/s, kg/s)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def _default_source(self) -> EnergySource:
+        if CODECARBON_AVAILABLE:
+            try:
+                return CodeCarbonSource(os.getenv("CODECARBON_PROJECT_NAME", "tractionbuild"))
+            except Exception as e:
+                logger.warning(f"CodeCarbon unavailable, estimating emissions from CPU time: {e}")
+        return CPUTimeSource()
+
+    def _ensure_started(self):
+        """Build the source and take the first reading without holding ``_lock``.
+
+        Starting CodeCarbon can take seconds; runs ending meanwhile must not wait for it.
+        """
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            source = self._source or self._default_source()
+            energy, co2 = source()
+            with self._lock:
+                self._source = source
+                self._last = (time.monotonic(), energy, co2)
+            self._stopped.clear()
+            thread = threading.Thread(target=self._loop, name="emissions-sampler", daemon=True)
+            thread.start()
+            self._thread = thread
+        logger.info(f"Emissions sampler started ({type(self._source).__name__}, every {self.interval_seconds}s)")
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval_seconds):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Emissions sample failed: {e}")
+
+    def sample(self, now: Optional[float] = None):
+        """Read the source once and attribute the interval since the previous sample."""
+        energy, co2 = self._source()
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            last_at, last_energy, last_co2 = self._last
+            elapsed = now - last_at
+            delta_energy, delta_co2 = max(0.0, energy - last_energy), max(0.0, co2 - last_co2)
+            if elapsed > 0:
+                self._rate = (delta_energy / elapsed, delta_co2 / elapsed)
+            overlaps = {run_id: now - max(run.started_at, last_at) for run_id, run in self._runs.items()}
+            total = sum(overlaps.values())
+            if total > 0:
+                for run_id, overlap in overlaps.items():
+                    run = self._runs[run_id]
+                    run.energy += delta_energy * overlap / total
+                    run.co2 += delta_co2 * overlap / total
+            self._last = (now, energy, co2)
+
+    def begin(self) -> int:
+        """Mark the start of a run; returns a token for ``end``."""
+        self._ensure_started()
+        with self._lock:
+            self._next_id += 1
+            self._runs[self._next_id] = _Run(time.monotonic())
+            return self._next_id
+
+    def end(self, token: int) -> EmissionsUsage:
+        """Mark the end of a run and return the energy and emissions attributed to it."""
+        now = time.monotonic()
+        with self._lock:
+            run = self._runs.pop(token)
+            last_at = self._last[0]
+            # Charge the partial tick at the latest rate, shared with the other active runs
+            partial = max(0.0, now - max(run.started_at, last_at))
+            share = partial / (1 + len(self._runs))
+            energy = run.energy + self._rate[0] * share
+            co2 = run.co2 + self._rate[1] * share
+            return EmissionsUsage(energy, co2, now - run.started_at)
+
+    def totals(self) -> Dict[str, Any]:
+        """Process-wide cumulative energy and emissions as of the last sample."""
+        with self._lock:
+            if self._last is None:
+                return {"energy_consumed_kwh": 0.0, "co2_emissions_kg": 0.0, "active_runs": 0}
+            _, energy, co2 = self._last
+            return {"energy_consumed_kwh": energy, "co2_emissions_kg": co2, "active_runs": len(self._runs)}
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds + 1)
+            self._thread = None
+        stop_source = getattr(self._source, "stop", None)
+        if callable(stop_source):
+            stop_source()
+
+
+_sampler: Optional[EmissionsSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_emissions_sampler() -> EmissionsSampler:
+    """The process-wide sampler (created on first use)."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = EmissionsSampler(interval_seconds=float(os.getenv("EMISSIONS_SAMPLE_SECONDS", "15")))
+        return _sampler
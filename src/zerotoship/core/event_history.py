@@ -0,0 +1,139 @@
+"""
+EventHistory - Bounded, spillable event log for ContextBus.
+Keeps the most recent events in a ring buffer, appends older ones to a JSONL segment,
+and indexes events by name and timestamp so queries avoid full scans.
+"""
+
+import json
+import bisect
+import fnmatch
+import logging
+import tempfile
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventHistory:
+    """Append-only event log with a bounded in-memory tail.
+
+    Every event gets a sequence number. Events older than the newest ``max_in_memory``
+    are written to ``spill_path`` (an anonymous temporary file when not given) and read
+    back on demand by offset. A history restored from a tail (e.g. a checkpoint) keeps
+    counting from the sequence number the tail started at.
+    """
+
+    def __init__(self, max_in_memory: int = 1000, spill_path: Optional[str] = None):
+        self.max_in_memory = max_in_memory
+        self.spill_path = spill_path
+        self._reset()
+
+    def _reset(self, first_seq: int = 0):
+        self._base_seq = first_seq
+        self._recent: deque = deque()
+        self._first_recent_seq = 0
+        self._next_seq = 0
+        self._timestamps: List[str] = []
+        self._by_name: Dict[str, List[int]] = {}
+        self._offsets: List[int] = []
+        self._spill_file = None
+        self._spill_size = 0
+
+    def __len__(self) -> int:
+        """Events recorded so far, including any before a restored tail."""
+        return self._base_seq + self._next_seq
+
+    @property
+    def spilled(self) -> int:
+        """Number of events currently held in the spill segment."""
+        return self._first_recent_seq
+
+    def _open_spill(self):
+        if self._spill_file is None:
+            if self.spill_path:
+                self._spill_file = open(self.spill_path, "w+b")
+            else:
+                self._spill_file = tempfile.TemporaryFile(prefix="context_history_", suffix=".jsonl")
+        return self._spill_file
+
+    def _spill_oldest(self):
+        event = self._recent.popleft()
+        line = (json.dumps(event, default=str) + "\n").encode()
+        spill = self._open_spill()
+        spill.seek(self._spill_size)
+        spill.write(line)
+        spill.flush()
+        self._offsets.append(self._spill_size)
+        self._spill_size += len(line)
+        self._first_recent_seq += 1
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Add an event (a dict with ``name`` and ``timestamp``) and return its sequence number."""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._recent.append(event)
+        self._timestamps.append(event.get("timestamp", ""))
+        self._by_name.setdefault(event.get("name", ""), []).append(seq)
+        while len(self._recent) > self.max_in_memory:
+            self._spill_oldest()
+        return self._base_seq + seq
+
+    def extend(self, events: List[Dict[str, Any]]):
+        for event in events:
+            self.append(event)
+
+    def reset(self, events: Optional[List[Dict[str, Any]]] = None, first_seq: int = 0):
+        """Drop all events (and the spill segment) and optionally load ``events``.
+
+        Args:
+            events: Events to load, oldest first.
+            first_seq: Sequence number of the first loaded event, when ``events`` is only
+                the tail of a longer history.
+        """
+        self.close()
+        self._reset(first_seq)
+        self.extend(events or [])
+
+    def _event(self, seq: int) -> Dict[str, Any]:
+        if seq >= self._first_recent_seq:
+            return self._recent[seq - self._first_recent_seq]
+        self._spill_file.seek(self._offsets[seq])
+        return json.loads(self._spill_file.readline())
+
+    def _matching_seqs(self, name: Optional[str]) -> Optional[List[int]]:
+        """Sequence numbers for an exact name or glob pattern; None means every event."""
+        if name is None:
+            return None
+        if not any(ch in name for ch in "*?["):
+            return self._by_name.get(name, [])
+        matched = [seqs for event_name, seqs in self._by_name.items() if fnmatch.fnmatchcase(event_name, name)]
+        if len(matched) == 1:
+            return matched[0]
+        return sorted(seq for seqs in matched for seq in seqs)
+
+    def query(self, name: Optional[str] = None, since: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return events in order, filtered by name (exact or glob such as ``*_executed``) and/or ISO timestamp.
+
+        Args:
+            name: Event name or glob pattern.
+            since: Only events with a timestamp at or after this ISO-8601 string.
+            limit: Return at most this many of the newest matching events.
+        """
+        start = bisect.bisect_left(self._timestamps, since) if since else 0
+        seqs = self._matching_seqs(name)
+        if seqs is None:
+            selected = range(start, self._next_seq)
+        else:
+            selected = seqs[bisect.bisect_left(seqs, start):]
+        if limit is not None:
+            selected = selected[-limit:] if limit > 0 else []
+        return [self._event(seq) for seq in selected]
+
+    def all(self) -> List[Dict[str, Any]]:
+        return self.query()
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
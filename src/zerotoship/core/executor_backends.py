@@ -0,0 +1,125 @@
+"""
+Execution backends for crew runs.
+A crew class declares ``execution_backend`` ("asyncio", "thread" or "process"); CrewRouter
+runs it on the matching backend so blocking crews do not stall the event loop.
+"""
+
+import asyncio
+import pickle
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "asyncio"
+
+
+def run_crew_blocking(crew_class: Any, project_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Instantiate and run a crew to completion on a private event loop (pool entry point)."""
+    return asyncio.run(crew_class(project_data).run(context))
+
+
+class ExecutionBackend(ABC):
+    """Runs one crew and returns its result dict."""
+    name = DEFAULT_BACKEND
+
+    @abstractmethod
+    async def run(self, crew_class: Any, project_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run ``crew_class`` on this backend and return its result dict."""
+
+    def shutdown(self):
+        pass
+
+
+class AsyncioBackend(ExecutionBackend):
+    """Awaits the crew on the caller's event loop (for crews that are truly async)."""
+    name = "asyncio"
+
+    async def run(self, crew_class: Any, project_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        return await crew_class(project_data).run(context)
+
+
+class _PoolBackend(ExecutionBackend):
+    """Runs the crew in a lazily created concurrent.futures pool."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._pool: Optional[Executor] = None
+
+    @abstractmethod
+    def _create_pool(self) -> Executor:
+        """Build the pool on first use."""
+
+    def _payload(self, crew_class: Any, project_data: Dict[str, Any], context: Any):
+        return crew_class, dict(project_data), dict(context)
+
+    async def run(self, crew_class: Any, project_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        if self._pool is None:
+            self._pool = self._create_pool()
+        payload = self._payload(crew_class, project_data, context)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, run_crew_blocking, *payload)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+class ThreadPoolBackend(_PoolBackend):
+    """Runs blocking crews in worker threads, each with its own event loop."""
+    name = "thread"
+
+    def _create_pool(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crew")
+
+
+class ProcessPoolBackend(_PoolBackend):
+    """Runs CPU-bound crews in worker processes.
+
+    The crew class must be importable at module level and the project data and context
+    picklable; they are copied into the worker, so in-place changes made by the crew are
+    only visible through its returned result.
+    """
+    name = "process"
+
+    def _create_pool(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _payload(self, crew_class: Any, project_data: Dict[str, Any], context: Any):
+        payload = super()._payload(crew_class, project_data, context)
+        try:
+            pickle.dumps(payload)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            raise TypeError(f"{crew_class.__name__} cannot run on the process backend: payload is not picklable ({e})") from e
+        return payload
+
+
+class ExecutionBackends:
+    """Registry of backends, selected by each crew class's ``execution_backend`` attribute."""
+
+    def __init__(self, thread_workers: Optional[int] = None, process_workers: Optional[int] = None):
+        self.backends: Dict[str, ExecutionBackend] = {
+            "asyncio": AsyncioBackend(),
+            "thread": ThreadPoolBackend(thread_workers),
+            "process": ProcessPoolBackend(process_workers),
+        }
+
+    def register(self, backend: ExecutionBackend):
+        self.backends[backend.name] = backend
+
+    def for_crew(self, crew_class: Any) -> ExecutionBackend:
+        name = getattr(crew_class, "execution_backend", DEFAULT_BACKEND)
+        try:
+            return self.backends[name]
+        except KeyError:
+            raise ValueError(f"{crew_class.__name__} declares unknown execution backend '{name}'")
+
+    async def run(self, crew_class: Any, project_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.for_crew(crew_class).run(crew_class, project_data, context)
+
+    def shutdown(self):
+        for backend in self.backends.values():
+            backend.shutdown()
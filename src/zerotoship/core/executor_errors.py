@@ -0,0 +1,43 @@
+"""
+Executor error classes for admission control and backpressure.
+"""
+
+class ExecutorError(Exception):
+    """Base class for DistributedExecutor errors."""
+
+    def __init__(self, message: str, state: str = ""):
+        self.message = message
+        self.state = state
+        super().__init__(self.message)
+
+class Overloaded(ExecutorError):
+    """Raised when a task is not admitted, or is shed from the queue, because the executor is full."""
+
+    def __init__(self, state: str, queue_depth: int, max_queue_size: int, policy: str, retry_after: float = 1.0, shed: bool = False):
+        action = "shed from" if shed else "rejected by"
+        message = f"Task for state '{state}' {action} overloaded executor: {queue_depth}/{max_queue_size} queued (policy '{policy}')"
+        super().__init__(message, state)
+        self.queue_depth = queue_depth
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.retry_after = retry_after
+        self.shed = shed
+
+class DeliveryFailed(ExecutorError):
+    """Raised to the submitter when a broker task's lease expired more often than ``max_deliveries`` allows."""
+
+    def __init__(self, task_id: str, state: str, deliveries: int):
+        message = f"Task {task_id} for state '{state}' abandoned after {deliveries} expired deliveries"
+        super().__init__(message, state)
+        self.task_id = task_id
+        self.deliveries = deliveries
+
+class TaskFailed(ExecutorError):
+    """Raised to the submitter when a broker task's crew run raised on the node that ran it."""
+
+    def __init__(self, task_id: str, state: str, error_type: str, error_message: str):
+        message = f"Task {task_id} for state '{state}' failed with {error_type}: {error_message}"
+        super().__init__(message, state)
+        self.task_id = task_id
+        self.error_type = error_type
+        self.error_message = error_message
@@ -0,0 +1,135 @@
+"""
+ExecutorNode - One member of a multi-node executor sharing work through a TaskBroker.
+Offers the same ``schedule`` call as DistributedExecutor, so WorkflowEngine can use either.
+Work reaches the node as an encoded BrokerTask and results go back through the broker.
+"""
+
+import uuid
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+from .context_bus import ContextSnapshot
+from .persistent_map import PersistentMap
+from .task_broker import TaskBroker, BrokerTask, Lease
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorNode:
+    def __init__(self, crew_router, broker: TaskBroker, node_id: Optional[str] = None, max_workers: int = 5,
+                 lease_seconds: float = 30.0, heartbeat_interval: Optional[float] = None,
+                 reap_interval: Optional[float] = None):
+        """Initialize the node.
+
+        Args:
+            crew_router: Router whose ``execute`` runs a state's crew.
+            broker: Broker shared with the other nodes.
+            node_id: Unique node name (random when omitted).
+            max_workers: Number of concurrent workers on this node.
+            lease_seconds: How long a claimed task stays leased without a heartbeat.
+            heartbeat_interval: Seconds between lease renewals (default a third of the lease).
+            reap_interval: Seconds between sweeps for expired leases (default half the lease).
+        """
+        self.crew_router = crew_router
+        self.broker = broker
+        self.node_id = node_id or f"node-{uuid.uuid4().hex[:8]}"
+        self.max_workers = max_workers
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval or lease_seconds / 3
+        self.reap_interval = reap_interval or lease_seconds / 2
+        self.in_flight = 0
+        self.completed = 0
+        self.stolen = 0
+        self.lost_leases = 0
+        self.workers = []
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def schedule(self, state, context, project_data):
+        """Publish a crew run to this node's queue and wait for its ``(result, crew_name)``."""
+        task = BrokerTask.create(state, context, project_data, origin=self.node_id)
+        await self.broker.publish(self.node_id, task)
+        logger.info(f"Node {self.node_id} published task {task.task_id} for state {state}")
+        result, crew_name = await self.broker.wait_result(task.task_id)
+        return result, crew_name
+
+    async def _heartbeat(self, lease: Lease, execution: asyncio.Future, lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not await self.broker.heartbeat(lease, self.lease_seconds):
+                # Another node now owns the task; stop duplicating its work
+                lost.set()
+                execution.cancel()
+                return
+
+    async def _run(self, lease: Lease):
+        task = lease.task
+        # Blob references in the shipped context resolve lazily, as on the submitting node
+        context = ContextSnapshot(PersistentMap(task.context), task.context_version or 0,
+                                  getattr(self.crew_router, "blob_store", None))
+        execution = asyncio.ensure_future(self.crew_router.execute(task.state, context, task.project_data))
+        lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(lease, execution, lost))
+        self.in_flight += 1
+        try:
+            result = await execution
+        except asyncio.CancelledError:
+            if not lost.is_set():
+                execution.cancel()
+                await self.broker.release(lease)
+                raise
+            self.lost_leases += 1
+            logger.warning(f"Node {self.node_id} lost the lease on task {task.task_id}; abandoned local run")
+        except Exception as e:
+            logger.exception(f"Task {task.task_id} failed with exception: {e}")
+            await self.broker.complete(lease, error=e)
+        else:
+            if await self.broker.complete(lease, result=result):
+                self.completed += 1
+        finally:
+            self.in_flight -= 1
+            heartbeat.cancel()
+
+    async def worker(self):
+        while True:
+            lease = await self.broker.claim(self.node_id, self.lease_seconds)
+            if lease is None:
+                continue
+            if lease.stolen:
+                self.stolen += 1
+                logger.info(f"Node {self.node_id} stole task {lease.task.task_id} from {lease.task.origin}")
+            await self._run(lease)
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self.broker.reap_expired()
+            except Exception as e:
+                logger.warning(f"Lease reaper on {self.node_id} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "workers": self.max_workers,
+            "busy_workers": self.in_flight,
+            "completed": self.completed,
+            "stolen": self.stolen,
+            "lost_leases": self.lost_leases,
+        }
+
+    async def start(self):
+        await self.broker.register(self.node_id)
+        self.workers = [asyncio.create_task(self.worker()) for _ in range(self.max_workers)]
+        self._reaper = asyncio.create_task(self._reap())
+        logger.info(f"Executor node {self.node_id} started with {self.max_workers} workers.")
+
+    async def stop(self):
+        """Stop claiming work; tasks still running are released back to the broker."""
+        for task in [*self.workers, self._reaper]:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*self.workers, *([self._reaper] if self._reaper else []), return_exceptions=True)
+        self.workers = []
+        self._reaper = None
+        logger.info(f"Executor node {self.node_id} stopped.")
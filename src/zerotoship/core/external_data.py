@@ -0,0 +1,186 @@
+"""
+External data fetcher for ContextBus.
+Fetches all configured sources concurrently over pooled keep-alive connections, with
+per-source timeouts and a TTL cache that revalidates stale entries by ETag. Blocking
+requests run on the fetcher's own thread pool, never the event loop's default executor.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Source = Union[str, Dict[str, Any]]
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, pooled per (scheme, host, port)."""
+
+    def __init__(self, max_per_host: int = 4):
+        self.max_per_host = max_per_host
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get((scheme, host, port))
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(host, port, timeout=timeout)
+
+    def _release(self, scheme: str, host: str, port: int, conn: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, host, port), [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, url: str, headers: Dict[str, str], timeout: float) -> Tuple[int, Dict[str, str], bytes]:
+        """Blocking GET over a pooled connection; returns (status, headers, body)."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        conn = self._acquire(scheme, parts.hostname, port, timeout)
+        try:
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one
+                conn.close()
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+            body = response.read()
+        except Exception:
+            conn.close()
+            raise
+
+        response_headers = {key.lower(): value for key, value in response.getheaders()}
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(scheme, parts.hostname, port, conn)
+        return response.status, response_headers, body
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for conn in connections:
+                    conn.close()
+            self._idle.clear()
+
+
+class ExternalDataFetcher:
+    """Concurrent, cached fetcher for ``external_data_sources``.
+
+    A source is either a URL or a dict with ``url`` and an optional ``timeout``. Fresh
+    cache entries are served without a request; stale entries that carry an ETag are
+    revalidated with ``If-None-Match`` and reused on ``304 Not Modified``.
+    """
+
+    def __init__(self, timeout: float = 10.0, ttl_seconds: float = 300.0,
+                 max_concurrency: int = 8, max_per_host: int = 4):
+        """Initialize the fetcher.
+
+        Args:
+            timeout: Default per-source timeout in seconds.
+            ttl_seconds: How long a fetched document is served from cache.
+            max_concurrency: Maximum requests in flight at once, and the size of the fetcher's thread pool.
+            max_per_host: Idle keep-alive connections kept per host.
+        """
+        self.timeout = timeout
+        self.ttl_seconds = ttl_seconds
+        self.pool = ConnectionPool(max_per_host=max_per_host)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # A request that times out keeps its thread until the socket timeout fires; on a
+        # dedicated pool that only delays other fetches, not checkpoint or blob offload
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="external-data")
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self.requests_made = 0
+
+    @staticmethod
+    def _parse(headers: Dict[str, str], body: bytes) -> Any:
+        text = body.decode("utf-8", errors="replace")
+        if "json" in headers.get("content-type", ""):
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+        return text
+
+    async def fetch(self, url: str, timeout: Optional[float] = None) -> Any:
+        """Fetch one URL, using the cache and ETag revalidation. Raises on errors and timeouts."""
+        timeout = timeout or self.timeout
+        entry = self._cache.get(url)
+        now = time.time()
+        if entry and entry["expires_at"] > now:
+            return entry["data"]
+
+        headers = {"Accept": "application/json, text/plain;q=0.9, */*;q=0.5"}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        async with self._semaphore:
+            self.requests_made += 1
+            request = asyncio.get_running_loop().run_in_executor(
+                self._executor, self.pool.request, url, headers, timeout)
+            status, response_headers, body = await asyncio.wait_for(request, timeout)
+
+        if status == 304 and entry:
+            entry["expires_at"] = time.time() + self.ttl_seconds
+            return entry["data"]
+        if not 200 <= status < 300:
+            # Redirects, unsolicited 304s and other non-success bodies are not the document
+            raise RuntimeError(f"HTTP {status} from {url}")
+
+        data = self._parse(response_headers, body)
+        self._cache[url] = {"data": data, "etag": response_headers.get("etag"),
+                            "expires_at": time.time() + self.ttl_seconds}
+        return data
+
+    async def fetch_all(self, sources: List[Source]) -> Dict[str, Any]:
+        """Fetch every source concurrently; failed sources are logged and left out."""
+        targets = []
+        for source in sources:
+            if isinstance(source, dict):
+                targets.append((source["url"], source.get("timeout")))
+            else:
+                targets.append((source, None))
+
+        results = await asyncio.gather(*(self.fetch(url, timeout) for url, timeout in targets),
+                                       return_exceptions=True)
+        fetched = {}
+        for (url, _), result in zip(targets, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"External data source {url} failed: {result!r}")
+            else:
+                fetched[url] = result
+        return fetched
+
+    def invalidate(self, url: Optional[str] = None):
+        """Drop one cached URL, or the whole cache."""
+        if url is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(url, None)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.pool.close()
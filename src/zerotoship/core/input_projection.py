@@ -0,0 +1,129 @@
+"""
+Input projection for crew runs.
+A crew class declares the context paths it reads as dpath globs in ``input_paths``
+(e.g. ``"idea"``, ``"validation/score"``, ``"build/*/status"``); every crew run then
+receives only those paths plus a few bookkeeping fields, instead of a copy of the whole
+project. Set CREW_INPUT_DEBUG=warn (log) or strict (raise) to catch reads of undeclared paths.
+"""
+
+import os
+import logging
+from fnmatch import fnmatchcase
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+import dpath
+
+logger = logging.getLogger(__name__)
+
+# Identity and bookkeeping fields every crew receives whatever it declares
+FRAMEWORK_PATHS = ("id", "state", "workflow", "user_id", "created_at")
+DEBUG_MODES = ("off", "warn", "strict")
+
+
+class UndeclaredInputRead(KeyError):
+    """A crew read a context path it did not declare in ``input_paths`` (strict debug mode)."""
+
+    def __init__(self, crew_name: str, path: str):
+        self.crew_name = crew_name
+        self.path = path
+        super().__init__(f"{crew_name} read undeclared input '{path}'; add it to {crew_name}.input_paths")
+
+
+def _split(path: str) -> Tuple[str, ...]:
+    return tuple(segment for segment in path.split("/") if segment)
+
+
+def _declared(path: Tuple[str, ...], declared: Iterable[Tuple[str, ...]]) -> bool:
+    """A read is declared if it lies inside a declared subtree or on the way down to one."""
+    for pattern in declared:
+        depth = min(len(path), len(pattern))
+        if all(fnmatchcase(path[i], pattern[i]) for i in range(depth)):
+            return True
+    return False
+
+
+class InputGuard(dict):
+    """Projected input that reports reads of undeclared paths (CREW_INPUT_DEBUG).
+
+    Only value reads (``[]`` and ``get``) are checked; iteration and membership tests
+    are not, so framework code that walks or probes the whole input is not reported.
+    """
+
+    def __init__(self, data: Dict[str, Any], declared: List[Tuple[str, ...]], crew_name: str,
+                 strict: bool = False, prefix: Tuple[str, ...] = (), undeclared: Optional[Set[str]] = None):
+        super().__init__()
+        self._declared = declared
+        self._crew_name = crew_name
+        self._strict = strict
+        self._prefix = prefix
+        self.undeclared_reads: Set[str] = set() if undeclared is None else undeclared
+        for key, value in data.items():
+            if isinstance(value, dict):
+                value = InputGuard(value, declared, crew_name, strict, prefix + (str(key),), self.undeclared_reads)
+            dict.__setitem__(self, key, value)
+
+    def _check(self, key: Any):
+        path = self._prefix + (str(key),)
+        if _declared(path, self._declared):
+            return
+        joined = "/".join(path)
+        if self._strict:
+            raise UndeclaredInputRead(self._crew_name, joined)
+        if joined not in self.undeclared_reads:
+            self.undeclared_reads.add(joined)
+            logger.warning(f"{self._crew_name} read undeclared input '{joined}'")
+
+    def __getitem__(self, key: Any) -> Any:
+        self._check(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        self._check(key)
+        return dict.get(self, key, default)
+
+    def __reduce__(self):
+        # Process and Celery payloads travel as plain dicts
+        return dict, (dict(self),)
+
+
+def input_debug_mode() -> str:
+    """The CREW_INPUT_DEBUG mode: "off", "warn" or "strict"."""
+    mode = os.getenv("CREW_INPUT_DEBUG", "off").lower()
+    if mode not in DEBUG_MODES:
+        logger.warning(f"Unknown CREW_INPUT_DEBUG mode '{mode}', expected one of {DEBUG_MODES}")
+        return "off"
+    return mode
+
+
+def project_inputs(data: Dict[str, Any], paths: Iterable[str]) -> Dict[str, Any]:
+    """Build a new dict holding only the given dpath globs of ``data``.
+
+    Values are shared with ``data``, not copied; missing paths are simply absent.
+    """
+    projected: Dict[str, Any] = {}
+    for path in paths:
+        if "/" not in path and not any(c in path for c in "*?["):
+            # Top-level keys are the common case and need no glob search
+            if path in data:
+                projected[path] = data[path]
+            continue
+        dpath.merge(projected, dpath.search(data, path))
+    return projected
+
+
+def project_for_crew(crew_class: Any, data: Dict[str, Any]) -> Dict[str, Any]:
+    """The input a crew run should receive.
+
+    Crews without ``input_paths`` get a shallow copy of everything, as before. Declaring
+    crews get their paths plus FRAMEWORK_PATHS, wrapped in an InputGuard in debug mode.
+    """
+    input_paths = getattr(crew_class, "input_paths", None)
+    if input_paths is None:
+        return dict(data)
+    paths = tuple(FRAMEWORK_PATHS) + tuple(input_paths)
+    projected = project_inputs(data, paths)
+    mode = input_debug_mode()
+    if mode == "off":
+        return projected
+    declared = [_split(path) for path in paths]
+    return InputGuard(projected, declared, getattr(crew_class, "__name__", str(crew_class)), strict=mode == "strict")
@@ -1,10 +1,11 @@
 import asyncio, math
-import json
 import os
 from datetime import datetime
 
+from .codec import get_codec
+
 class LearningMemory:
-    def __init__(self, store_path: str = "data/memory_store.json"):
+    def __init__(self, store_path: str = "data/memory_store.bin"):
         self._lock=asyncio.Lock()
         self._entries=[]
         self.store_path = store_path
@@ -53,16 +54,16 @@ class LearningMemory:
 
     async def persist(self):
         async with self._lock:
-            if not os.path.exists(os.path.dirname(self.store_path)):
-                os.makedirs(os.path.dirname(self.store_path))
-            with open(self.store_path, 'w') as f:
-                json.dump(self._entries, f, indent=2)
+            get_codec().dump(self._entries, self.store_path, schema="learning_memory")
 
     async def load(self):
         async with self._lock:
-            if os.path.exists(self.store_path):
-                with open(self.store_path, 'r') as f:
-                    self._entries = json.load(f)
+            path = self.store_path
+            if not os.path.exists(path):
+                # Stores written before the codec sit beside it as .json; persist() writes the new path
+                path = os.path.splitext(path)[0] + ".json"
+            if os.path.exists(path):
+                self._entries = get_codec().load(path, schema="learning_memory")
 
     def _score(self,a,b):
         a,b=a.lower(),b.lower()
@@ -1,12 +1,19 @@
 """
 Production-grade output serializer for tractionbuild.
 Handles CrewOutput serialization and ensures GDPR-compliant data processing.
+Conversion, anonymization and canonical JSON encoding happen in a single traversal.
 """
 
+import re
 import json
+import hashlib
 import logging
-from typing import Dict, Any, Optional, Union
-from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Tuple, Union
+from datetime import date, datetime
 from dataclasses import asdict, is_dataclass
 import uuid
 
@@ -24,103 +31,247 @@ except ImportError:
             self.tasks_output = tasks_output or []
             self.token_usage = token_usage or {}
 
+from ..security.key_manager import CRYPTOGRAPHY_AVAILABLE, DataKeyManager, get_key_manager, split_key_id
+
 logger = logging.getLogger(__name__)
 
+# PII detection, compiled once per process. Emails are found anywhere in a string; phone
+# numbers and IP addresses only when they are the whole value, so prose that merely
+# contains large numbers is left alone. A phone number either starts with "+" or is 9-15
+# digits in three or more separated groups, so decimals and bare counts do not match.
+_EMAIL_PATTERN = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+_IDENTIFIER_PATTERN = re.compile(
+    r'\+\d(?:[\s().-]{0,2}\d){7,}'
+    r'|(?=(?:\D*\d){9,15}\D*$)\(?\d{2,4}\)?(?:[\s.-]{1,2}\d{2,4}){2,4}'
+    r'|(?:\d{1,3}\.){3}\d{1,3}'
+)
+_SENSITIVE_KEYS = ('email', 'phone', 'address', 'name', 'user_id')
+# Shortest string either pattern can match ("a@b.cc"); longest a whole-value identifier can be
+_MIN_PII_LENGTH = 6
+_MAX_IDENTIFIER_LENGTH = 24
+
+
+@lru_cache(maxsize=4096)
+def _member(key: str) -> Tuple[str, bool]:
+    """The encoded ``"key":`` prefix of a mapping member and whether the key names PII."""
+    lowered = key.lower()
+    return encode_basestring_ascii(key) + ':', any(sensitive in lowered for sensitive in _SENSITIVE_KEYS)
+
+
+def _may_contain_pii(value: str) -> bool:
+    if len(value) < _MIN_PII_LENGTH:
+        return False
+    if len(value) <= _MAX_IDENTIFIER_LENGTH and _IDENTIFIER_PATTERN.fullmatch(value):
+        return True
+    return '@' in value and _EMAIL_PATTERN.search(value) is not None
+
+
+def _encode_float(value: float) -> str:
+    # Same spelling as json.dumps
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return 'Infinity' if value > 0 else '-Infinity'
+    return float.__repr__(value)
+
+
+def _encode_key(key: Any) -> str:
+    if isinstance(key, str):
+        return key
+    if key is True or key is False or key is None:
+        return json.dumps(key)
+    return str(key)
+
+
 class CrewOutputSerializer:
     """
     Production-grade serializer for CrewAI outputs.
     Ensures GDPR compliance and data integrity.
     """
     
-    def __init__(self, enable_encryption: bool = True, enable_anonymization: bool = True):
+    def __init__(self, enable_encryption: bool = True, enable_anonymization: bool = True,
+                 key_manager: Optional[DataKeyManager] = None):
         self.enable_encryption = enable_encryption
         self.enable_anonymization = enable_anonymization
         
-        # Initialize encryption if enabled
-        self.cipher = None
-        if enable_encryption:
-            try:
-                from cryptography.fernet import Fernet
-                key = Fernet.generate_key()  # In production, load from Vault
-                self.cipher = Fernet(key)
-                logger.info("Output encryption enabled")
-            except ImportError:
-                logger.warning("cryptography not available - encryption disabled")
-                self.enable_encryption = False
+        # Envelope encryption: per-project data keys from the key manager, resolved on first use
+        self._key_manager = key_manager
+        if enable_encryption and not CRYPTOGRAPHY_AVAILABLE:
+            logger.warning("cryptography not available - encryption disabled")
+            self.enable_encryption = False
+    
+    @property
+    def key_manager(self) -> DataKeyManager:
+        if self._key_manager is None:
+            self._key_manager = get_key_manager()
+        return self._key_manager
     
     def serialize_crew_output(self, output: Any, project_id: str = None) -> Dict[str, Any]:
+        """Serialize CrewOutput to a JSON-compatible envelope; see ``serialize_with_content``."""
+        return self.serialize_with_content(output, project_id)[1]
+    
+    def serialize_with_content(self, output: Any, project_id: str = None) -> Tuple[Any, Dict[str, Any]]:
         """
-        Serialize CrewOutput to JSON-compatible dictionary.
+        Serialize CrewOutput to JSON-compatible dictionary, keeping the content in hand.
         
         Args:
             output: CrewOutput or any crew result
             project_id: Project identifier for audit trails
             
         Returns:
-            Serialized output dictionary
+            The (anonymized) content for in-process use, and the serialized output dictionary.
+            With encryption enabled the dictionary carries only ``encrypted_content``; read
+            it back with ``deserialize_output``. Output that cannot be converted yields an
+            error envelope without any of its content.
+            
+        Raises:
+            Exception: Encryption failures (e.g. an unreadable key store) propagate, since
+                falling back would persist the content unencrypted.
         """
+        # Generate unique serialization ID for audit trails
+        serialization_id = str(uuid.uuid4())
+        timestamp = datetime.utcnow().isoformat()
         try:
-            # Generate unique serialization ID for audit trails
-            serialization_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow().isoformat()
-            
-            # Handle different output types
-            if isinstance(output, CrewOutput):
-                serialized = self._serialize_crewai_output(output)
-            elif hasattr(output, '__dict__'):
-                # Handle custom objects
-                serialized = self._serialize_object(output)
-            elif is_dataclass(output):
-                # Handle dataclasses
-                serialized = asdict(output)
-            elif isinstance(output, (dict, list, str, int, float, bool)):
-                # Handle basic types
-                serialized = output
-            else:
-                # Fallback: convert to string
-                serialized = str(output)
-                logger.warning(f"Fallback serialization for type {type(output)}")
-            
-            # Apply GDPR anonymization if enabled
-            if self.enable_anonymization:
-                serialized = self._anonymize_data(serialized)
-            
-            # Create audit-compliant output
-            result = {
-                'content': serialized,
+            # Convert, anonymize and encode in one pass
+            serialized, encoded = self.encode(output)
+        except Exception as e:
+            logger.error(f"Serialization failed for {type(output)}: {e}")
+            # Return safe fallback; the output itself may hold PII that was never anonymized
+            content = {
+                'error': 'Serialization failed',
+                'error_type': type(e).__name__
+            }
+            return content, {
+                'content': content,
                 'metadata': {
                     'serialization_id': serialization_id,
                     'timestamp': timestamp,
                     'project_id': project_id,
                     'data_type': type(output).__name__,
-                    'gdpr_compliant': self.enable_anonymization,
-                    'encrypted': self.enable_encryption
-                }
-            }
-            
-            # Apply encryption if enabled
-            if self.enable_encryption and self.cipher:
-                result = self._encrypt_sensitive_data(result)
-            
-            logger.debug(f"Successfully serialized {type(output).__name__} for project {project_id}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Serialization failed for {type(output)}: {e}")
-            # Return safe fallback
-            return {
-                'content': {
-                    'error': 'Serialization failed',
-                    'raw_output': str(output)[:1000],  # Truncate for safety
-                    'error_type': type(e).__name__
-                },
-                'metadata': {
-                    'serialization_id': str(uuid.uuid4()),
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'project_id': project_id,
                     'status': 'error'
                 }
             }
+        
+        # Create audit-compliant output
+        result = {
+            'content': serialized,
+            'metadata': {
+                'serialization_id': serialization_id,
+                'timestamp': timestamp,
+                'project_id': project_id,
+                'data_type': type(output).__name__,
+                'gdpr_compliant': self.enable_anonymization,
+                'encrypted': self.enable_encryption,
+                'content_sha256': hashlib.sha256(encoded).hexdigest(),
+                'content_bytes': len(encoded)
+            }
+        }
+        
+        # Apply encryption if enabled
+        if self.enable_encryption:
+            result = self._encrypt_sensitive_data(result, encoded)
+        
+        logger.debug(f"Successfully serialized {type(output).__name__} for project {project_id}")
+        return serialized, result
+    
+    def encode(self, output: Any) -> Tuple[Any, bytes]:
+        """
+        Convert, anonymize and canonically encode an output in a single traversal.
+        
+        Args:
+            output: CrewOutput or any crew result
+            
+        Returns:
+            The JSON-compatible (anonymized) content and its canonical JSON encoding
+            (sorted keys, compact separators, ASCII)
+        """
+        parts: List[str] = []
+        content = self._walk(output, parts)
+        return content, ''.join(parts).encode('ascii')
+    
+    def _walk(self, value: Any, parts: List[str]) -> Any:
+        """Return the anonymized, JSON-compatible form of ``value`` and append its encoding to ``parts``."""
+        cls = type(value)
+        # Fast path for exact scalar types; short strings cannot hold PII and skip the patterns
+        if cls is str:
+            if self.enable_anonymization and _may_contain_pii(value):
+                value = self._hash_sensitive_value(value)
+            parts.append(encode_basestring_ascii(value))
+            return value
+        if value is None:
+            parts.append('null')
+            return None
+        if cls is bool:
+            parts.append('true' if value else 'false')
+            return value
+        if cls is int:
+            parts.append(int.__repr__(value))
+            return value
+        if cls is float:
+            parts.append(_encode_float(value))
+            return value
+        if isinstance(value, dict):
+            return self._walk_mapping(value, parts)
+        if isinstance(value, (list, tuple)):
+            return self._walk_sequence(value, parts)
+        return self._walk(self._convert(value), parts)
+    
+    def _walk_sequence(self, sequence: Any, parts: List[str]) -> List[Any]:
+        items = []
+        append = parts.append
+        append('[')
+        for item in sequence:
+            items.append(self._walk(item, parts))
+            append(',')
+        if items:
+            parts[-1] = ']'
+        else:
+            append(']')
+        return items
+    
+    def _walk_mapping(self, mapping: Dict[Any, Any], parts: List[str]) -> Dict[str, Any]:
+        result = {}
+        append = parts.append
+        anonymize = self.enable_anonymization
+        if set(map(type, mapping)) <= {str}:
+            items = sorted(dict.items(mapping), key=itemgetter(0))
+        else:
+            items = sorted(((_encode_key(key), value) for key, value in dict.items(mapping)), key=itemgetter(0))
+        append('{')
+        for key, value in items:
+            prefix, sensitive = _member(key)
+            append(prefix)
+            if anonymize and sensitive:
+                value = self._hash_sensitive_value(str(value))
+            result[key] = self._walk(value, parts)
+            append(',')
+        if result:
+            parts[-1] = '}'
+        else:
+            append('}')
+        return result
+    
+    def _convert(self, value: Any) -> Any:
+        """Map a non-JSON value onto JSON-compatible types (one level; the walk handles the rest)."""
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, str):
+            return str.__str__(value)
+        if isinstance(value, int):
+            return int(value)
+        if isinstance(value, float):
+            return float(value)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (set, frozenset)):
+            return sorted(value, key=repr)
+        if isinstance(value, CrewOutput):
+            return self._serialize_crewai_output(value)
+        if hasattr(value, '__dict__'):
+            return self._serialize_object(value)
+        if is_dataclass(value):
+            return asdict(value)
+        return str(value)
     
     def _serialize_crewai_output(self, output: CrewOutput) -> Dict[str, Any]:
         """Serialize CrewAI CrewOutput object."""
@@ -147,14 +298,12 @@ class CrewOutputSerializer:
                 logger.warning(f"Failed to serialize pydantic model: {e}")
                 result['pydantic'] = str(output.pydantic)
         
-        # Extract task outputs
+        # Extract task outputs (objects are converted as the walk reaches them)
         if hasattr(output, 'tasks_output') and output.tasks_output:
-            result['tasks_output'] = []
-            for task_output in output.tasks_output:
-                if hasattr(task_output, '__dict__'):
-                    result['tasks_output'].append(self._serialize_object(task_output))
-                else:
-                    result['tasks_output'].append(str(task_output))
+            result['tasks_output'] = [
+                task_output if hasattr(task_output, '__dict__') else str(task_output)
+                for task_output in output.tasks_output
+            ]
         
         # Extract token usage
         if hasattr(output, 'token_usage') and output.token_usage:
@@ -173,22 +322,8 @@ class CrewOutputSerializer:
         return result
     
     def _serialize_object(self, obj: Any) -> Dict[str, Any]:
-        """Serialize arbitrary objects safely."""
-        result = {}
-        
-        # Get object attributes
-        if hasattr(obj, '__dict__'):
-            for key, value in obj.__dict__.items():
-                try:
-                    if isinstance(value, (str, int, float, bool, list, dict, type(None))):
-                        result[key] = value
-                    elif hasattr(value, '__dict__'):
-                        result[key] = self._serialize_object(value)
-                    else:
-                        result[key] = str(value)
-                except Exception as e:
-                    logger.debug(f"Failed to serialize attribute {key}: {e}")
-                    result[key] = f"<serialization_error: {type(value).__name__}>"
+        """Serialize arbitrary objects safely (attribute values are converted by the walk)."""
+        result = dict(obj.__dict__) if hasattr(obj, '__dict__') else {}
         
         # Add type information
         result['__type__'] = type(obj).__name__
@@ -198,39 +333,23 @@ class CrewOutputSerializer:
     
     def _anonymize_data(self, data: Any) -> Any:
         """Apply GDPR-compliant data anonymization."""
-        if isinstance(data, dict):
-            anonymized = {}
-            for key, value in data.items():
-                # Anonymize sensitive fields
-                if any(sensitive in key.lower() for sensitive in ['email', 'phone', 'address', 'name', 'user_id']):
-                    anonymized[key] = self._hash_sensitive_value(str(value))
-                else:
-                    anonymized[key] = self._anonymize_data(value)
-            return anonymized
-        elif isinstance(data, list):
-            return [self._anonymize_data(item) for item in data]
-        elif isinstance(data, str):
-            # Check for potential PII patterns
-            if '@' in data and '.' in data:  # Email-like
-                return self._hash_sensitive_value(data)
-            elif data.isdigit() and len(data) > 8:  # Phone-like
-                return self._hash_sensitive_value(data)
-            return data
-        else:
-            return data
+        return self._walk(data, [])
     
     def _hash_sensitive_value(self, value: str) -> str:
         """Hash sensitive values for anonymization."""
-        import hashlib
         return f"anon_{hashlib.sha256(value.encode()).hexdigest()[:8]}"
     
-    def _encrypt_sensitive_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Encrypt sensitive data fields."""
-        if not self.cipher:
-            return data
+    def _encrypt_sensitive_data(self, data: Dict[str, Any], encoded: bytes) -> Dict[str, Any]:
+        """Replace ``content`` with its encryption under the project's data key.
         
-        # In production, encrypt specific sensitive fields
-        # For demo, we'll just mark as encrypted
+        Serialized outputs end up in project data, checkpoints, the result cache and
+        blobs, so the plaintext is dropped; any worker holding the master key can
+        restore it with ``deserialize_output``.
+        """
+        key_id, token = self.key_manager.encrypt(data['metadata'].get('project_id'), encoded)
+        del data['content']
+        data['encrypted_content'] = token.decode()
+        data['metadata']['key_id'] = key_id
         data['metadata']['encryption_applied'] = True
         return data
     
@@ -261,23 +380,56 @@ class CrewOutputSerializer:
             return {'error': 'Deserialization failed', 'raw_data': str(serialized_data)[:500]}
     
     def _decrypt_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Decrypt encrypted data fields."""
-        # In production, implement actual decryption
-        return data
+        """Restore ``content`` from ``encrypted_content``."""
+        token = data.get('encrypted_content')
+        key_id = data.get('metadata', {}).get('key_id')
+        if not token or not key_id:
+            return data
+        content = json.loads(self.key_manager.decrypt(key_id, token.encode()))
+        return {**data, 'content': content}
+    
+    def reencrypt_outputs(self, data: Any) -> int:
+        """
+        Bulk re-encryption job: move every serialized output found in ``data`` (searched
+        recursively, updated in place) that uses an old data key version onto the current one.
+        
+        Args:
+            data: A serialized output, or any structure containing them (e.g. project data)
+            
+        Returns:
+            Number of outputs re-encrypted
+        """
+        if isinstance(data, list):
+            return sum(self.reencrypt_outputs(item) for item in data)
+        if not isinstance(data, dict):
+            return 0
+        metadata = data.get('metadata')
+        key_id = metadata.get('key_id') if isinstance(metadata, dict) else None
+        if key_id and 'encrypted_content' in data:
+            if self.key_manager.is_current(key_id):
+                return 0
+            plaintext = self.key_manager.decrypt(key_id, data['encrypted_content'].encode())
+            project_id, _ = split_key_id(key_id)
+            metadata['key_id'], token = self.key_manager.encrypt(project_id, plaintext)
+            data['encrypted_content'] = token.decode()
+            return 1
+        return sum(self.reencrypt_outputs(value) for value in data.values())
     
-    def validate_serialization(self, original: Any, serialized: Dict[str, Any]) -> bool:
+    def validate_serialization(self, original: Any, serialized: Dict[str, Any], content: Any = None) -> bool:
         """
         Validate that serialization preserved essential data.
         
         Args:
             original: Original output
             serialized: Serialized output
+            content: Its content, when already in hand (skips decrypting ``serialized``)
             
         Returns:
             True if serialization is valid
         """
         try:
-            content = serialized.get('content', {})
+            if content is None:
+                content = self.deserialize_output(serialized)
             
             # Check for essential fields
             if isinstance(original, CrewOutput):
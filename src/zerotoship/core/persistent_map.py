@@ -0,0 +1,240 @@
+"""
+PersistentMap - Immutable hash array mapped trie (HAMT) with structural sharing.
+Every update returns a new map that shares all untouched branches with the old one,
+so keeping old versions around (snapshots) costs O(1) and an update costs O(log32 n).
+"""
+
+from collections.abc import Mapping
+from typing import Any, Iterator, Tuple
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 32
+_NOT_FOUND = object()
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & 0xFFFFFFFF
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count("1")
+
+
+class _Leaf:
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, key_hash: int, key: Any, value: Any):
+        self.hash = key_hash
+        self.key = key
+        self.value = value
+
+    def matches(self, key_hash: int, key: Any) -> bool:
+        return self.hash == key_hash and (self.key is key or self.key == key)
+
+
+class _CollisionNode:
+    """Leaves whose 32-bit hashes are identical."""
+    __slots__ = ("leaves",)
+
+    def __init__(self, leaves: Tuple[_Leaf, ...]):
+        self.leaves = leaves
+
+    def find(self, shift: int, key_hash: int, key: Any) -> Any:
+        for leaf in self.leaves:
+            if leaf.matches(key_hash, key):
+                return leaf.value
+        return _NOT_FOUND
+
+    def assoc(self, shift: int, new_leaf: _Leaf):
+        for i, leaf in enumerate(self.leaves):
+            if leaf.matches(new_leaf.hash, new_leaf.key):
+                if leaf.value is new_leaf.value:
+                    return self, False
+                return _CollisionNode(self.leaves[:i] + (new_leaf,) + self.leaves[i + 1:]), False
+        return _CollisionNode(self.leaves + (new_leaf,)), True
+
+    def dissoc(self, shift: int, key_hash: int, key: Any):
+        for i, leaf in enumerate(self.leaves):
+            if leaf.matches(key_hash, key):
+                remaining = self.leaves[:i] + self.leaves[i + 1:]
+                return _CollisionNode(remaining) if remaining else None
+        return self
+
+    def leaves_iter(self) -> Iterator[_Leaf]:
+        return iter(self.leaves)
+
+
+class _BitmapNode:
+    """Trie node holding only the occupied slots of its 32-way fan-out."""
+    __slots__ = ("bitmap", "array")
+
+    def __init__(self, bitmap: int, array: tuple):
+        self.bitmap = bitmap
+        self.array = array
+
+    def find(self, shift: int, key_hash: int, key: Any) -> Any:
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return _NOT_FOUND
+        item = self.array[_popcount(self.bitmap & (bit - 1))]
+        if isinstance(item, _Leaf):
+            return item.value if item.matches(key_hash, key) else _NOT_FOUND
+        return item.find(shift + _BITS, key_hash, key)
+
+    def _replace(self, index: int, item: Any) -> "_BitmapNode":
+        return _BitmapNode(self.bitmap, self.array[:index] + (item,) + self.array[index + 1:])
+
+    def assoc(self, shift: int, new_leaf: _Leaf):
+        bit = 1 << ((new_leaf.hash >> shift) & _MASK)
+        index = _popcount(self.bitmap & (bit - 1))
+        if not self.bitmap & bit:
+            return _BitmapNode(self.bitmap | bit, self.array[:index] + (new_leaf,) + self.array[index:]), True
+
+        item = self.array[index]
+        if isinstance(item, _Leaf):
+            if item.matches(new_leaf.hash, new_leaf.key):
+                if item.value is new_leaf.value:
+                    return self, False
+                return self._replace(index, new_leaf), False
+            return self._replace(index, _merge_leaves(shift + _BITS, item, new_leaf)), True
+
+        child, added = item.assoc(shift + _BITS, new_leaf)
+        if child is item:
+            return self, added
+        return self._replace(index, child), added
+
+    def dissoc(self, shift: int, key_hash: int, key: Any):
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return self
+        index = _popcount(self.bitmap & (bit - 1))
+        item = self.array[index]
+
+        if isinstance(item, _Leaf):
+            if not item.matches(key_hash, key):
+                return self
+            child = None
+        else:
+            child = item.dissoc(shift + _BITS, key_hash, key)
+            if child is item:
+                return self
+
+        if child is not None:
+            return self._replace(index, child)
+        if len(self.array) == 1:
+            return None
+        return _BitmapNode(self.bitmap & ~bit, self.array[:index] + self.array[index + 1:])
+
+    def leaves_iter(self) -> Iterator[_Leaf]:
+        for item in self.array:
+            if isinstance(item, _Leaf):
+                yield item
+            else:
+                yield from item.leaves_iter()
+
+
+def _merge_leaves(shift: int, first: _Leaf, second: _Leaf):
+    """Build the smallest subtree holding two leaves that collide at ``shift``."""
+    if shift >= _HASH_BITS:
+        return _CollisionNode((first, second))
+    first_bit = 1 << ((first.hash >> shift) & _MASK)
+    second_bit = 1 << ((second.hash >> shift) & _MASK)
+    if first_bit == second_bit:
+        return _BitmapNode(first_bit, (_merge_leaves(shift + _BITS, first, second),))
+    ordered = (first, second) if first_bit < second_bit else (second, first)
+    return _BitmapNode(first_bit | second_bit, ordered)
+
+
+class PersistentMap(Mapping):
+    """Immutable mapping. ``set``, ``delete`` and ``merge`` return new maps; the original never changes.
+
+    Only the map is immutable, not the values: a value is shared by every version that
+    holds it, so callers must treat stored values as read-only and bind a new object to
+    change one. Binding the very same object again is a no-op that returns this map.
+    """
+    __slots__ = ("_root", "_count")
+
+    def __init__(self, data: Any = None):
+        self._root = None
+        self._count = 0
+        if data:
+            merged = PersistentMap._empty().merge(data)
+            self._root, self._count = merged._root, merged._count
+
+    @staticmethod
+    def _empty() -> "PersistentMap":
+        return _EMPTY
+
+    @classmethod
+    def _make(cls, root, count: int) -> "PersistentMap":
+        instance = object.__new__(cls)
+        instance._root = root
+        instance._count = count
+        return instance
+
+    def __getitem__(self, key: Any) -> Any:
+        if self._root is None:
+            raise KeyError(key)
+        value = self._root.find(0, _hash(key), key)
+        if value is _NOT_FOUND:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if self._root is None:
+            return default
+        value = self._root.find(0, _hash(key), key)
+        return default if value is _NOT_FOUND else value
+
+    def __contains__(self, key: Any) -> bool:
+        return self._root is not None and self._root.find(0, _hash(key), key) is not _NOT_FOUND
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._root is not None:
+            for leaf in self._root.leaves_iter():
+                yield leaf.key
+
+    def items(self):
+        if self._root is not None:
+            return [(leaf.key, leaf.value) for leaf in self._root.leaves_iter()]
+        return []
+
+    def set(self, key: Any, value: Any) -> "PersistentMap":
+        """Return a new map with ``key`` bound to ``value`` (this map if ``value`` is already bound)."""
+        leaf = _Leaf(_hash(key), key, value)
+        if self._root is None:
+            return PersistentMap._make(_BitmapNode(1 << (leaf.hash & _MASK), (leaf,)), 1)
+        root, added = self._root.assoc(0, leaf)
+        if root is self._root:
+            return self
+        return PersistentMap._make(root, self._count + (1 if added else 0))
+
+    def delete(self, key: Any) -> "PersistentMap":
+        """Return a new map without ``key``. Missing keys are ignored."""
+        if self._root is None:
+            return self
+        root = self._root.dissoc(0, _hash(key), key)
+        if root is self._root:
+            return self
+        return PersistentMap._make(root, self._count - 1)
+
+    def merge(self, data: Any) -> "PersistentMap":
+        """Return a new map with every item of ``data`` applied on top of this one."""
+        result = self
+        items = data.items() if hasattr(data, "items") else data
+        for key, value in items:
+            result = result.set(key, value)
+        return result
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({self.to_dict()!r})"
+
+
+_EMPTY = PersistentMap._make(None, 0)
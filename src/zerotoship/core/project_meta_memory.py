@@ -13,6 +13,8 @@ from enum import Enum
 
 from pydantic import BaseModel, Field
 
+from .codec import get_codec
+
 
 class MemoryType(str, Enum):
     """Types of memory entries."""
@@ -60,13 +62,19 @@ class MemoryEntry:
     def from_dict(cls, data: Dict[str, Any]) -> 'MemoryEntry':
         """Create from dictionary."""
         data['tags'] = set(data.get('tags', []))
+        # Files written before the codec stored enums and timestamps as strings
+        data['type'] = MemoryType(data['type'])
+        data['priority'] = MemoryPriority(data['priority'])
+        for field in ('created_at', 'last_accessed'):
+            if isinstance(data.get(field), str):
+                data[field] = datetime.fromisoformat(data[field])
         return cls(**data)
 
 
 class ProjectMetaMemory(BaseModel):
     """Project meta memory configuration."""
     
-    memory_file_path: str = Field(default="data/project_memory.json", description="Memory file path")
+    memory_file_path: str = Field(default="data/project_memory.bin", description="Memory file path (codec-encoded)")
     max_entries_per_type: int = Field(default=1000, description="Maximum entries per memory type")
     memory_retention_days: int = Field(default=365, description="Memory retention in days")
     auto_cleanup: bool = Field(default=True, description="Enable automatic memory cleanup")
@@ -92,14 +100,19 @@ class ProjectMetaMemoryManager:
         self._load_memory()
     
     def _load_memory(self):
-        """Load memory from file."""
-        if not self.memory_file.exists():
-            self.logger.info("No existing memory file found. Starting fresh.")
-            return
+        """Load memory from file, falling back to a legacy ``.json`` file beside it."""
+        source = self.memory_file
+        if not source.exists():
+            legacy = source.with_suffix(".json")
+            if legacy == source or not legacy.exists():
+                self.logger.info("No existing memory file found. Starting fresh.")
+                return
+            # Read once; the next save writes the codec file and leaves the JSON untouched
+            self.logger.info(f"Loading legacy memory file {legacy}")
+            source = legacy
         
         try:
-            with open(self.memory_file, 'r') as f:
-                data = json.load(f)
+            data = get_codec().load(str(source), schema="project_memory")
             
             # Load entries
             for entry_data in data.get('entries', []):
@@ -138,7 +151,7 @@ class ProjectMetaMemoryManager:
             
             # Create backup if enabled
             if self.config.backup_enabled and self.memory_file.exists():
-                backup_file = self.memory_file.with_suffix('.backup.json')
+                backup_file = self.memory_file.with_suffix('.backup' + self.memory_file.suffix)
                 try:
                     if backup_file.exists():
                         backup_file.unlink()  # Remove existing backup
@@ -146,8 +159,7 @@ class ProjectMetaMemoryManager:
                 except Exception as e:
                     self.logger.warning(f"Failed to create backup: {str(e)}")
             
-            with open(self.memory_file, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            get_codec().dump(data, str(self.memory_file), schema="project_memory")
             
             self.logger.info(f"Saved {len(self.memory_entries)} memory entries")
             
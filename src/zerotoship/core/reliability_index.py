@@ -0,0 +1,135 @@
+"""
+ReliabilityIndex - Per-crew exponentially weighted success rates for CrewRouter.
+Scores are updated in O(1) as crews finish, rebuilt from ProjectMetaMemory at startup,
+and periodically snapshotted to disk so the rebuild only replays newer observations.
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from .project_meta_memory import MemoryType
+
+logger = logging.getLogger(__name__)
+
+RELIABILITY_METRIC = "crew_reliability"
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class ReliabilityIndex:
+    """EWMA success rate per crew: ``score = decay * score + (1 - decay) * outcome``."""
+
+    def __init__(self, decay: float = 0.95, prior: float = 0.5, path: Optional[str] = None,
+                 persist_interval: float = 60.0):
+        """Initialize the index.
+
+        Args:
+            decay: Weight kept by the previous score on each update (``reliability_decay``).
+            prior: Score of a crew with no observations.
+            path: JSON snapshot file; the index is memory-only when None.
+            persist_interval: Minimum seconds before ``persist_due`` asks for another snapshot.
+        """
+        self.decay = decay
+        self.prior = prior
+        self.path = path
+        self.persist_interval = persist_interval
+        self.scores: Dict[str, float] = {}
+        self.observations: Dict[str, int] = {}
+        self.as_of: Optional[datetime] = None
+        self._dirty = False
+        self._last_persist = time.monotonic()
+
+    def score(self, crew_name: str) -> float:
+        return self.scores.get(crew_name, self.prior)
+
+    def update(self, crew_name: str, outcome: float):
+        """Fold one observation in [0, 1] (1 = success) into the crew's score."""
+        self.scores[crew_name] = self.decay * self.score(crew_name) + (1 - self.decay) * outcome
+        self.observations[crew_name] = self.observations.get(crew_name, 0) + 1
+        self.as_of = datetime.now()
+        self._dirty = True
+
+    def load(self) -> bool:
+        """Restore the last snapshot; False if there is none."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable reliability snapshot {self.path}: {e}")
+            return False
+        self.scores = {name: float(score) for name, score in data.get("scores", {}).items()}
+        self.observations = {name: int(count) for name, count in data.get("observations", {}).items()}
+        self.as_of = _as_datetime(data.get("as_of"))
+        return True
+
+    def rebuild(self, project_meta_memory: Any) -> int:
+        """Load the snapshot, then replay newer ``crew_reliability`` metrics from memory.
+
+        Each metric's ``context["outcome"]`` (1.0 or 0.0 for one crew run, as ``update``
+        receives at runtime) is replayed. Metrics without one, written before outcomes were
+        recorded, carry a success ratio instead; it is clamped to [0, 1] and folded in as a
+        single fractional observation. Reads the manager's indexes directly;
+        ``get_memory_entries`` would touch and sort every stored entry. Returns the number
+        of observations replayed.
+        """
+        self.load()
+        observations: List[Tuple[datetime, str, float]] = []
+        entries = getattr(project_meta_memory, "memory_entries", None)
+        type_index = getattr(project_meta_memory, "type_index", None)
+        if isinstance(entries, dict) and isinstance(type_index, dict):
+            for entry_id in type_index.get(MemoryType.PERFORMANCE_METRIC, ()):
+                entry = entries.get(entry_id)
+                content = entry.content if entry else {}
+                if content.get("metric_name") != RELIABILITY_METRIC:
+                    continue
+                metric_context = content.get("context") or {}
+                crew_name = metric_context.get("crew_name")
+                created_at = _as_datetime(entry.created_at)
+                if not crew_name or created_at is None or (self.as_of and created_at <= self.as_of):
+                    continue
+                outcome = metric_context.get("outcome", content.get("value", self.prior))
+                observations.append((created_at, crew_name, min(1.0, max(0.0, float(outcome)))))
+
+        for created_at, crew_name, value in sorted(observations):
+            self.scores[crew_name] = self.decay * self.score(crew_name) + (1 - self.decay) * value
+            self.observations[crew_name] = self.observations.get(crew_name, 0) + 1
+            self.as_of = created_at
+        self._dirty = bool(observations)
+        logger.info(f"Reliability index rebuilt for {len(self.scores)} crews ({len(observations)} observations replayed)")
+        return len(observations)
+
+    def persist(self):
+        """Write the snapshot atomically (no-op without a path or changes)."""
+        self._last_persist = time.monotonic()
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "scores": self.scores,
+            "observations": self.observations,
+            "as_of": self.as_of.isoformat() if self.as_of else None,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def persist_due(self) -> bool:
+        """True when there are unsaved changes and ``persist_interval`` has passed since the last snapshot."""
+        return bool(self.path) and self._dirty and time.monotonic() - self._last_persist >= self.persist_interval
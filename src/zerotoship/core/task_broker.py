@@ -0,0 +1,248 @@
+"""
+Task brokers - Shared queues that let several ExecutorNodes split the work.
+Each node publishes to its own queue; idle nodes steal from the busiest one. A claimed
+task is held under a lease that its node renews with heartbeats, and leases that expire
+(the node stalled or died) are redelivered. Tasks and results cross the broker as codec
+payloads, so nothing in them refers to the submitting process.
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Deque, Optional, Set, Tuple
+
+from .codec import get_codec
+from .executor_errors import DeliveryFailed, TaskFailed
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BrokerTask:
+    """A crew run published to a broker.
+
+    Plain data only: ``context`` is the snapshot taken at ``context_version`` (blob
+    references stay references) and ``project_data`` is a copy, so the task survives
+    ``encode``/``decode`` on another host.
+    """
+    task_id: str
+    state: str
+    context: Dict[str, Any]
+    project_data: Dict[str, Any]
+    origin: str
+    deliveries: int = 0
+    context_version: Optional[int] = None
+
+    schema = "broker_task"
+
+    @classmethod
+    def create(cls, state: str, context: Any, project_data: Dict[str, Any], origin: str) -> "BrokerTask":
+        """Build a task from a live context snapshot (or mapping) and the project's data."""
+        data = context.to_dict() if hasattr(context, "to_dict") else dict(context or {})
+        return cls(str(uuid.uuid4()), state, data, dict(project_data), origin,
+                   context_version=getattr(context, "version", None))
+
+    @property
+    def project_id(self) -> str:
+        return str(self.project_data.get("id", "unknown"))
+
+    def encode(self) -> bytes:
+        return get_codec().encode(asdict(self), self.schema)
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "BrokerTask":
+        return cls(**get_codec().decode(payload, cls.schema))
+
+
+@dataclass
+class Lease:
+    """A node's time-limited claim on a task."""
+    lease_id: str
+    task: BrokerTask
+    node_id: str
+    expires_at: float
+    stolen: bool = False
+
+
+class TaskBroker(ABC):
+    """Interface every broker implements."""
+
+    @abstractmethod
+    async def register(self, node_id: str):
+        """Create the queue for a node joining the pool."""
+
+    @abstractmethod
+    async def publish(self, node_id: str, task: BrokerTask):
+        """Queue a task on ``node_id``'s queue."""
+
+    @abstractmethod
+    async def claim(self, node_id: str, lease_seconds: float, timeout: Optional[float] = None) -> Optional[Lease]:
+        """Lease the next task from the node's own queue, or steal one; None on timeout."""
+
+    @abstractmethod
+    async def heartbeat(self, lease: Lease, lease_seconds: float) -> bool:
+        """Extend a lease; False if it already expired and the task was redelivered."""
+
+    @abstractmethod
+    async def complete(self, lease: Lease, result: Any = None, error: Optional[BaseException] = None) -> bool:
+        """Store a task's result (or error) for its submitter; False if the lease is no longer held."""
+
+    @abstractmethod
+    async def release(self, lease: Lease):
+        """Give a task back unfinished (e.g. on shutdown) without counting it as a delivery."""
+
+    @abstractmethod
+    async def reap_expired(self, now: Optional[float] = None) -> int:
+        """Redeliver tasks whose leases expired; returns how many were found."""
+
+    @abstractmethod
+    async def wait_result(self, task_id: str) -> Any:
+        """Wait for a published task's result; raises TaskFailed or DeliveryFailed if it failed.
+
+        Results are retained for a while after completion, so waiting again (or from another
+        process) returns the same outcome; an unknown or expired ``task_id`` raises LookupError.
+        """
+
+    @abstractmethod
+    async def queue_lengths(self) -> Dict[str, int]:
+        """Number of tasks waiting on each node's queue."""
+
+
+class InMemoryBroker(TaskBroker):
+    """Broker for nodes sharing one event loop (tests, single-host deployments).
+
+    Nodes take from the head of their own queue and steal from the tail of the longest
+    other queue, so a thief takes the work its owner would reach last. Queues and results
+    hold encoded payloads, exactly what a networked broker would store.
+    """
+
+    def __init__(self, max_deliveries: int = 3, steal_threshold: int = 1, result_ttl: float = 300.0):
+        """
+        Args:
+            max_deliveries: Expired leases tolerated per task before its submitter gets DeliveryFailed.
+            steal_threshold: Minimum queue length a node must have before others steal from it.
+            result_ttl: Seconds a completed task's result stays available to ``wait_result``.
+        """
+        self.max_deliveries = max_deliveries
+        self.steal_threshold = steal_threshold
+        self.result_ttl = result_ttl
+        self._queues: Dict[str, Deque[bytes]] = {}
+        self._leases: Dict[str, Lease] = {}
+        self._pending: Set[str] = set()
+        self._results: Dict[str, Tuple[float, bytes]] = {}
+        self._available = asyncio.Condition()
+        self._finished = asyncio.Condition()
+        self.stolen = 0
+        self.redelivered = 0
+
+    async def register(self, node_id: str):
+        self._queues.setdefault(node_id, deque())
+
+    async def publish(self, node_id: str, task: BrokerTask):
+        payload = task.encode()
+        self._pending.add(task.task_id)
+        async with self._available:
+            self._queues.setdefault(node_id, deque()).append(payload)
+            self._available.notify_all()
+
+    def _take(self, node_id: str) -> Optional[bytes]:
+        own = self._queues.get(node_id)
+        if own:
+            return own.popleft()
+        victim = max((q for n, q in self._queues.items() if n != node_id), key=len, default=None)
+        if victim and len(victim) >= self.steal_threshold:
+            self.stolen += 1
+            return victim.pop()
+        return None
+
+    async def claim(self, node_id: str, lease_seconds: float, timeout: Optional[float] = None) -> Optional[Lease]:
+        async with self._available:
+            try:
+                await asyncio.wait_for(self._available.wait_for(lambda: self._take_ready(node_id)), timeout)
+            except asyncio.TimeoutError:
+                return None
+            task = BrokerTask.decode(self._take(node_id))
+            task.deliveries += 1
+            lease = Lease(uuid.uuid4().hex, task, node_id, time.monotonic() + lease_seconds,
+                          stolen=task.origin != node_id)
+            self._leases[lease.lease_id] = lease
+            return lease
+
+    def _take_ready(self, node_id: str) -> bool:
+        if self._queues.get(node_id):
+            return True
+        return any(q and len(q) >= self.steal_threshold for n, q in self._queues.items() if n != node_id)
+
+    async def heartbeat(self, lease: Lease, lease_seconds: float) -> bool:
+        held = self._leases.get(lease.lease_id)
+        if held is None:
+            return False
+        held.expires_at = time.monotonic() + lease_seconds
+        return True
+
+    async def complete(self, lease: Lease, result: Any = None, error: Optional[BaseException] = None) -> bool:
+        if self._leases.pop(lease.lease_id, None) is None:
+            logger.warning(f"Discarding result of task {lease.task.task_id} from {lease.node_id}: lease no longer held")
+            return False
+        if error is not None:
+            outcome = {"error": {"type": type(error).__name__, "message": str(error)}}
+        else:
+            outcome = {"result": result}
+        await self._finish(lease.task, outcome)
+        return True
+
+    async def _finish(self, task: BrokerTask, outcome: Dict[str, Any]):
+        outcome["state"] = task.state
+        payload = get_codec().encode(outcome, "broker_result")
+        async with self._finished:
+            self._pending.discard(task.task_id)
+            self._results[task.task_id] = (time.monotonic() + self.result_ttl, payload)
+            self._finished.notify_all()
+
+    async def _requeue(self, task: BrokerTask):
+        async with self._available:
+            self._queues.setdefault(task.origin, deque()).appendleft(task.encode())
+            self._available.notify_all()
+
+    async def release(self, lease: Lease):
+        if self._leases.pop(lease.lease_id, None) is not None:
+            lease.task.deliveries -= 1
+            await self._requeue(lease.task)
+
+    async def reap_expired(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        for task_id in [t for t, (expires_at, _) in self._results.items() if expires_at <= now]:
+            del self._results[task_id]
+        expired = [lease for lease in self._leases.values() if lease.expires_at <= now]
+        for lease in expired:
+            del self._leases[lease.lease_id]
+            task = lease.task
+            if task.deliveries >= self.max_deliveries:
+                logger.error(f"Task {task.task_id} for state {task.state} exhausted {task.deliveries} deliveries")
+                await self._finish(task, {"delivery_failed": task.deliveries})
+                continue
+            logger.warning(f"Lease on task {task.task_id} held by {lease.node_id} expired; redelivering")
+            self.redelivered += 1
+            await self._requeue(task)
+        return len(expired)
+
+    async def wait_result(self, task_id: str) -> Any:
+        # Waiting holds nothing per caller, so a cancelled waiter leaves no state behind
+        async with self._finished:
+            await self._finished.wait_for(lambda: task_id in self._results or task_id not in self._pending)
+            entry = self._results.get(task_id)
+        if entry is None:
+            raise LookupError(f"No pending task or retained result for task {task_id}")
+        outcome = get_codec().decode(entry[1], "broker_result")
+        if "delivery_failed" in outcome:
+            raise DeliveryFailed(task_id, outcome["state"], outcome["delivery_failed"])
+        if "error" in outcome:
+            raise TaskFailed(task_id, outcome["state"], outcome["error"]["type"], outcome["error"]["message"])
+        return outcome["result"]
+
+    async def queue_lengths(self) -> Dict[str, int]:
+        return {node_id: len(queue) for node_id, queue in self._queues.items()}
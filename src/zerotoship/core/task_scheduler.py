@@ -0,0 +1,163 @@
+"""
+TaskScheduler - Priority, concurrency-cap and fair-share ordering for DistributedExecutor.
+Tasks are served strictly by priority class; within a class, projects share workers in
+proportion to their weight (virtual-time fair queueing), and tasks whose state or crew is
+at its concurrency cap wait without blocking other work.
+"""
+
+import asyncio
+import itertools
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Deque, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CLASSES = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+DEFAULT_PRIORITY = PRIORITY_CLASSES["normal"]
+
+
+def resolve_priority(priority: Union[str, int, None], default: int = DEFAULT_PRIORITY) -> int:
+    """Map a priority class name (or a raw int, lower runs first) to its rank."""
+    if priority is None:
+        return default
+    if isinstance(priority, int):
+        return priority
+    try:
+        return PRIORITY_CLASSES[priority]
+    except KeyError:
+        raise ValueError(f"Unknown priority class '{priority}'. Expected one of {sorted(PRIORITY_CLASSES)}")
+
+
+@dataclass
+class ScheduledTask:
+    """A unit of work queued on the executor."""
+    task_id: str
+    state: str
+    context: Dict[str, Any]
+    project_data: Dict[str, Any]
+    future: asyncio.Future
+    priority: int = DEFAULT_PRIORITY
+    project_id: str = "unknown"
+    crew_names: Tuple[str, ...] = ()
+    seq: int = 0
+    vtime: float = 0.0
+    enqueued_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+@dataclass
+class _ProjectQueue:
+    weight: float
+    tasks: Deque[ScheduledTask] = field(default_factory=deque)
+    last_vtime: float = 0.0
+
+
+class TaskScheduler:
+    """Synchronous queue structure; the executor serializes access and wakes workers.
+
+    Concurrency caps are checked at dequeue time. When a state has several candidate
+    crews, the crew that will run is only chosen by CrewRouter, so such a task counts
+    against the cap of every candidate.
+    """
+
+    def __init__(self, state_limits: Optional[Dict[str, int]] = None,
+                 crew_limits: Optional[Dict[str, int]] = None):
+        self.state_limits = dict(state_limits or {})
+        self.crew_limits = dict(crew_limits or {})
+        self._queues: Dict[int, Dict[str, _ProjectQueue]] = {}
+        self._virtual_time: Dict[int, float] = {}
+        self._running_states: Dict[str, int] = {}
+        self._running_crews: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, task: ScheduledTask, weight: float = 1.0):
+        """Queue a task; ``weight`` is the project's share relative to other projects."""
+        projects = self._queues.setdefault(task.priority, {})
+        queue = projects.get(task.project_id)
+        if queue is None:
+            queue = projects[task.project_id] = _ProjectQueue(weight=max(weight, 1e-6))
+        else:
+            queue.weight = max(weight, 1e-6)
+        # A project that was idle starts at the current virtual time instead of banking credit
+        start = max(queue.last_vtime, self._virtual_time.get(task.priority, 0.0))
+        task.vtime = queue.last_vtime = start + 1.0 / queue.weight
+        task.seq = next(self._seq)
+        queue.tasks.append(task)
+        self._size += 1
+
+    def _admissible(self, task: ScheduledTask) -> bool:
+        limit = self.state_limits.get(task.state)
+        if limit is not None and self._running_states.get(task.state, 0) >= limit:
+            return False
+        for crew_name in task.crew_names:
+            limit = self.crew_limits.get(crew_name)
+            if limit is not None and self._running_crews.get(crew_name, 0) >= limit:
+                return False
+        return True
+
+    def pop(self) -> Optional[ScheduledTask]:
+        """Remove and return the next runnable task, or None if every queued task is capped."""
+        for priority in sorted(self._queues):
+            best: Optional[Tuple[float, int, _ProjectQueue, int]] = None
+            for queue in self._queues[priority].values():
+                for index, task in enumerate(queue.tasks):
+                    if self._admissible(task):
+                        if best is None or (task.vtime, task.seq) < best[:2]:
+                            best = (task.vtime, task.seq, queue, index)
+                        break
+            if best is not None:
+                _, _, queue, index = best
+                task = queue.tasks[index]
+                del queue.tasks[index]
+                self._size -= 1
+                self._virtual_time[priority] = max(self._virtual_time.get(priority, 0.0), task.vtime - 1.0 / queue.weight)
+                self._acquire(task)
+                self._prune(priority)
+                return task
+        return None
+
+    def shed(self, priority: int) -> Optional[ScheduledTask]:
+        """Remove and return the newest queued task of the lowest class strictly below ``priority``."""
+        lowest = max((p for p, projects in self._queues.items() if p > priority and any(q.tasks for q in projects.values())), default=None)
+        if lowest is None:
+            return None
+        queue = max((q for q in self._queues[lowest].values() if q.tasks), key=lambda q: q.tasks[-1].seq)
+        task = queue.tasks.pop()
+        queue.last_vtime -= 1.0 / queue.weight  # Refund the tail slot it had reserved
+        self._size -= 1
+        return task
+
+    def _prune(self, priority: int):
+        projects = self._queues[priority]
+        for project_id in [pid for pid, queue in projects.items() if not queue.tasks and queue.last_vtime <= self._virtual_time[priority]]:
+            del projects[project_id]
+        if not projects:
+            del self._queues[priority]
+            del self._virtual_time[priority]
+
+    def _acquire(self, task: ScheduledTask):
+        self._running_states[task.state] = self._running_states.get(task.state, 0) + 1
+        for crew_name in task.crew_names:
+            self._running_crews[crew_name] = self._running_crews.get(crew_name, 0) + 1
+
+    def release(self, task: ScheduledTask):
+        """Free the concurrency slots held by a task that finished running."""
+        self._running_states[task.state] -= 1
+        for crew_name in task.crew_names:
+            self._running_crews[crew_name] -= 1
+
+    def running(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "states": {k: v for k, v in self._running_states.items() if v},
+            "crews": {k: v for k, v in self._running_crews.items() if v},
+        }
+
+    def pending(self) -> List[ScheduledTask]:
+        return [task for projects in self._queues.values() for queue in projects.values() for task in queue.tasks]
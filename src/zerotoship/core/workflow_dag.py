@@ -0,0 +1,151 @@
+"""
+WorkflowDAG - Dependency graph compiled from a workflow sequence.
+Lets WorkflowEngine dispatch every state whose dependencies are satisfied concurrently.
+"""
+
+import logging
+import operator
+from typing import Dict, Any, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = {"COMPLETED", "ERROR", "FAILED"}
+
+OPERATORS = {
+    "==": operator.eq, "!=": operator.ne, ">": operator.gt,
+    ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+}
+
+
+class WorkflowDAG:
+    """States of a workflow sequence and the states each one depends on.
+
+    Every top-level step depends on all states of the step before it, so a
+    ``parallel`` block fans out from its predecessor and the following step
+    joins on every branch. A ``loop`` block is a single node named after its
+    ``state_prefix``; WorkflowEngine runs its ``sequence`` once per iteration
+    until its ``break_conditions`` hold or ``max_iterations`` is reached.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.loops: Set[str] = set()
+        self.terminal_state = "COMPLETED"
+
+    def __contains__(self, state: str) -> bool:
+        return state in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add_node(self, state: str, definition: Dict[str, Any], depends_on: List[str], loop: bool = False):
+        self.nodes[state] = definition
+        self.dependencies[state] = set(depends_on)
+        if loop:
+            self.loops.add(state)
+
+    def ready(self, done: Set[str], started: Set[str]) -> List[str]:
+        """States not yet started whose dependencies have all completed, in sequence order."""
+        return [
+            state for state in self.nodes
+            if state not in started and self.dependencies[state] <= done
+        ]
+
+    def ancestors(self, state: str) -> Set[str]:
+        """All states that must complete before ``state`` can run."""
+        seen: Set[str] = set()
+        stack = list(self.dependencies.get(state, ()))
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self.dependencies.get(current, ()))
+        return seen
+
+    def is_parallel(self) -> bool:
+        """True if at least two states share the same dependencies."""
+        groups = [frozenset(deps) for deps in self.dependencies.values()]
+        return len(groups) != len(set(groups))
+
+
+def _lookup(data: Dict[str, Any], field: str) -> Any:
+    """Value at a dotted (or slash-separated) path, or None if any segment is missing."""
+    value: Any = data
+    for segment in field.replace("/", ".").split("."):
+        if not isinstance(value, dict) or segment not in value:
+            return None
+        value = value[segment]
+    return value
+
+
+def evaluate_conditions(conditions: Optional[List[Dict[str, Any]]], data: Dict[str, Any]) -> bool:
+    """True if every condition holds for ``data``.
+
+    A condition is ``{field, operator, value}``, or ``{"all": [...]}`` / ``{"any": [...]}``
+    of conditions, as written in config/workflows.yaml. An empty list holds.
+    """
+    for condition in conditions or []:
+        if "all" in condition:
+            held = evaluate_conditions(condition["all"], data)
+        elif "any" in condition:
+            held = any(evaluate_conditions([c], data) for c in condition["any"])
+        else:
+            compare = OPERATORS.get(condition.get("operator", "=="))
+            if compare is None:
+                logger.warning(f"Unknown operator in condition {condition}")
+                return False
+            try:
+                held = compare(_lookup(data, condition.get("field", "")), condition.get("value"))
+            except TypeError:
+                held = False  # e.g. None > 0.8 while the field is still missing
+        if not held:
+            return False
+    return True
+
+
+def _step_states(step: Dict[str, Any]) -> List[tuple]:
+    """Return (state, definition) pairs for a single sequence step."""
+    if "parallel" in step:
+        return [(sub_step["state"], sub_step) for sub_step in step["parallel"] if "state" in sub_step]
+    if "loop" in step:
+        loop = step["loop"]
+        state = loop.get("state_prefix") or loop.get("state")
+        return [(state, loop)] if state else []
+    if "state" in step:
+        return [(step["state"], step)]
+    return []
+
+
+def compile_workflow_dag(sequence: Optional[List[Dict[str, Any]]]) -> WorkflowDAG:
+    """Compile a ``workflow_sequence`` (as declared in config/workflows.yaml) into a WorkflowDAG.
+
+    Args:
+        sequence: List of sequence steps; each is a ``state``, ``parallel`` or ``loop`` entry.
+
+    Returns:
+        The compiled WorkflowDAG. Compilation stops at the first terminal state.
+    """
+    dag = WorkflowDAG()
+    previous: List[str] = []
+
+    for step in sequence or []:
+        if not isinstance(step, dict):
+            continue
+        states = _step_states(step)
+        terminal = [state for state, _ in states if state in TERMINAL_STATES]
+        if terminal:
+            dag.terminal_state = terminal[0]
+            break
+
+        group = []
+        for state, definition in states:
+            if state in dag:
+                logger.warning(f"State {state} appears more than once in workflow sequence; keeping first occurrence.")
+                continue
+            dag.add_node(state, definition, previous, loop="loop" in step)
+            group.append(state)
+        if group:
+            previous = group
+
+    return dag
@@ -2,16 +2,24 @@ import logging
 import time
 import yaml
 import asyncio
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from .context_bus import ContextBus
 from .learning_memory import LearningMemory
 from .temporal_memory import TemporalMemory
 from .distributed_executor import DistributedExecutor
 from .project_meta_memory import ProjectMetaMemoryManager, MemoryType
+from .workflow_dag import WorkflowDAG, compile_workflow_dag, evaluate_conditions
+from ..database.checkpoint_store import CheckpointStore
 from ..utils.context_exporter import export_context_to_graph
 
+if TYPE_CHECKING:
+    from ..utils.budget_store import BudgetStore
+
 logger = logging.getLogger(__name__)
 
+# Newest events copied into checkpoints and the project output; the full log stays on the bus
+HISTORY_TAIL = 100
+
 def _estimate_cost(token_usage: int) -> float:
     """A placeholder function to estimate cost based on token usage."""
     # This is a simplified estimation. A real implementation would be more complex.
@@ -19,7 +27,7 @@ def _estimate_cost(token_usage: int) -> float:
     return (token_usage / 1000) * 0.002 # A sample rate of $0.002 per 1K tokens
 
 class WorkflowEngine:
-    def __init__(self, project_data: Dict[str, Any], registry=None, crew_router=None, metrics: Optional[Dict[str, Any]] = None, memory: Optional[LearningMemory] = None, context_bus: Optional[ContextBus] = None, project_meta_memory: Optional[ProjectMetaMemoryManager] = None, executor: Optional[DistributedExecutor] = None):
+    def __init__(self, project_data: Dict[str, Any], registry=None, crew_router=None, metrics: Optional[Dict[str, Any]] = None, memory: Optional[LearningMemory] = None, context_bus: Optional[ContextBus] = None, project_meta_memory: Optional[ProjectMetaMemoryManager] = None, executor: Optional[DistributedExecutor] = None, checkpoint_store: Optional[CheckpointStore] = None, budget_store: Optional["BudgetStore"] = None):
         self.project_data = project_data
         self.registry = registry
         self.crew_router = crew_router
@@ -30,6 +38,11 @@ class WorkflowEngine:
         self.executor = executor
         self.temporal_memory = TemporalMemory() # For recording events for replay
         self.total_cost = 0
+        # F2: Per-state checkpoints; fall back to the registry's store when one is configured
+        self.checkpoint_store = checkpoint_store or getattr(registry, "checkpoint_store", None)
+        self.completed_states = set()
+        self.external_data_states = set()  # States that already fetched external data
+        self.budget_store = budget_store
         
         # Load adaptive config
         try:
@@ -95,6 +108,9 @@ class WorkflowEngine:
         max_iterations = 20  # Safety limit to prevent infinite loops
         iterations = 0
 
+        # F1: Compile parallel sequences into a DAG so independent states run concurrently
+        dag = compile_workflow_dag(self.project_data.get("workflow_sequence"))
+
         while iterations < max_iterations:
             current_state = self.project_data.get("state", "UNKNOWN")
 
@@ -106,6 +122,10 @@ class WorkflowEngine:
                     self.metrics["workflow_state"].labels(state=current_state).set(1)
                 break
 
+            if self.executor and dag.is_parallel() and current_state in dag:
+                iterations += await self._run_dag(dag, max_iterations - iterations)
+                continue
+
             await self.route_and_execute()
             iterations += 1
 
@@ -132,9 +152,10 @@ class WorkflowEngine:
         })
 
         # B5: Add final context snapshot to project output
-        final_context = await self.context.snapshot()
+        final_context = (await self.context.snapshot()).to_dict()
         self.project_data["final_context"] = final_context
-        self.project_data["event_history"] = await self.context.get_history()
+        self.project_data["event_history"] = await self.context.get_history(limit=HISTORY_TAIL)
+        self.project_data["event_count"] = self.context.history_length()
         logger.info(f"📊 Final context has {await self.context.size()} keys")
 
         # B8: Persist context snapshot if registry is available
@@ -159,6 +180,48 @@ class WorkflowEngine:
 
         return self.project_data
 
+    async def resume(self, project_id: Optional[str] = None) -> Dict[str, Any]:
+        """Resume a workflow from its last committed checkpoint.
+
+        Restores project_data, the ContextBus snapshot and the newest events of its history,
+        then continues the run from the checkpointed state without re-running finished crews.
+        """
+        if not self.checkpoint_store:
+            raise RuntimeError("No checkpoint store configured; cannot resume.")
+
+        project_id = project_id or self.project_data.get("id")
+        checkpoint = await self.checkpoint_store.load(project_id)
+        if not checkpoint:
+            raise ValueError(f"No checkpoint found for project {project_id}")
+
+        self.project_data.clear()
+        self.project_data.update(checkpoint.get("project_data", {}))
+        await self.context.restore(checkpoint.get("context", {}), checkpoint.get("history", []),
+                                   history_length=checkpoint.get("history_length"))
+        self.completed_states = set(checkpoint.get("completed_states", []))
+        self.total_cost = checkpoint.get("total_cost", 0)
+        logger.info(f"♻️ Resuming project {project_id} from state {self.project_data.get('state')} ({len(self.completed_states)} states already completed)")
+
+        return await self.run()
+
+    async def _save_checkpoint(self):
+        """Persist project data, context and the history tail so the run can be resumed from here."""
+        if not self.checkpoint_store:
+            return
+        project_id = self.project_data.get("id", "unknown")
+        try:
+            await self.checkpoint_store.save(project_id, {
+                "state": self.project_data.get("state"),
+                "project_data": self.project_data,
+                "context": (await self.context.snapshot()).to_dict(),
+                "history": await self.context.get_history(limit=HISTORY_TAIL),
+                "history_length": self.context.history_length(),
+                "completed_states": sorted(self.completed_states),
+                "total_cost": self.total_cost,
+            })
+        except Exception as e:
+            logger.error(f"Failed to save checkpoint for {project_id}: {e}")
+
     async def _reconfigure_workflow(self):
         """Dynamically reconfigures the workflow based on memory and reliability."""
         idea = self.project_data.get("idea", "")
@@ -166,19 +229,92 @@ class WorkflowEngine:
         
         if entry and entry["reliability_score"] > 0.8:
             sequence = self.project_data.get("workflow_sequence", [])
-            if "VALIDATION" in [step['state'] for step in sequence]:
+            if "VALIDATION" in [step.get('state') for step in sequence]:
                 logger.info("📈 High reliability score detected. Skipping VALIDATION step.")
-                self.project_data["workflow_sequence"] = [step for step in sequence if step['state'] != "VALIDATION"]
+                self.project_data["workflow_sequence"] = [step for step in sequence if step.get('state') != "VALIDATION"]
 
     def _get_next_state_from_sequence(self, current_state: str) -> str:
         """Gets the next state from the workflow sequence."""
         sequence = self.project_data.get("workflow_sequence", [])
         try:
-            current_index = [i for i, step in enumerate(sequence) if step['state'] == current_state][0]
+            current_index = [i for i, step in enumerate(sequence) if step.get('state') == current_state][0]
             return sequence[current_index + 1]['state']
-        except (IndexError, ValueError):
+        except (IndexError, ValueError, KeyError):
             return "COMPLETED"
 
+    async def _run_dag(self, dag: WorkflowDAG, max_states: int) -> int:
+        """Dispatch every ready DAG state concurrently through the executor.
+
+        A state whose ``conditions`` do not hold when it becomes ready is skipped and counts
+        as done for the states after it; the others run with their step's ``timeout`` and
+        ``retry_attempts``. Results are merged into project_data and the ContextBus as each
+        state lands. Returns the number of states executed.
+        """
+        done = dag.ancestors(self.project_data.get("state")) | (self.completed_states & set(dag.nodes))
+        started = set(done)
+        pending: Dict[asyncio.Task, str] = {}
+        executed = 0
+        halted = False
+
+        try:
+            while True:
+                ready = [] if halted else dag.ready(done, started)
+                while ready:
+                    state = ready.pop(0)
+                    if executed + len(pending) >= max_states:
+                        break
+                    definition = dag.nodes[state]
+                    started.add(state)
+                    if not evaluate_conditions(definition.get("conditions"), self.project_data):
+                        logger.info(f"⏭️ Skipping DAG state {state}: conditions not met")
+                        await self.context.record(f"{state}_skipped", {"conditions": definition.get("conditions")})
+                        done.add(state)
+                        self.completed_states.add(state)
+                        ready = dag.ready(done, started)  # Its dependents may now be ready
+                        continue
+                    logger.info(f"🔀 Dispatching DAG state: {state}")
+                    if "workflow_state" in self.metrics:
+                        self.metrics["workflow_state"].labels(state=state).set(1)
+                    self.project_data["state"] = state
+                    if state in dag.loops:
+                        coroutine = self._execute_loop(state, definition)
+                    else:
+                        coroutine = self._execute_state(state, definition)
+                    pending[asyncio.create_task(coroutine)] = state
+
+                if not pending:
+                    break
+
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    state = pending.pop(task)
+                    result = task.result()
+                    executed += 1
+                    if result.get("status") == "success":
+                        done.add(state)
+                        self.completed_states.add(state)
+                        await self._save_checkpoint()
+                    else:
+                        halted = True
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if not halted:
+            if len(done) == len(dag):
+                self.project_data["state"] = dag.terminal_state
+                await self._save_checkpoint()
+            else:
+                unfinished = ", ".join(state for state in dag.nodes if state not in done)
+                if executed >= max_states:
+                    message = f"Workflow reached its limit of {max_states} states with unfinished states: {unfinished}"
+                else:
+                    message = f"Workflow stopped with unfinished states whose dependencies never completed: {unfinished}"
+                logger.error(f"⚠️ {message}")
+                self.project_data["state"] = "ERROR"
+                self.project_data["message"] = message
+        return executed
+
     async def route_and_execute(self) -> Dict[str, Any]:
         """Route to the correct state handler."""
         state = self.project_data.get("state", "UNKNOWN")
@@ -189,54 +325,87 @@ class WorkflowEngine:
             self.metrics["workflow_state"].labels(state=state).set(1)
 
         handler = self.state_handlers.get(state)
-        if handler:
-            return await handler()
-        else:
+        if not handler:
             logger.warning(f"Unknown state: {state}")
             self.project_data["state"] = "ERROR"
             self.project_data["message"] = f"Unknown state: {state}"
             return self.project_data
 
+        await handler()
+
+        # F2: Checkpoint every committed transition so a crashed worker resumes from the next state
+        next_state = self.project_data.get("state")
+        if next_state != state and next_state not in ("FAILED", "ERROR", "RECOVERY"):
+            self.completed_states.add(state)
+            await self._save_checkpoint()
+        return self.project_data
+
     # === State Handlers ===
 
-    async def _execute_crew_with_feedback(self, state_name: str) -> Dict[str, Any]:
-        """Execute a crew with retry logic and record feedback."""
-        # E3: Fetch and merge external data before crew execution
-        await self.context.fetch_and_merge_external_data()
+    async def _execute_crew_with_feedback(self, state_name: str, project_data: Optional[Dict[str, Any]] = None,
+                                          timeout: Optional[float] = None, retry_attempts: Optional[int] = None) -> Dict[str, Any]:
+        """Execute a crew with retry logic and record feedback.
+
+        ``timeout`` bounds each attempt in seconds and ``retry_attempts`` overrides the
+        adaptive ``retry_limit``, as a workflow step's settings do.
+        """
+        # E3: Fetch and merge external data before crew execution (once per state, not per retry)
+        if state_name not in self.external_data_states:
+            self.external_data_states.add(state_name)
+            await self.context.fetch_and_merge_external_data()
 
+        if project_data is None:
+            project_data = self.project_data
         context_snapshot = await self.context.snapshot()
-        context_snapshot.update(self.project_data)
+        context_snapshot.update(project_data)
 
-        max_retries = self.adaptive_config.get("retry_limit", 3)
+        max_retries = retry_attempts or self.adaptive_config.get("retry_limit", 3)
         
         for attempt in range(max_retries):
             start_time = time.time()
-            result, selected_crew_name = await self.executor.schedule(state_name, context_snapshot, self.project_data)
+            if self.executor:
+                run = self.executor.schedule(state_name, context_snapshot, project_data)
+            else:
+                run = self.crew_router.execute(state_name, context_snapshot, project_data)
+            try:
+                result, selected_crew_name = await asyncio.wait_for(run, timeout)
+            except asyncio.TimeoutError:
+                # Cancelling the wait cancels the run; no crew reported back to charge it to
+                result = {"status": "error", "message": f"{state_name} timed out after {timeout}s"}
+                selected_crew_name = "unknown"
             duration = time.time() - start_time
             status = result.get("status", "error")
+            if status == "skipped":
+                # No crew is registered for the state; retrying cannot help
+                logger.error(f"❌ No crew registered for {state_name}")
+                return {**result, "status": "error", "error_category": "permanent"}
 
             feedback = { "status": status, "duration_seconds": duration, "error_type": result.get("message") if status != "success" else None }
             
             # Store feedback history for each attempt
             feedback_history_key = f"{state_name}_feedback_history"
-            history = await self.context.get(feedback_history_key) or []
-            history.append(feedback)
+            # A new list, so earlier snapshots keep their history and subscribers get a delta
+            history = [*(await self.context.get(feedback_history_key) or []), feedback]
             await self.context.set(feedback_history_key, history)
 
-            # E2: Store crew reliability in ProjectMetaMemory
+            # E2: Store crew reliability in ProjectMetaMemory; the per-run outcome is what
+            # ReliabilityIndex.rebuild replays, the ratio is the state's success rate so far
             if self.project_meta_memory:
                 successes = len([item for item in history if item["status"] == "success"])
                 reliability_score = successes / len(history) if history else 0.5
                 self.project_meta_memory.add_performance_metric(
                     "crew_reliability", 
                     reliability_score, 
-                    {"crew_name": selected_crew_name}
+                    {"crew_name": selected_crew_name, "outcome": 1.0 if status == "success" else 0.0}
                 )
 
-            # E5: Cost Optimization Metrics
-            token_usage = result.get("token_usage", 0)
+            # E5: Cost Optimization Metrics (cache hits cost nothing)
+            is_cache_hit = bool(result.get("cache_hit"))
+            token_usage = 0 if is_cache_hit else result.get("token_usage", 0)
             cost = _estimate_cost(token_usage)
             self.total_cost += cost
+            if self.budget_store:
+                await self._record_budget_usage(selected_crew_name, token_usage, cost, is_cache_hit)
             if "crew_cost_usd_total" in self.metrics:
                 self.metrics["crew_cost_usd_total"].labels(crew_name=selected_crew_name).observe(cost)
             
@@ -270,6 +439,77 @@ class WorkflowEngine:
         
         return result
 
+    async def _record_budget_usage(self, crew_name: str, token_usage: int, cost: float, is_cache_hit: bool):
+        """Charge a crew attempt to the BudgetStore under the project's scope."""
+        from ..utils.budget_store import UsageRecord
+
+        record = UsageRecord(
+            scope=self.project_data.get("id", "global"),
+            model=crew_name or "unknown",
+            tokens_input=token_usage,
+            cost_usd=cost,
+            is_cache_hit=is_cache_hit,
+            provider="crew",
+        )
+        within_budget = await asyncio.to_thread(self.budget_store.record_usage, record)
+        if not within_budget:
+            logger.warning(f"💸 Budget exceeded for project {record.scope} after {crew_name}")
+
+    async def _execute_state(self, state_name: str, definition: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute a single DAG state and merge its output without advancing the workflow state.
+
+        ``definition`` is the state's workflow step; its ``timeout`` and ``retry_attempts`` apply.
+        """
+        if not self.crew_router:
+            logger.error(f"❌ No CrewRouter configured; cannot run {state_name}.")
+            self.project_data["state"] = "FAILED"
+            self.project_data["message"] = f"{state_name} has no crew (no crew router)"
+            return {"status": "error", "message": self.project_data["message"]}
+
+        # Each concurrent crew gets its own shallow copy so it sees its own state
+        definition = definition or {}
+        result = await self._execute_crew_with_feedback(state_name, dict(self.project_data, state=state_name),
+                                                        timeout=definition.get("timeout"),
+                                                        retry_attempts=definition.get("retry_attempts"))
+        status = result.get("status")
+
+        if status == "success":
+            if "data" in result:
+                self.project_data.update(result["data"])
+                await self.context.merge(result["data"])
+            self.project_data["message"] = result.get("message", f"{state_name} completed.")
+            await self.context.record(f"{state_name}_executed", result)
+        elif self.project_data.get("state") != "RECOVERY":
+            logger.error(f"❌ Error in {state_name}: {result.get('message')}")
+            self.project_data["state"] = "FAILED"
+            self.project_data["message"] = result.get("message", f"{state_name} failed")
+            await self.context.record(f"{state_name}_failed", result)
+
+        return result
+
+    async def _execute_loop(self, state_name: str, loop: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a loop node's sequence once per iteration until its break conditions hold.
+
+        Without a ``sequence`` the loop runs the crew registered for ``state_name`` itself.
+        """
+        steps = [step for step in loop.get("sequence", []) if "state" in step] or [{"state": state_name}]
+        break_conditions = loop.get("break_conditions")
+        max_iterations = loop.get("max_iterations", 3)
+
+        for iteration in range(1, max(1, max_iterations) + 1):
+            for step in steps:
+                result = await self._execute_state(step["state"], step)
+                if result.get("status") != "success":
+                    return result
+            await self.context.record(f"{state_name}_iteration", {"iteration": iteration, "states": [step["state"] for step in steps]})
+            if break_conditions and evaluate_conditions(break_conditions, self.project_data):
+                logger.info(f"🔁 {state_name} break conditions met after {iteration} iteration(s)")
+                break
+
+        message = f"{state_name} finished after {iteration} iteration(s)"
+        self.project_data["message"] = message
+        return {"status": "success", "message": message, "iterations": iteration}
+
     async def handle_idea_validation(self) -> Dict[str, Any]:
         logger.info("💡 [WorkflowEngine] Entering IDEA_VALIDATION state")
         if self.crew_router:
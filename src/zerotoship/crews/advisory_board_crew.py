@@ -4,6 +4,7 @@ Orchestrates interactive idea refinement with market insights and user focus.
 """
 
 import asyncio
+from functools import cached_property
 from typing import Dict, Any, Optional
 from crewai import Crew, Process, Task, Agent
 from pydantic import BaseModel, Field
@@ -22,12 +23,17 @@ class AdvisoryBoardCrewConfig(BaseModel):
 
 class AdvisoryBoardCrew(BaseCrew):
     """Advisory Board Crew that interactively refines a user's idea."""
+
+    input_paths = ("idea", "context")
     
     def __init__(self, project_data: Dict[str, Any], config: Optional[AdvisoryBoardCrewConfig] = None):
         """Initialize the Advisory Board Crew with project data and config."""
         super().__init__(project_data)
         self.config = config or AdvisoryBoardCrewConfig()
-        self.memory_manager = ProjectMetaMemoryManager()
+
+    @cached_property
+    def memory_manager(self) -> ProjectMetaMemoryManager:
+        return ProjectMetaMemoryManager()
 
     def _create_crew(self) -> Crew:
         """Create the Advisory Board Crew with agents and tasks."""
@@ -1,7 +1,8 @@
 """Base Crew class for tractionbuild. Provides a standardized interface for all crews to ensure consistent method signatures and proper data flow between the WorkflowEngine and crew implementations, with advanced features like retry logic, sustainability tracking, and state management."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from functools import cached_property
+from typing import Dict, Any, Optional, Tuple
 from crewai import Crew
 import logging
 from datetime import datetime
@@ -22,28 +23,40 @@ except ImportError:
 
 # Sustainability tracking
 try:
-    from codecarbon import EmissionsTracker
     from ..tools.sustainability_tool import SustainabilityTrackerTool
 except ImportError:
-    class EmissionsTracker:
-        def __init__(self, *args, **kwargs):
-            pass
-        def start(self):
-            pass
-        def stop(self):
-            return 0.0
     SustainabilityTrackerTool = None
+from ..core.emissions_sampler import get_emissions_sampler
+from ..core.input_projection import project_for_crew
 
 # Import custom modules
 from ..core.output_serializer import output_serializer
 from ..models.crew_output import CrewOutputValidator
 from ..security.vault_client import VaultClient
+from ..security.audit_sink import get_audit_sink
 
 logger = logging.getLogger(__name__)
 
+# Context handed to crews that do not declare input_paths
+DEFAULT_CONTEXT_PATHS = ("idea", "validation", "marketing", "launch", "build", "feedback")
+
+
 class BaseCrew(ABC):
     """An abstract base class for all crews in tractionbuild. It standardizes the run_async method signature and ensures that crews are instantiated with the necessary project context, with advanced features for reliability and compliance."""
 
+    # Context fields that determine this crew's output; used to key the crew result cache.
+    # Bump cache_version whenever prompts, agents or tasks change.
+    cache_inputs = ("idea", "workflow", "validation", "marketing", "launch", "build", "feedback")
+    cache_version = "1"
+    # Backend the crew runs on: "asyncio", "thread" (blocking kickoff) or "process" (CPU-bound).
+    execution_backend = "asyncio"
+    # Instances may be kept warm by CrewRouter and reused for later runs of any project;
+    # reset() drops the agents and tasks, so only clients and tooling stay warm.
+    reusable = True
+    # Context paths (dpath globs) the crew reads; runs receive only these plus the framework
+    # fields, and they replace cache_inputs as the cache key. None passes the whole project.
+    input_paths: Optional[Tuple[str, ...]] = None
+
     def __init__(self, project_data: Dict[str, Any]):
         """Initializes the crew with the current project data.
         
@@ -51,11 +64,69 @@ class BaseCrew(ABC):
             project_data: The full, current state of the project.
         """
         self.project_data = project_data
-        self.crew = self._create_crew()
-        self.vault_client = VaultClient()  # Vault for audit and secrets
-        self.sustainability_tracker = SustainabilityTrackerTool() if SustainabilityTrackerTool else None
+        self._active_runs = 0
         logger.info(f"Initialized {self.__class__.__name__} with project data")
 
+    # Construction is staged: __init__ only records the project data, while agents, tasks,
+    # LLM clients and tooling are built on first use (normally the first run_async) and memoized.
+
+    @cached_property
+    def crew(self) -> Crew:
+        """The CrewAI crew, built by ``_create_crew`` on first access."""
+        crew = self._create_crew()
+        logger.info(f"Materialized {self.__class__.__name__} agents and tasks")
+        return crew
+
+    @cached_property
+    def vault_client(self) -> VaultClient:
+        """Vault for audit and secrets."""
+        return VaultClient()
+
+    @cached_property
+    def sustainability_tracker(self) -> Optional[Any]:
+        return SustainabilityTrackerTool() if SustainabilityTrackerTool else None
+
+    @property
+    def materialized(self) -> bool:
+        """Whether the crew's agents and tasks have been built."""
+        return 'crew' in self.__dict__
+
+    def materialize(self) -> Crew:
+        """Build the crew now (e.g. to warm a pooled instance) instead of on first run."""
+        return self.crew
+
+    def reset(self, project_data: Dict[str, Any]) -> None:
+        """Prepare a pooled instance for another run, of this or another project.
+
+        ``_create_crew`` bakes the project context into the task descriptions, so the crew is
+        dropped and rebuilt on the next run; cached clients and tooling are kept.
+
+        Args:
+            project_data: The project data for the upcoming run.
+        """
+        self.project_data = project_data
+        self.__dict__.pop('crew', None)
+        self.__dict__.pop('_retry_attempt', None)
+
+    def healthy(self) -> bool:
+        """Whether a pooled instance can be reused; subclasses may also check their own clients.
+
+        An instance is unfit while a run is in progress on it, when its crew was built
+        without agents or tasks, or once one of its cached clients reports itself closed.
+
+        Returns:
+            True if the instance is fit for another run
+        """
+        if self._active_runs:
+            return False
+        if self.materialized and not (getattr(self.crew, 'agents', None) and getattr(self.crew, 'tasks', None)):
+            return False
+        for name in ('vault_client', 'sustainability_tracker'):
+            client = self.__dict__.get(name)
+            if client is not None and getattr(client, 'closed', False):
+                return False
+        return True
+
     @abstractmethod
     def _create_crew(self) -> Crew:
         """Subclasses must implement this method to define their agents and tasks and return an instantiated CrewAI Crew object.
@@ -91,7 +162,11 @@ class BaseCrew(ABC):
             self.project_data.update(context)
 
         # Execute the crew
-        result = await self.run_async()
+        self._active_runs += 1
+        try:
+            result = await self.run_async()
+        finally:
+            self._active_runs -= 1
 
         # Normalize the response to standard format
         status = "error" if result.get("execution_metadata", {}).get("status") == "error" else "success"
@@ -123,20 +198,11 @@ class BaseCrew(ABC):
         Returns:
             A dictionary containing the crew's results, properly serialized and enhanced with metadata.
         """
+        # The process-wide sampler attributes energy to this run from its start and end times
         tracker = None
         try:
-            if os.getenv('CODECARBON_ENABLED', 'false').lower() == 'true' and self.sustainability_tracker:
-                project_name = os.getenv('CODECARBON_PROJECT_NAME', f'tractionbuild_{self.__class__.__name__}')
-                tracker = EmissionsTracker(
-                    project_name=project_name,
-                    measure_power_secs=15,
-                    save_to_file=False,
-                    logging_logger=logger
-                )
-                tracker.start()
-                logger.info(f"Carbon tracking started for {self.__class__.__name__}")
-        except ImportError:
-            logger.debug("CodeCarbon not available - sustainability tracking disabled")
+            if os.getenv('CODECARBON_ENABLED', 'false').lower() == 'true':
+                tracker = get_emissions_sampler().begin()
         except Exception as e:
             logger.warning(f"Failed to initialize carbon tracking: {e}")
 
@@ -145,6 +211,7 @@ class BaseCrew(ABC):
 
         try:
             logger.info(f"Starting {self.__class__.__name__} execution (attempt with retry logic)")
+            self.materialize()
             crew_inputs = self._prepare_crew_inputs()
             result = await self._execute_crew(crew_inputs)
 
@@ -152,17 +219,16 @@ class BaseCrew(ABC):
             energy_consumed = 0.0
             if tracker:
                 try:
-                    emissions = tracker.stop()
-                    energy_consumed = getattr(tracker, 'energy_consumed', 0.0)
+                    usage = get_emissions_sampler().end(tracker)
+                    emissions, energy_consumed = usage.co2_emissions_kg, usage.energy_consumed_kwh
                     logger.info(f"{self.__class__.__name__} carbon footprint: {emissions:.6f} kg CO2e")
                 except Exception as e:
                     logger.warning(f"Failed to stop carbon tracking: {e}")
 
-            serialized_result = output_serializer.serialize_crew_output(result, project_id)
-            if not output_serializer.validate_serialization(result, serialized_result):
+            content, serialized_result = output_serializer.serialize_with_content(result, project_id)
+            if not output_serializer.validate_serialization(result, serialized_result, content):
                 logger.warning(f"Serialization validation failed for {self.__class__.__name__}")
 
-            content = serialized_result.get('content', {})
             primary_content = content.get('primary_content', content.get('raw', str(result)))
             output_key = self._get_output_key()
             next_state = self._determine_next_state()
@@ -204,7 +270,7 @@ class BaseCrew(ABC):
             emissions = 0.0
             if tracker:
                 try:
-                    emissions = tracker.stop()
+                    emissions = get_emissions_sampler().end(tracker).co2_emissions_kg
                 except Exception:
                     pass
 
@@ -251,23 +317,27 @@ class BaseCrew(ABC):
 
     def get_project_context(self) -> Dict[str, Any]:
         """Get the current project context for use in crew tasks.
-        
+
+        Holds the bookkeeping fields plus the top-level keys of the crew's ``input_paths``
+        (every phase output for crews that declare none). Reads go through ``get``, so in
+        CREW_INPUT_DEBUG mode the InputGuard reports any the crew did not declare.
+
         Returns:
             A dictionary containing relevant project context
         """
-        return {
-            "idea": self.project_data.get("idea", ""),
+        context = {
             "project_id": self.project_data.get("id", ""),
             "current_state": self.project_data.get("state", ""),
             "workflow": self.project_data.get("workflow", ""),
             "user_id": self.project_data.get("user_id", ""),
             "created_at": self.project_data.get("created_at", ""),
-            "validation": self.project_data.get("validation", {}),
-            "marketing": self.project_data.get("marketing", {}),
-            "launch": self.project_data.get("launch", {}),
-            "build": self.project_data.get("build", {}),
-            "feedback": self.project_data.get("feedback", {}),
         }
+        paths = self.input_paths if self.input_paths is not None else DEFAULT_CONTEXT_PATHS
+        for path in paths:
+            key = path.split("/", 1)[0]
+            if key not in context:
+                context[key] = self.project_data.get(key, "" if key == "idea" else {})
+        return context
 
     def update_project_data(self, updates: Dict[str, Any]) -> None:
         """Update the project data with new information. This is useful for crews that need to modify project state.
@@ -289,19 +359,21 @@ class BaseCrew(ABC):
             "project_id": self.project_data.get("id", ""),
             "current_state": self.project_data.get("state", ""),
             "output_key": self._get_output_key(),
-            "agents_count": len(self.crew.agents) if hasattr(self.crew, 'agents') else 0,
-            "tasks_count": len(self.crew.tasks) if hasattr(self.crew, 'tasks') else 0,
+            "materialized": self.materialized,
+            # Counts are only reported once built; inspecting a crew should not construct it
+            "agents_count": len(self.crew.agents) if self.materialized and hasattr(self.crew, 'agents') else 0,
+            "tasks_count": len(self.crew.tasks) if self.materialized and hasattr(self.crew, 'tasks') else 0,
         }
 
     def _prepare_crew_inputs(self) -> Dict[str, Any]:
         """Prepare inputs for crew execution, ensuring all data is serializable.
         
         Returns:
-            Serialized project data safe for crew input
+            Serialized project data (projected to ``input_paths``) safe for crew input
         """
         try:
             clean_inputs = {}
-            for key, value in self.project_data.items():
+            for key, value in project_for_crew(type(self), self.project_data).items():
                 if isinstance(value, (str, int, float, bool, list, dict, type(None))):
                     clean_inputs[key] = value
                 else:
@@ -355,11 +427,13 @@ class BaseCrew(ABC):
 
     async def _log_to_vault(self, event_type: str, details: Dict[str, Any]) -> None:
         """Log events to Vault for GDPR compliance.
+
+        Records are queued on the process-wide audit sink, which encrypts and writes them
+        in batches off the crew's critical path.
         
         Args:
             event_type: Type of event (e.g., 'access', 'error')
             details: Event details
         """
-        encrypted_details = self.vault_client.encrypt(details)
-        await self.vault_client.log_audit(event_type, encrypted_details)
+        await get_audit_sink().submit_async(event_type, {**details, 'crew_name': self.__class__.__name__})
         logger.info(f"Logged {event_type} to Vault: {details}")
\ No newline at end of file
@@ -4,6 +4,7 @@ Orchestrates code generation, development, and technical implementation.
 """
 
 import asyncio
+from functools import cached_property
 from typing import Dict, List, Optional, Any
 from crewai import Crew, Process, Task
 from pydantic import BaseModel, Field
@@ -27,13 +28,24 @@ class BuilderCrewConfig(BaseModel):
 
 class BuilderCrew(BaseCrew):
     """Builder Crew for comprehensive code generation and development."""
+
+    input_paths = ("idea", "validation", "build")
     
     def __init__(self, project_data: Dict[str, Any], config: Optional[BuilderCrewConfig] = None):
         super().__init__(project_data)
         self.config = config or BuilderCrewConfig()
-        self.memory_manager = ProjectMetaMemoryManager()
-        self.builder_agent = BuilderAgent()
-        self.celery_executor = CeleryExecutionTool()
+
+    @cached_property
+    def memory_manager(self) -> ProjectMetaMemoryManager:
+        return ProjectMetaMemoryManager()
+
+    @cached_property
+    def builder_agent(self) -> BuilderAgent:
+        return BuilderAgent()
+
+    @cached_property
+    def celery_executor(self) -> CeleryExecutionTool:
+        return CeleryExecutionTool()
 
     def _create_crew(self) -> Crew:
         """Create the Builder Crew with agents and tasks."""
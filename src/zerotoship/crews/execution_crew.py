@@ -4,6 +4,7 @@ Orchestrates task decomposition, planning, and execution management.
 """
 
 import asyncio
+from functools import cached_property
 from typing import Dict, List, Optional, Any
 from crewai import Crew, Process, Task
 from pydantic import BaseModel, Field
@@ -26,13 +27,24 @@ class ExecutionCrewConfig(BaseModel):
 
 class ExecutionCrew(BaseCrew):
     """Execution Crew for comprehensive task planning and execution management."""
+
+    input_paths = ("idea", "validation", "build", "execution")
     
     def __init__(self, project_data: Dict[str, Any], config: Optional[ExecutionCrewConfig] = None):
         super().__init__(project_data)
         self.config = config or ExecutionCrewConfig()
-        self.memory_manager = ProjectMetaMemoryManager()
-        self.execution_agent = ExecutionAgent()
-        self.celery_executor = CeleryExecutionTool()
+
+    @cached_property
+    def memory_manager(self) -> ProjectMetaMemoryManager:
+        return ProjectMetaMemoryManager()
+
+    @cached_property
+    def execution_agent(self) -> ExecutionAgent:
+        return ExecutionAgent()
+
+    @cached_property
+    def celery_executor(self) -> CeleryExecutionTool:
+        return CeleryExecutionTool()
 
     def _create_crew(self) -> Crew:
         """Create the Execution Crew with agents and tasks."""
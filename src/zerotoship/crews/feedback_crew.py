@@ -4,6 +4,7 @@ Orchestrates quality assurance, feedback collection, and continuous improvement.
 """
 
 import asyncio
+from functools import cached_property
 from typing import Dict, List, Optional, Any
 from crewai import Crew, Process, Task
 from pydantic import BaseModel, Field
@@ -24,12 +25,23 @@ class FeedbackCrewConfig(BaseModel):
 
 class FeedbackCrew(BaseCrew):
     """Feedback Crew for comprehensive quality assurance and feedback collection."""
+
+    input_paths = ("idea", "validation", "build", "marketing", "launch", "feedback")
     
     def __init__(self, project_data: Dict[str, Any]):
         super().__init__(project_data)
-        self.memory_manager = ProjectMetaMemoryManager()
-        self.feedback_agent = FeedbackAgent()
-        self.celery_executor = CeleryExecutionTool()
+
+    @cached_property
+    def memory_manager(self) -> ProjectMetaMemoryManager:
+        return ProjectMetaMemoryManager()
+
+    @cached_property
+    def feedback_agent(self) -> FeedbackAgent:
+        return FeedbackAgent()
+
+    @cached_property
+    def celery_executor(self) -> CeleryExecutionTool:
+        return CeleryExecutionTool()
 
     def _create_crew(self) -> Crew:
         """Create the Feedback Crew with agents and tasks."""
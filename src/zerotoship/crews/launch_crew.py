@@ -4,6 +4,7 @@ Orchestrates launch preparation, execution, and post-launch activities.
 """
 
 import asyncio
+from functools import cached_property
 from typing import Dict, List, Optional, Any
 from crewai import Crew, Process, Task
 from pydantic import BaseModel, Field
@@ -23,13 +24,24 @@ class LaunchCrewConfig(BaseModel):
 
 class LaunchCrew(BaseCrew):
     """Launch Crew for comprehensive launch preparation and execution."""
+
+    input_paths = ("idea", "validation", "build", "marketing", "launch")
     
     def __init__(self, project_data: Dict[str, Any], config: Optional[LaunchCrewConfig] = None):
         super().__init__(project_data)
         self.config = config or LaunchCrewConfig()
-        self.memory_manager = ProjectMetaMemoryManager()
-        self.launch_agent = LaunchAgent()
-        self.celery_executor = CeleryExecutionTool()
+
+    @cached_property
+    def memory_manager(self) -> ProjectMetaMemoryManager:
+        return ProjectMetaMemoryManager()
+
+    @cached_property
+    def launch_agent(self) -> LaunchAgent:
+        return LaunchAgent()
+
+    @cached_property
+    def celery_executor(self) -> CeleryExecutionTool:
+        return CeleryExecutionTool()
 
     def _create_crew(self) -> Crew:
         """Create the Launch Crew with agents and tasks."""
@@ -4,6 +4,7 @@ Orchestrates launch preparation, positioning, and marketing strategy.
 """
 
 import asyncio
+from functools import cached_property
 from typing import Dict, List, Optional, Any
 from crewai import Crew, Process, Task
 from pydantic import BaseModel, Field
@@ -27,12 +28,23 @@ class MarketingCrewConfig(BaseModel):
 
 class MarketingCrew(BaseCrew):
     """Marketing Crew for comprehensive launch preparation and positioning."""
+
+    input_paths = ("idea", "validation", "build")
     
     def __init__(self, project_data: Dict[str, Any]):
         super().__init__(project_data)
-        self.memory_manager = ProjectMetaMemoryManager()
-        self.marketing_agent = MarketingAgent()
-        self.celery_executor = CeleryExecutionTool()
+
+    @cached_property
+    def memory_manager(self) -> ProjectMetaMemoryManager:
+        return ProjectMetaMemoryManager()
+
+    @cached_property
+    def marketing_agent(self) -> MarketingAgent:
+        return MarketingAgent()
+
+    @cached_property
+    def celery_executor(self) -> CeleryExecutionTool:
+        return CeleryExecutionTool()
 
     def _create_crew(self) -> Crew:
         """Create the Marketing Crew with agents and tasks."""
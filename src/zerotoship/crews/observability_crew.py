@@ -4,6 +4,7 @@ Provides real-time monitoring, anomaly detection, and continuous improvement rec
 """
 
 import asyncio
+from functools import cached_property
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
@@ -42,9 +43,12 @@ class ObservabilityCrew(BaseCrew):
     
     def __init__(self, project_data: Dict[str, Any]):
         super().__init__(project_data)
-        self.redis_client = redis.Redis(host='localhost', port=6379, db=0)
         self.metrics_history = []
-        
+
+    @cached_property
+    def redis_client(self) -> redis.Redis:
+        return redis.Redis(host='localhost', port=6379, db=0)
+
     def _create_crew(self) -> Crew:
         """Create the Observability Crew with specialized agents."""
         
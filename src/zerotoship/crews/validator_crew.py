@@ -4,6 +4,7 @@ Orchestrates market research, competitor analysis, and idea validation.
 """
 
 import asyncio
+from functools import cached_property
 from typing import Dict, List, Optional, Any
 from crewai import Crew, Agent, Task, Process
 from pydantic import BaseModel, Field
@@ -27,14 +28,25 @@ class ValidatorCrewConfig(BaseModel):
 
 class ValidatorCrew(BaseCrew):
     """Validates a business idea using real-time market data and compliance checks."""
+
+    input_paths = ("idea",)
     
     def __init__(self, project_data: Dict[str, Any], config: Optional[ValidatorCrewConfig] = None):
         self.config = config or ValidatorCrewConfig()
-        self.memory_manager = ProjectMetaMemoryManager()
-        self.validator_agent = ValidatorAgent()
-        self.celery_executor = CeleryExecutionTool()
         super().__init__(project_data)
 
+    @cached_property
+    def memory_manager(self) -> ProjectMetaMemoryManager:
+        return ProjectMetaMemoryManager()
+
+    @cached_property
+    def validator_agent(self) -> ValidatorAgent:
+        return ValidatorAgent()
+
+    @cached_property
+    def celery_executor(self) -> CeleryExecutionTool:
+        return CeleryExecutionTool()
+
     def _create_crew(self) -> Crew:
         """Create the Validator Crew with agents and tasks."""
         context = self.get_project_context()
@@ -0,0 +1,131 @@
+"""
+Durable workflow checkpoints for tractionbuild.
+Persists project data, ContextBus state and event history after each completed state
+so a crashed or redeployed worker can resume a run without re-executing finished crews.
+"""
+
+import os
+import sqlite3
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+from ..core.codec import get_codec
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore(ABC):
+    """Interface for checkpoint backends. A checkpoint is a codec-serializable dict keyed by project id."""
+
+    schema = "checkpoint"
+
+    @abstractmethod
+    async def save(self, project_id: str, checkpoint: Dict[str, Any]) -> None:
+        """Replace the project's checkpoint."""
+
+    @abstractmethod
+    async def load(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """The project's checkpoint, or None if it has none."""
+
+    @abstractmethod
+    async def delete(self, project_id: str) -> None:
+        """Drop the project's checkpoint, if any."""
+
+
+class InMemoryCheckpointStore(CheckpointStore):
+    """Process-local checkpoint store, useful for tests and single-run tooling."""
+
+    def __init__(self):
+        self._checkpoints: Dict[str, bytes] = {}
+
+    async def save(self, project_id: str, checkpoint: Dict[str, Any]) -> None:
+        self._checkpoints[project_id] = get_codec().encode(checkpoint, self.schema)
+
+    async def load(self, project_id: str) -> Optional[Dict[str, Any]]:
+        payload = self._checkpoints.get(project_id)
+        return get_codec().decode(payload, self.schema) if payload else None
+
+    async def delete(self, project_id: str) -> None:
+        self._checkpoints.pop(project_id, None)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """SQLite-backed checkpoint store. One row per project, replaced on every save."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """Initialize the checkpoint store. The database is created on first use."""
+        if db_path is None:
+            db_path = os.path.join(
+                os.path.dirname(__file__), '..', '..', '..', 'data', 'checkpoints.db'
+            )
+        self.db_path = db_path
+        self._initialized = False
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection, creating the schema on first use."""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    project_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _save_sync(self, project_id: str, checkpoint: Dict[str, Any]) -> None:
+        payload = get_codec().encode(checkpoint, self.schema)
+        conn = self._get_connection()
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO checkpoints (project_id, state, payload, updated_at)
+                    VALUES (?, ?, ?, ?)
+                """, (
+                    project_id,
+                    str(checkpoint.get("state", "UNKNOWN")),
+                    payload,
+                    datetime.now(timezone.utc).isoformat(),
+                ))
+        finally:
+            conn.close()
+
+    def _load_sync(self, project_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._get_connection()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM checkpoints WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        # Rows written before the codec hold JSON text; the codec still reads them
+        return get_codec().decode(row[0], self.schema) if row else None
+
+    def _delete_sync(self, project_id: str) -> None:
+        conn = self._get_connection()
+        try:
+            with conn:
+                conn.execute("DELETE FROM checkpoints WHERE project_id = ?", (project_id,))
+        finally:
+            conn.close()
+
+    async def save(self, project_id: str, checkpoint: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._save_sync, project_id, checkpoint)
+        logger.debug(f"Checkpoint saved for {project_id} at state {checkpoint.get('state')}")
+
+    async def load(self, project_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._load_sync, project_id)
+
+    async def delete(self, project_id: str) -> None:
+        await asyncio.to_thread(self._delete_sync, project_id)
@@ -1,13 +1,16 @@
 import logging
 
+from .checkpoint_store import CheckpointStore, SQLiteCheckpointStore
+
 logger = logging.getLogger(__name__)
 
 class ProjectRegistry:
-    def __init__(self, neo4j_uri=None, neo4j_user=None, neo4j_password=None, state_manager_class=None):
+    def __init__(self, neo4j_uri=None, neo4j_user=None, neo4j_password=None, state_manager_class=None, checkpoint_store: CheckpointStore = None):
         self.neo4j_uri = neo4j_uri
         self.neo4j_user = neo4j_user
         self.neo4j_password = neo4j_password
         self.state_manager_class = state_manager_class
+        self.checkpoint_store = checkpoint_store or SQLiteCheckpointStore()
         
     async def __aenter__(self):
         # Placeholder for async setup
@@ -18,7 +21,18 @@ class ProjectRegistry:
         # Placeholder for async teardown
         logger.info("ProjectRegistry exited.")
         
-    async def save_snapshot(self, pid, ctx): pass
+    async def save_snapshot(self, pid, ctx):
+        """Attach the end-of-run context to the project's checkpoint as ``final_context``.
+
+        The checkpoint's own ``context`` is left as of the last completed state, which is
+        what ``resume`` restores; projects without a checkpoint are not given one.
+        """
+        checkpoint = await self.checkpoint_store.load(pid)
+        if checkpoint is None:
+            logger.debug(f"No checkpoint for {pid}; final context snapshot not stored")
+            return
+        checkpoint["final_context"] = ctx
+        await self.checkpoint_store.save(pid, checkpoint)
     
     async def save_memory(self, project_id, memories):
         logger.info(f"Persisting {len(memories)} memories for {project_id}")
\ No newline at end of file
@@ -17,7 +17,7 @@ import json
 
 # Prometheus metrics for monitoring
 try:
-    from prometheus_client import Summary, Counter, Histogram, start_http_server
+    from prometheus_client import Summary, Counter, Gauge, Histogram, start_http_server
     PROMETHEUS_AVAILABLE = True
 except ImportError:
     PROMETHEUS_AVAILABLE = False
@@ -28,10 +28,16 @@ except ImportError:
 from .core.workflow_engine import WorkflowEngine
 from .core.learning_memory import LearningMemory
 from .core.context_bus import ContextBus
+from .core.blob_store import BlobStore
 from .core.crew_router import CrewRouter
 from .core.distributed_executor import DistributedExecutor
+from .core.autoscaler import Autoscaler
 from .core.project_meta_memory import ProjectMetaMemoryManager
+from .core.crew_result_cache import CrewResultCache
+from .security.audit_sink import flush_audit_sink
 from .database.project_registry import ProjectRegistry
+from .database.checkpoint_store import SQLiteCheckpointStore
+from .utils.budget_store import get_budget_store
 from .core.schema_validator import validate_and_enrich_data, is_valid_project_data
 from .crews.simple_builder_crew import SimpleBuilderCrew
 
@@ -68,6 +74,15 @@ if PROMETHEUS_AVAILABLE:
     CREW_FAILURES_TOTAL = Counter('tractionbuild_crew_failures_total', 'Total crew execution failures', ['crew_name'])
     WORKFLOW_COST_USD = Histogram('tractionbuild_workflow_cost_usd', 'Estimated cost of a workflow in USD')
     CREW_COST_USD_TOTAL = Summary('tractionbuild_crew_cost_usd_total', 'Estimated cost of a crew execution in USD', ['crew_name'])
+    CREW_CACHE_HITS_TOTAL = Counter('tractionbuild_crew_cache_hits_total', 'Total crew result cache hits', ['tier'])
+    CREW_CACHE_MISSES_TOTAL = Counter('tractionbuild_crew_cache_misses_total', 'Total crew result cache misses')
+    EXECUTOR_WORKERS = Gauge('tractionbuild_executor_workers', 'Current DistributedExecutor worker count')
+    EXECUTOR_SCALING_DECISIONS_TOTAL = Counter('tractionbuild_executor_scaling_decisions_total', 'Autoscaler resize decisions', ['direction', 'reason'])
+    EXECUTOR_QUEUE_WAIT_SECONDS = Histogram('tractionbuild_executor_queue_wait_seconds', 'Time tasks spend queued before a worker picks them up', ['state', 'crew'])
+    EXECUTOR_SERVICE_SECONDS = Histogram('tractionbuild_executor_service_seconds', 'Time workers spend running a task', ['state', 'crew'])
+    EXECUTOR_QUEUE_DEPTH = Gauge('tractionbuild_executor_queue_depth', 'Tasks waiting in the DistributedExecutor queue')
+    EXECUTOR_BUSY_WORKERS = Gauge('tractionbuild_executor_busy_workers', 'DistributedExecutor workers currently running a task')
+    EXECUTOR_SATURATION = Gauge('tractionbuild_executor_saturation', 'Busy workers as a fraction of the worker pool')
 else:
     # Mock metrics for when prometheus_client is not available
     class MockMetric:
@@ -75,6 +90,7 @@ else:
         def count(self, **kwargs): pass
         def inc(self, **kwargs): pass
         def observe(self, value): pass
+        def set(self, value): pass
         def labels(self, **kwargs): return self
     
     REQUEST_TIME = MockMetric()
@@ -87,6 +103,15 @@ else:
     CREW_FAILURES_TOTAL = MockMetric()
     WORKFLOW_COST_USD = MockMetric()
     CREW_COST_USD_TOTAL = MockMetric()
+    CREW_CACHE_HITS_TOTAL = MockMetric()
+    CREW_CACHE_MISSES_TOTAL = MockMetric()
+    EXECUTOR_WORKERS = MockMetric()
+    EXECUTOR_SCALING_DECISIONS_TOTAL = MockMetric()
+    EXECUTOR_QUEUE_WAIT_SECONDS = MockMetric()
+    EXECUTOR_SERVICE_SECONDS = MockMetric()
+    EXECUTOR_QUEUE_DEPTH = MockMetric()
+    EXECUTOR_BUSY_WORKERS = MockMetric()
+    EXECUTOR_SATURATION = MockMetric()
 
 
 class tractionbuildOrchestrator:
@@ -101,7 +126,14 @@ class tractionbuildOrchestrator:
         self.registry = None
         self.workflows = self._load_workflows()
         self.memory = LearningMemory()
-        self.context_bus = ContextBus() # Shared ContextBus instance
+        self.blob_store = BlobStore(
+            root=os.getenv("BLOB_STORE_DIR", "data/blobs"),
+            threshold_bytes=int(os.getenv("BLOB_THRESHOLD_BYTES", str(64 * 1024))),
+        )
+        self.context_bus = ContextBus(blob_store=self.blob_store) # Shared ContextBus instance
+        self.checkpoint_store = SQLiteCheckpointStore(os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.db"))
+        # Crew attempts are charged to the budget store (opened on the first workflow run)
+        self.track_budget = os.getenv("BUDGET_TRACKING", "true").lower() not in ("0", "false", "no")
 
         # Define crew classes for the router, now as a list to support multiple crews per state
         self.crew_classes = {
@@ -113,8 +145,41 @@ class tractionbuildOrchestrator:
             "IN_PROGRESS": [PlaceholderCrew],
         }
         self.project_meta_memory = ProjectMetaMemoryManager()
-        self.crew_router = CrewRouter(self.crew_classes, self.context_bus, self.project_meta_memory)
-        self.executor = DistributedExecutor(self.crew_router)
+        self.result_cache = CrewResultCache(
+            cache_dir=os.getenv("CREW_CACHE_DIR", "data/crew_cache"),
+            metrics={
+                "crew_cache_hits_total": CREW_CACHE_HITS_TOTAL,
+                "crew_cache_misses_total": CREW_CACHE_MISSES_TOTAL,
+            },
+        )
+        self.crew_router = CrewRouter(self.crew_classes, self.context_bus, self.project_meta_memory, result_cache=self.result_cache,
+                                      blob_store=self.blob_store,
+                                      reliability_index_path=os.getenv("RELIABILITY_INDEX_PATH", "data/crew_reliability.json"))
+        executor_config = self.crew_router.adaptive_config.get("executor") or {}
+        self.executor = DistributedExecutor(
+            self.crew_router,
+            state_priorities=executor_config.get("state_priorities"),
+            state_limits=executor_config.get("state_limits"),
+            crew_limits=executor_config.get("crew_limits"),
+            max_queue_size=executor_config.get("max_queue_size"),
+            admission_policy=executor_config.get("admission_policy", "block"),
+            admission_timeout=executor_config.get("admission_timeout", 30.0),
+            metrics={
+                "executor_queue_wait_seconds": EXECUTOR_QUEUE_WAIT_SECONDS,
+                "executor_service_seconds": EXECUTOR_SERVICE_SECONDS,
+                "executor_queue_depth": EXECUTOR_QUEUE_DEPTH,
+                "executor_busy_workers": EXECUTOR_BUSY_WORKERS,
+                "executor_saturation": EXECUTOR_SATURATION,
+            },
+        )
+        self.autoscaler = Autoscaler(
+            self.executor,
+            scaling_thresholds=self.crew_router.adaptive_config.get("scaling_thresholds"),
+            metrics={
+                "executor_workers": EXECUTOR_WORKERS,
+                "executor_scaling_decisions_total": EXECUTOR_SCALING_DECISIONS_TOTAL,
+            },
+        )
         
         # Start Prometheus metrics server if available
         if PROMETHEUS_AVAILABLE:
@@ -148,9 +213,11 @@ class tractionbuildOrchestrator:
         try:
             await self.memory.load()
             await self.executor.start()
+            self.autoscaler.start()
             self.registry = ProjectRegistry(
                 neo4j_uri=self.neo4j_uri,
-                neo4j_user=self.neo4j_user
+                neo4j_user=self.neo4j_user,
+                checkpoint_store=self.checkpoint_store,
             )
             await self.registry.__aenter__()
             logger.info("tractionbuild orchestrator initialized successfully")
@@ -161,7 +228,12 @@ class tractionbuildOrchestrator:
     
     async def __aexit__(self, exc_type, exc, tb):
         """Async context manager exit."""
+        await self.autoscaler.stop()
         await self.executor.stop()
+        await asyncio.to_thread(self.crew_router.backends.shutdown)
+        await asyncio.to_thread(self.crew_router.reliability_index.persist)
+        # The audit sink is process-wide and outlives this orchestrator; it is closed at shutdown
+        await asyncio.to_thread(flush_audit_sink)
         if self.registry:
             await self.registry.__aexit__(exc_type, exc, tb)
     
@@ -190,7 +262,8 @@ class tractionbuildOrchestrator:
                 "metadata": {
                     "workflow_complexity": workflow.get('metadata', {}).get('complexity', 'unknown'),
                     "estimated_duration": workflow.get('metadata', {}).get('estimated_duration', 'unknown'),
-                    "compliance": workflow.get('metadata', {}).get('compliance', [])
+                    "compliance": workflow.get('metadata', {}).get('compliance', []),
+                    "cache": workflow.get('metadata', {}).get('cache', True)
                 }
             }
             
@@ -209,84 +282,57 @@ class tractionbuildOrchestrator:
             logger.error(f"Failed to create project: {e}")
             raise
     
-    async def execute_workflow(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a complete workflow with comprehensive monitoring."""
-        project_id = project_data.get('id', 'unknown')
-        workflow_name = project_data.get('workflow', 'unknown')
-        
-        logger.info(f"Starting workflow execution for project '{project_id}'")
-        
+    def _create_engine(self, project_data: Dict[str, Any], context_bus: Optional[ContextBus] = None) -> WorkflowEngine:
+        """Build a WorkflowEngine wired to the orchestrator's shared components.
+
+        Pass a ``context_bus`` per project when one orchestrator runs several workflows at once.
+        """
+        metrics = {
+            "memory_hits_total": MEMORY_HITS,
+            "crew_duration_seconds": CREW_DURATION_SECONDS,
+            "crew_failures_total": CREW_FAILURES_TOTAL,
+            "workflow_cost_usd": WORKFLOW_COST_USD,
+            "crew_cost_usd_total": CREW_COST_USD_TOTAL,
+        } if PROMETHEUS_AVAILABLE else {}
+        return WorkflowEngine(
+            project_data,
+            self.registry,
+            crew_router=self.crew_router,
+            metrics=metrics,
+            memory=self.memory,
+            context_bus=context_bus or self.context_bus,
+            project_meta_memory=self.project_meta_memory,
+            executor=self.executor,
+            checkpoint_store=self.checkpoint_store,
+            budget_store=get_budget_store() if self.track_budget else None,
+        )
+    
+    async def _drive(self, project_id: str, workflow_name: str, run) -> Dict[str, Any]:
+        """Run an engine coroutine (``run()`` or ``resume()``) with workflow metrics and logging."""
         try:
-            # Initialize workflow engine
-            metrics = {
-                "memory_hits_total": MEMORY_HITS,
-                "crew_duration_seconds": CREW_DURATION_SECONDS,
-                "crew_failures_total": CREW_FAILURES_TOTAL,
-                "workflow_cost_usd": WORKFLOW_COST_USD,
-                "crew_cost_usd_total": CREW_COST_USD_TOTAL,
-            } if PROMETHEUS_AVAILABLE else {}
-            engine = WorkflowEngine(
-                project_data,
-                self.registry,
-                crew_router=self.crew_router,
-                metrics=metrics,
-                memory=self.memory,
-                context_bus=self.context_bus,
-                project_meta_memory=self.project_meta_memory,
-                executor=self.executor
-            )
-            
             # Track workflow start
             WORKFLOW_EXECUTIONS.labels(workflow_name=workflow_name, status="started").inc()
             
-            # Execute workflow steps with enhanced loop prevention
-            step_count = 0
-            max_steps = 50  # Prevent infinite loops
-            previous_states = []  # Track state history for loop detection
-            
-            while project_data.get('state') != 'COMPLETED' and project_data.get('state') != 'ERROR' and step_count < max_steps:
-                step_count += 1
-                current_state = project_data.get('state', 'UNKNOWN')
-                
-                # Loop detection: Check if we're stuck in the same state
-                if len(previous_states) >= 3 and len(set(previous_states[-3:])) == 1:
-                    logger.error(f"Loop detected: State '{current_state}' repeated 3 times. Forcing ERROR state.")
-                    project_data['state'] = 'ERROR'
-                    break
-                
-                previous_states.append(current_state)
-                
-                # Execute step with timing
-                if PROMETHEUS_AVAILABLE:
-                    with REQUEST_TIME.time():
-                        project_data = await engine.route_and_execute()
-                else:
-                    project_data = await engine.route_and_execute()
-                
-                # Log step execution
-                logger.info(f"Step {step_count}: {current_state} -> {project_data.get('state', 'UNKNOWN')}")
-                
-                # Check for errors
-                if project_data.get('state') == 'ERROR':
-                    WORKFLOW_EXECUTIONS.labels(workflow_name=workflow_name, status="error").inc()
-                    ERROR_COUNTER.labels(error_type="workflow_execution").inc()
-                    logger.error(f"Workflow execution failed at step {step_count}")
-                    break
-                
-                # Add small delay to prevent overwhelming
-                await asyncio.sleep(0.1)
+            # The engine drives the whole run: parallel sequences are dispatched as a DAG,
+            # the rest step by step, with its own iteration limit against loops
+            if PROMETHEUS_AVAILABLE:
+                with REQUEST_TIME.time():
+                    project_data = await run
+            else:
+                project_data = await run
             
             # Track workflow completion
             final_state = project_data.get('state')
             if final_state == 'COMPLETED':
                 WORKFLOW_EXECUTIONS.labels(workflow_name=workflow_name, status="completed").inc()
-                logger.info(f"Workflow completed successfully in {step_count} steps")
-            elif final_state == 'ERROR':
+                logger.info(f"Workflow for project '{project_id}' completed successfully")
+            elif final_state in ('ERROR', 'FAILED'):
                 WORKFLOW_EXECUTIONS.labels(workflow_name=workflow_name, status="error").inc()
-                logger.error(f"Workflow failed after {step_count} steps")
+                ERROR_COUNTER.labels(error_type="workflow_execution").inc()
+                logger.error(f"Workflow for project '{project_id}' failed in state {final_state}: {project_data.get('message')}")
             else:
                 WORKFLOW_EXECUTIONS.labels(workflow_name=workflow_name, status="timeout").inc()
-                logger.warning(f"Workflow timed out after {step_count} steps")
+                logger.warning(f"Workflow for project '{project_id}' stopped in state {final_state}")
             
             return project_data
             
@@ -296,6 +342,35 @@ class tractionbuildOrchestrator:
             logger.error(f"Workflow execution failed: {e}")
             raise
     
+    def new_context_bus(self) -> ContextBus:
+        """A ContextBus for one project, sharing the orchestrator's blob store."""
+        return ContextBus(blob_store=self.blob_store)
+    
+    def check_admission(self, project_data: Dict[str, Any]):
+        """Raise Overloaded if the executor has no room for the project's first state."""
+        self.executor.check_admission(project_data.get('state', 'UNKNOWN'))
+    
+    async def execute_workflow(self, project_data: Dict[str, Any], context_bus: Optional[ContextBus] = None) -> Dict[str, Any]:
+        """Execute a complete workflow with comprehensive monitoring."""
+        project_id = project_data.get('id', 'unknown')
+        logger.info(f"Starting workflow execution for project '{project_id}'")
+        engine = self._create_engine(project_data, context_bus)
+        return await self._drive(project_id, project_data.get('workflow', 'unknown'), engine.run())
+    
+    async def resume_workflow(self, project_id: str, context_bus: Optional[ContextBus] = None) -> Dict[str, Any]:
+        """Resume a project from its last checkpoint, e.g. after a worker crashed mid-run.
+
+        Raises:
+            ValueError: If the project has no checkpoint.
+        """
+        checkpoint = await self.checkpoint_store.load(project_id)
+        if not checkpoint:
+            raise ValueError(f"No checkpoint found for project {project_id}")
+        logger.info(f"Resuming workflow for project '{project_id}' from state {checkpoint.get('state')}")
+        engine = self._create_engine({"id": project_id}, context_bus)
+        workflow_name = checkpoint.get("project_data", {}).get("workflow", "unknown")
+        return await self._drive(project_id, workflow_name, engine.resume(project_id))
+    
     async def run_project(self, idea: str, workflow_name: str = "default_software_build") -> Dict[str, Any]:
         """Run a complete project from idea to completion."""
         try:
@@ -499,29 +574,7 @@ async def run_workflow(idea: str, workflow_name: str):
     crew_router = CrewRouter(crew_classes, context_bus)
 
     engine = WorkflowEngine(project_data, metrics=metrics, crew_router=crew_router, context_bus=context_bus)
-
-    # Enhanced loop prevention
-    step_count = 0
-    max_steps = 50
-    previous_states = []
-    
-    while project_data.get('state') != 'COMPLETED' and project_data.get('state') != 'ERROR' and step_count < max_steps:
-        step_count += 1
-        current_state = project_data.get('state', 'UNKNOWN')
-        
-        # Loop detection
-        if len(previous_states) >= 3 and len(set(previous_states[-3:])) == 1:
-            print(f"   ⚠️  Loop detected: State '{current_state}' repeated 3 times. Forcing ERROR state.")
-            project_data['state'] = 'ERROR'
-            break
-        
-        previous_states.append(current_state)
-        
-        print(f"   executing step {step_count}: '{current_state}'")
-        await engine.route_and_execute()
-        
-        # Small delay to prevent overwhelming
-        await asyncio.sleep(0.1)
+    project_data = await engine.run()
 
     final_state = project_data.get('state')
     print(f"\n✅ Process finished with final state: {final_state}")
@@ -0,0 +1,241 @@
+"""
+Batched vault audit sink for tractionbuild.
+Crew runs enqueue audit records and return immediately; a background flusher encrypts each
+batch once and appends it to the audit log, so audit I/O stays off the crew's critical path.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+try:
+    from cryptography.fernet import Fernet, MultiFernet
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    Fernet = MultiFernet = None
+    CRYPTOGRAPHY_AVAILABLE = False
+
+from .vault_client import vault_client
+from .key_manager import load_master_keys
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ("always", "interval", "never")
+_STOP = object()
+
+
+class VaultAuditSink:
+    """Bounded queue plus background flusher for audit records.
+
+    Each line of the log is one batch: a Fernet token over the JSON list of its records.
+    """
+
+    def __init__(self, path: str = "data/audit/vault_audit.log", max_queue: int = 10000,
+                 batch_size: int = 100, flush_interval: float = 1.0, fsync: str = "interval",
+                 fsync_interval: float = 5.0, overflow: str = "block", key: Optional[bytes] = None):
+        """Initialize the sink.
+
+        Args:
+            path: Audit log file (appended to).
+            max_queue: Maximum records waiting to be written.
+            batch_size: Maximum records per encrypted batch.
+            flush_interval: Longest a record waits before its batch is written.
+            fsync: "always" fsyncs every batch, "interval" at most every ``fsync_interval``
+                seconds, "never" leaves it to the OS. Close always fsyncs.
+            fsync_interval: Seconds between fsyncs under the "interval" policy.
+            overflow: "block" makes ``submit`` wait for room (no record is lost); "drop"
+                discards the record and counts it in ``dropped``.
+            key: Fernet key; defaults to the vault's ``tractionbuild_audit`` key, then the
+                ``tractionbuild_AUDIT_KEY`` environment variable, then the master keys, so
+                every worker and restart writes lines the others can read.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'. Expected one of {FSYNC_POLICIES}")
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Expected 'block' or 'drop'")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.overflow = overflow
+        self.cipher = self._create_cipher(key)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file = None
+        self._last_fsync = time.monotonic()
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.closed = False
+
+    @staticmethod
+    def _create_cipher(key: Optional[bytes]):
+        if not CRYPTOGRAPHY_AVAILABLE:
+            raise RuntimeError("cryptography is required to encrypt audit records")
+        if key is None:
+            vault_key = vault_client.get_encryption_key("tractionbuild_audit") if vault_client.enabled else None
+            env_key = os.getenv("tractionbuild_AUDIT_KEY")
+            key = (vault_key or env_key or "").encode() or None
+        if key is None:
+            # Shared by every worker; older master keys keep rotated-out lines readable
+            return MultiFernet([Fernet(master_key) for master_key in load_master_keys()])
+        return Fernet(key)
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "ab")
+                self._thread = threading.Thread(target=self._run, name="vault-audit-sink", daemon=True)
+                self._thread.start()
+
+    def _record(self, event_type: str, details: Dict[str, Any]) -> Dict[str, Any]:
+        if self.closed:
+            raise RuntimeError("Audit sink is closed")
+        self._ensure_started()
+        return {"timestamp": datetime.utcnow().isoformat(), "event_type": event_type, "details": details}
+
+    def _drop(self, event_type: str) -> bool:
+        self.dropped += 1
+        logger.warning(f"Audit queue full - dropped {event_type} record")
+        return False
+
+    def submit(self, event_type: str, details: Dict[str, Any]) -> bool:
+        """Queue one audit record; returns False if it was dropped (overflow="drop")."""
+        record = self._record(event_type, details)
+        try:
+            self._queue.put(record, block=self.overflow == "block")
+            return True
+        except queue.Full:
+            return self._drop(event_type)
+
+    async def submit_async(self, event_type: str, details: Dict[str, Any]) -> bool:
+        """``submit`` for coroutines: a full queue under overflow="block" is waited on in a
+        worker thread, so the event loop keeps running."""
+        record = self._record(event_type, details)
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            if self.overflow != "block":
+                return self._drop(event_type)
+        await asyncio.to_thread(self._queue.put, record)
+        return True
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            batch: List[Dict[str, Any]] = []
+            stop = first is _STOP
+            if not stop:
+                batch.append(first)
+            deadline = time.monotonic() + self.flush_interval
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                else:
+                    batch.append(record)
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} audit records: {e}")
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        payload = json.dumps(batch, separators=(",", ":"), default=str).encode()
+        line = self.cipher.encrypt(payload)
+        self._file.write(line + b"\n")
+        self._file.flush()
+        now = time.monotonic()
+        if self.fsync == "always" or (self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+        self.written += len(batch)
+        self.batches += 1
+
+    def flush(self):
+        """Block until every record queued so far has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write everything still queued, fsync, and stop the flusher."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        logger.info(f"Audit sink closed after {self.written} records in {self.batches} batches")
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Decrypt and yield every record in the log (for audits and tests)."""
+        with open(self.path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield from json.loads(self.cipher.decrypt(line))
+
+
+_sink: Optional[VaultAuditSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> VaultAuditSink:
+    """The process-wide sink, configured from AUDIT_* environment variables on first use."""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = VaultAuditSink(
+                path=os.getenv("AUDIT_LOG_PATH", "data/audit/vault_audit.log"),
+                max_queue=int(os.getenv("AUDIT_QUEUE_SIZE", "10000")),
+                fsync=os.getenv("AUDIT_FSYNC", "interval"),
+            )
+            # Records queued at interpreter exit are still written
+            atexit.register(_sink.close)
+        return _sink
+
+
+def flush_audit_sink():
+    """Write everything queued on the process-wide sink so far, leaving it open for later runs."""
+    with _sink_lock:
+        sink = _sink
+    if sink is not None:
+        sink.flush()
+
+
+def close_audit_sink():
+    """Flush and close the process-wide sink if one was created; the next ``get_audit_sink`` starts a new one.
+
+    Call this at process or application shutdown, not at the end of a single workflow.
+    """
+    global _sink
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+            _sink = None
@@ -4,6 +4,7 @@ Implements real-time data encryption, anonymization, and audit trails for enterp
 """
 
 import os
+import re
 import json
 import logging
 import hashlib
@@ -33,6 +34,11 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Personal data patterns, compiled once per process
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_PATTERN = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+_IP_PATTERN = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
+
 class GDPRComplianceManager:
     """
     Comprehensive GDPR compliance management with real-time encryption and anonymization.
@@ -152,18 +158,16 @@ class GDPRComplianceManager:
     
     def _contains_personal_data(self, text: str) -> bool:
         """Check if text contains personal data patterns."""
-        import re
-        
         # Email pattern
-        if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text):
+        if '@' in text and _EMAIL_PATTERN.search(text):
             return True
         
         # Phone pattern
-        if re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', text):
+        if _PHONE_PATTERN.search(text):
             return True
         
         # IP address pattern
-        if re.search(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', text):
+        if _IP_PATTERN.search(text):
             return True
         
         return False
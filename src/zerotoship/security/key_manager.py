@@ -0,0 +1,251 @@
+"""
+Envelope encryption keys for tractionbuild.
+Each project gets its own data key; data keys are stored wrapped (encrypted) by a master
+key from Vault, so any worker holding the master key and the key store can read any
+project's outputs. The key store is a file (DATA_KEY_STORE_PATH): workers on other hosts
+can only decrypt when it is on a filesystem they share.
+Unwrapped data keys are cached in memory for a short TTL, keeping key work off the hot path.
+"""
+
+import os
+import json
+import time
+import base64
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+try:
+    from cryptography.fernet import Fernet, MultiFernet
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    Fernet = MultiFernet = None
+    CRYPTOGRAPHY_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in other processes are not serialized
+    fcntl = None
+
+from .vault_client import vault_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROJECT = "global"
+
+
+def load_master_keys() -> List[bytes]:
+    """Master keys, newest first: Vault ``tractionbuild_master``, else ``tractionbuild_MASTER_KEY``
+    (comma-separated, so an old key can stay readable during rotation), else a key derived from
+    ``tractionbuild_PASSWORD`` for development."""
+    vault_key = vault_client.get_encryption_key("tractionbuild_master") if vault_client.enabled else None
+    configured = vault_key or os.getenv("tractionbuild_MASTER_KEY")
+    if configured:
+        return [key.strip().encode() for key in configured.split(",") if key.strip()]
+
+    logger.warning("No master key in Vault or tractionbuild_MASTER_KEY - deriving one from tractionbuild_PASSWORD")
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=b"tractionbuild_master_2025", iterations=100000)
+    password = os.getenv("tractionbuild_PASSWORD", "default_dev_password").encode()
+    return [base64.urlsafe_b64encode(kdf.derive(password))]
+
+
+def split_key_id(key_id: str) -> Tuple[str, int]:
+    """``"<project>:<version>"`` -> (project, version)."""
+    project_id, _, version = key_id.rpartition(":")
+    return project_id, int(version)
+
+
+class DataKeyManager:
+    """Per-project data keys wrapped by a master key, persisted to a JSON key store.
+
+    The key store is a local file guarded by ``flock``; to share keys between hosts, put it
+    on a shared filesystem that supports locking.
+
+    Data keys are versioned: new ciphertexts use the project's latest version and older
+    versions stay available for decryption until re-encrypted. The key store is re-read
+    when a cached entry expires or an unknown key id is seen, so rotations made by other
+    workers are picked up within one TTL.
+    """
+
+    def __init__(self, path: str = "data/keys/data_keys.json", master_keys: Optional[List[bytes]] = None,
+                 cache_ttl: float = 300.0):
+        """Initialize the manager.
+
+        Args:
+            path: Key store file holding the wrapped data keys.
+            master_keys: Fernet master keys, newest first; defaults to ``load_master_keys()``.
+            cache_ttl: Seconds an unwrapped data key (and a project's current version) is cached.
+        """
+        if not CRYPTOGRAPHY_AVAILABLE:
+            raise RuntimeError("cryptography is required for envelope encryption")
+        self.path = path
+        self.cache_ttl = cache_ttl
+        self.master_keys = list(master_keys or load_master_keys())
+        self.master = MultiFernet([Fernet(key) for key in self.master_keys])
+        self._lock = threading.RLock()
+        self._wrapped: Dict[str, Dict[str, str]] = {}
+        self._keys: Dict[Tuple[str, int], Tuple[float, Fernet]] = {}
+        self._current: Dict[str, Tuple[float, int]] = {}
+        self.unwraps = 0
+        self.cache_hits = 0
+        self._load()
+
+    # Key store
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                self._wrapped = json.load(f).get("projects", {})
+        except FileNotFoundError:
+            self._wrapped = {}
+
+    def _persist(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"schema_version": 1, "projects": self._wrapped}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _store_lock(self) -> Iterator[None]:
+        """Serialize read-modify-write of the key store across threads and processes."""
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(f"{self.path}.lock", "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._load()
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # Data keys
+
+    def _latest_version(self, project_id: str) -> Optional[int]:
+        versions = self._wrapped.get(project_id)
+        return max(map(int, versions)) if versions else None
+
+    def _add_version(self, project_id: str) -> int:
+        version = (self._latest_version(project_id) or 0) + 1
+        wrapped = self.master.encrypt(Fernet.generate_key()).decode()
+        self._wrapped.setdefault(project_id, {})[str(version)] = wrapped
+        self._persist()
+        return version
+
+    def current_version(self, project_id: str) -> int:
+        """The version new ciphertexts for the project are encrypted with (created on first use)."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._current.get(project_id)
+            if cached and cached[0] > now:
+                return cached[1]
+            self._load()
+            version = self._latest_version(project_id)
+            if version is None:
+                with self._store_lock():
+                    version = self._latest_version(project_id) or self._add_version(project_id)
+                logger.info(f"Created data key {project_id}:{version}")
+            self._current[project_id] = (now + self.cache_ttl, version)
+            return version
+
+    def cipher(self, project_id: str, version: int) -> Fernet:
+        """The unwrapped data key for a project and version."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._keys.get((project_id, version))
+            if cached and cached[0] > now:
+                self.cache_hits += 1
+                return cached[1]
+            wrapped = self._wrapped.get(project_id, {}).get(str(version))
+            if wrapped is None:
+                self._load()  # Possibly created or rotated by another worker
+                wrapped = self._wrapped.get(project_id, {}).get(str(version))
+            if wrapped is None:
+                raise KeyError(f"Unknown data key {project_id}:{version}")
+            key = Fernet(self.master.decrypt(wrapped.encode()))
+            self.unwraps += 1
+            self._keys[(project_id, version)] = (now + self.cache_ttl, key)
+            return key
+
+    def encrypt(self, project_id: Optional[str], data: bytes) -> Tuple[str, bytes]:
+        """Encrypt with the project's current data key; returns (key_id, token)."""
+        project_id = project_id or DEFAULT_PROJECT
+        version = self.current_version(project_id)
+        return f"{project_id}:{version}", self.cipher(project_id, version).encrypt(data)
+
+    def decrypt(self, key_id: str, token: bytes) -> bytes:
+        project_id, version = split_key_id(key_id)
+        return self.cipher(project_id, version).decrypt(token)
+
+    def is_current(self, key_id: str) -> bool:
+        project_id, version = split_key_id(key_id)
+        return version == self.current_version(project_id)
+
+    # Rotation
+
+    def rotate_data_key(self, project_id: Optional[str] = None) -> str:
+        """Start a new data key version for the project; older versions remain readable."""
+        project_id = project_id or DEFAULT_PROJECT
+        with self._store_lock():
+            version = self._add_version(project_id)
+        with self._lock:
+            self._current[project_id] = (time.monotonic() + self.cache_ttl, version)
+        logger.info(f"Rotated data key for {project_id} to version {version}")
+        return f"{project_id}:{version}"
+
+    def rotate_master_key(self, new_master_key: bytes) -> int:
+        """Re-wrap every data key under a new master key; returns the number re-wrapped.
+
+        The previous master keys stay usable for unwrapping in this process; other
+        workers need the new key first in ``tractionbuild_MASTER_KEY`` (or Vault).
+        """
+        self.master_keys = [new_master_key] + [key for key in self.master_keys if key != new_master_key]
+        self.master = MultiFernet([Fernet(key) for key in self.master_keys])
+        rewrapped = 0
+        with self._store_lock():
+            for versions in self._wrapped.values():
+                for version, wrapped in versions.items():
+                    versions[version] = self.master.rotate(wrapped.encode()).decode()
+                    rewrapped += 1
+            self._persist()
+        logger.info(f"Re-wrapped {rewrapped} data keys under the new master key")
+        return rewrapped
+
+    def clear_cache(self):
+        with self._lock:
+            self._keys.clear()
+            self._current.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "projects": len(self._wrapped),
+                "cached_keys": len(self._keys),
+                "unwraps": self.unwraps,
+                "cache_hits": self.cache_hits,
+            }
+
+
+_manager: Optional[DataKeyManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_key_manager() -> DataKeyManager:
+    """The process-wide key manager, configured from DATA_KEY_* environment variables on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = DataKeyManager(
+                path=os.getenv("DATA_KEY_STORE_PATH", "data/keys/data_keys.json"),
+                cache_ttl=float(os.getenv("DATA_KEY_CACHE_SECONDS", "300")),
+            )
+        return _manager
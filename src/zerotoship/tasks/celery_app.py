@@ -9,9 +9,12 @@ import logging
 from typing import Dict, Any, Optional
 from celery import Celery
 from celery.signals import task_prerun, task_postrun, task_failure
+from kombu.serialization import register
 from datetime import datetime
 import json
 
+from ..core.codec import get_codec
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,6 +22,16 @@ logger = logging.getLogger(__name__)
 # Redis configuration
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
+# Task arguments and results use the shared codec (CODEC_FORMAT=json makes them readable)
+CODEC_SERIALIZER = 'tractionbuild'
+register(
+    CODEC_SERIALIZER,
+    lambda body: get_codec().encode(body, schema='celery'),
+    lambda payload: get_codec().decode(payload, schema='celery'),
+    content_type='application/x-tractionbuild',
+    content_encoding='binary',
+)
+
 # Configure Celery application
 app = Celery(
     'tractionbuild_tasks',
@@ -29,9 +42,10 @@ app = Celery(
 
 # Celery configuration
 app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    task_serializer=CODEC_SERIALIZER,
+    accept_content=[CODEC_SERIALIZER, 'json'],
+    result_serializer=CODEC_SERIALIZER,
+    result_accept_content=[CODEC_SERIALIZER, 'json'],
     timezone='UTC',
     enable_utc=True,
     task_track_started=True,
@@ -8,11 +8,12 @@ import json
 from typing import Dict, Any, Optional
 from datetime import datetime
 from celery import current_task
-from codecarbon import EmissionsTracker
 
 from .celery_app import app
 from ..crews import CREW_REGISTRY
 from ..core.project_meta_memory import ProjectMetaMemoryManager
+from ..core.emissions_sampler import get_emissions_sampler
+from ..core.input_projection import project_for_crew
 from ..utils.logging import setup_logging
 
 logger = logging.getLogger(__name__)
@@ -34,13 +35,9 @@ def execute_crew_task(self, crew_name: str, project_data: Dict[str, Any]) -> Dic
     
     logger.info(f"Starting crew task {crew_name} with task ID: {task_id}")
     
-    # Initialize emissions tracking
-    tracker = EmissionsTracker(
-        project_name=f"tractionbuild_{crew_name}",
-        measure_power_secs=15,  # Measure every 15 seconds
-        save_to_file=False,
-        logging_logger=logger
-    )
+    # Emissions come from the worker's shared sampler, attributed by this task's start and end
+    sampler = get_emissions_sampler()
+    tracker = None
     
     try:
         # Update task progress
@@ -55,7 +52,7 @@ def execute_crew_task(self, crew_name: str, project_data: Dict[str, Any]) -> Dic
             raise ValueError(f"Crew '{crew_name}' not found in registry. Available crews: {list(CREW_REGISTRY.keys())}")
         
         # Start emissions tracking
-        tracker.start()
+        tracker = sampler.begin()
         
         # Update progress
         self.update_state(
@@ -63,8 +60,8 @@ def execute_crew_task(self, crew_name: str, project_data: Dict[str, Any]) -> Dic
             meta={'status': 'Executing crew tasks', 'progress': 30}
         )
         
-        # Instantiate and run crew
-        crew_instance = crew_class(project_data)
+        # Instantiate and run crew (on its declared inputs; also guards reads in debug mode)
+        crew_instance = crew_class(project_for_crew(crew_class, project_data))
         
         # Run the async crew execution in the sync Celery task
         loop = asyncio.new_event_loop()
@@ -76,7 +73,9 @@ def execute_crew_task(self, crew_name: str, project_data: Dict[str, Any]) -> Dic
             loop.close()
         
         # Stop emissions tracking
-        emissions = tracker.stop()
+        usage = sampler.end(tracker)
+        tracker = None
+        emissions = usage.co2_emissions_kg
         
         # Update progress
         self.update_state(
@@ -99,8 +98,8 @@ def execute_crew_task(self, crew_name: str, project_data: Dict[str, Any]) -> Dic
                 },
                 'sustainability': {
                     'co2_emissions_kg': float(emissions) if emissions else 0.0,
-                    'energy_consumed_kwh': getattr(tracker, 'energy_consumed', 0.0),
-                    'carbon_intensity': getattr(tracker, 'carbon_intensity', 0.0)
+                    'energy_consumed_kwh': usage.energy_consumed_kwh,
+                    'carbon_intensity': usage.carbon_intensity
                 }
             })
         
@@ -110,10 +109,7 @@ def execute_crew_task(self, crew_name: str, project_data: Dict[str, Any]) -> Dic
         
     except Exception as e:
         # Stop tracker in case of error
-        try:
-            emissions = tracker.stop()
-        except:
-            emissions = 0.0
+        emissions = sampler.end(tracker).co2_emissions_kg if tracker else 0.0
             
         error_result = {
             'error': str(e),
@@ -137,6 +133,49 @@ def execute_crew_task(self, crew_name: str, project_data: Dict[str, Any]) -> Dic
         raise self.retry(countdown=60, max_retries=3, exc=e)
 
 
+def submit_crew_task(crew_name: str, project_data: Dict[str, Any], **options):
+    """
+    Queue execute_crew_task with only the inputs the crew declares.
+    
+    Args:
+        crew_name: Name of the crew to execute
+        project_data: Full project state; projected to the crew's ``input_paths`` before serialization
+        **options: Passed through to ``apply_async`` (queue, countdown, ...)
+        
+    Returns:
+        The Celery AsyncResult
+    """
+    crew_class = CREW_REGISTRY.get(crew_name)
+    payload = project_for_crew(crew_class, project_data) if crew_class else project_data
+    return execute_crew_task.apply_async(args=(crew_name, dict(payload)), **options)
+
+
+@app.task(name="reencrypt_project_outputs", bind=True)
+def reencrypt_project_outputs(self, project_data: Dict[str, Any], rotate: bool = True) -> Dict[str, Any]:
+    """
+    Rotate a project's data key and re-encrypt its serialized crew outputs under it.
+    
+    Args:
+        project_data: Project data containing serialized outputs (updated in place)
+        rotate: Start a new data key version first; False only migrates stragglers
+        
+    Returns:
+        The updated project data and the number of outputs re-encrypted
+    """
+    from ..core.output_serializer import output_serializer
+    
+    project_id = project_data.get('id')
+    key_id = output_serializer.key_manager.rotate_data_key(project_id) if rotate else None
+    reencrypted = output_serializer.reencrypt_outputs(project_data)
+    logger.info(f"Re-encrypted {reencrypted} outputs for project {project_id}")
+    return {
+        'project_data': project_data,
+        'reencrypted': reencrypted,
+        'key_id': key_id,
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+
 @app.task(name="validate_project_data", bind=True)
 def validate_project_data(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
     """
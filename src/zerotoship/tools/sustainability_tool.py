@@ -4,13 +4,14 @@ Tracks carbon footprint and environmental impact of AI operations.
 """
 
 from crewai.tools import BaseTool
-from codecarbon import EmissionsTracker
 from typing import Callable, Any, Dict, Optional
 from pydantic import BaseModel, Field
 import functools
 import time
 import os
 
+from ..core.emissions_sampler import get_emissions_sampler
+
 class SustainabilityArgs(BaseModel):
     """Arguments for the Sustainability Tool."""
     function_name: str = Field(..., description="Name of the function to track")
@@ -33,35 +34,24 @@ class SustainabilityTrackerTool(BaseTool):
 
     def _run(self, function_name: str, project_name: str = "tractionbuild_Crew_Execution") -> Dict[str, Any]:
         """
-        Track emissions for a function execution.
+        Report the process's emissions so far, as measured by the shared sampler.
         
         Args:
-            function_name: Name of the function being tracked
+            function_name: Name of the function being reported on
             project_name: Project name for emissions tracking
             
         Returns:
             Dictionary containing emissions data
         """
         try:
-            # Using offline mode is best for local hardware calibration
-            tracker = EmissionsTracker(
-                project_name=project_name,
-                tracking_mode=self.tracking_mode,
-                output_dir=self.output_dir,
-                log_level='error'  # Reduce logging noise
-            )
-            
-            tracker.start()
-            
-            # Simulate some computation time for demonstration
-            time.sleep(0.1)
-            
-            emissions = tracker.stop()
+            # Report the process-wide sampler's totals; no tracker is started for the call
+            totals = get_emissions_sampler().totals()
             
             return {
                 "function_name": function_name,
                 "project_name": project_name,
-                "co2_emissions_kg": emissions,
+                "co2_emissions_kg": totals["co2_emissions_kg"],
+                "energy_consumed_kwh": totals["energy_consumed_kwh"],
                 "tracking_mode": self.tracking_mode,
                 "status": "success",
                 "timestamp": time.time()
@@ -89,23 +79,18 @@ class SustainabilityTrackerTool(BaseTool):
         """
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            tracker = EmissionsTracker(
-                project_name=f"tractionbuild_{func.__name__}",
-                tracking_mode=self.tracking_mode,
-                output_dir=self.output_dir
-            )
-            
-            tracker.start()
+            sampler = get_emissions_sampler()
+            tracker = sampler.begin()
             try:
                 result = func(*args, **kwargs)
-                emissions = tracker.stop()
+                emissions = sampler.end(tracker).co2_emissions_kg
                 
                 # Log emissions data
                 print(f"🌱 Function {func.__name__} emitted {emissions:.6f} kg CO2")
                 
                 return result
             except Exception as e:
-                tracker.stop()
+                sampler.end(tracker)
                 raise e
                 
         return wrapper
@@ -5,6 +5,7 @@ Provides robust usage tracking and cost control for LLM operations.
 
 import os
 import sqlite3
+import threading
 import json
 import hashlib
 from datetime import datetime, timezone
@@ -362,5 +363,21 @@ class BudgetStore:
             conn.commit()
             logger.info(f"Reset usage for {scope} ({period})")
 
-# Global instance
-budget_store = BudgetStore()
+_budget_store: Optional[BudgetStore] = None
+_budget_store_lock = threading.Lock()
+
+
+def get_budget_store() -> BudgetStore:
+    """The process-wide budget store at BUDGET_DB_PATH, created (with its database) on first use."""
+    global _budget_store
+    with _budget_store_lock:
+        if _budget_store is None:
+            _budget_store = BudgetStore(os.getenv("BUDGET_DB_PATH") or None)
+        return _budget_store
+
+
+def __getattr__(name: str) -> Any:
+    # The old module-level ``budget_store`` instance, now created on first access rather than on import
+    if name == "budget_store":
+        return get_budget_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
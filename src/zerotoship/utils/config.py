@@ -46,7 +46,7 @@ class Config(BaseModel):
     enable_multi_tenant_safety: bool = Field(default=True, description="Enable multi-tenant safety")
     
     # Memory settings
-    memory_file_path: str = Field(default="data/project_memory.json", description="Memory file path")
+    memory_file_path: str = Field(default="data/project_memory.bin", description="Memory file path")
     max_memory_entries_per_type: int = Field(default=1000, description="Max memory entries per type")
     memory_retention_days: int = Field(default=365, description="Memory retention in days")
     
@@ -93,7 +93,7 @@ class Config(BaseModel):
         env_data["enable_multi_tenant_safety"] = os.getenv("ENABLE_MULTI_TENANT_SAFETY", "true").lower() == "true"
         
         # Memory settings
-        env_data["memory_file_path"] = os.getenv("MEMORY_FILE_PATH", "data/project_memory.json")
+        env_data["memory_file_path"] = os.getenv("MEMORY_FILE_PATH", "data/project_memory.bin")
         env_data["max_memory_entries_per_type"] = int(os.getenv("MAX_MEMORY_ENTRIES_PER_TYPE", "1000"))
         env_data["memory_retention_days"] = int(os.getenv("MEMORY_RETENTION_DAYS", "365"))
         
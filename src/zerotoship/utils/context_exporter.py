@@ -1,6 +1,6 @@
-import json
 import os
 from typing import Dict, Any
+from ..core.codec import get_codec
 from ..core.context_bus import ContextBus
 
 async def export_context_to_graph(context_bus: ContextBus, output_dir: str = "output"):
@@ -10,12 +10,10 @@ async def export_context_to_graph(context_bus: ContextBus, output_dir: str = "ou
     edges = []
     
     executed_states = []
-    for event in history:
-        event_name = event.get("name", "")
-        if event_name.endswith("_executed"):
-            state = event_name.replace("_executed", "")
-            nodes.add(state)
-            executed_states.append(state)
+    for event in await context_bus.get_history(name="*_executed"):
+        state = event.get("name", "").replace("_executed", "")
+        nodes.add(state)
+        executed_states.append(state)
 
     for i in range(len(executed_states) - 1):
         edges.append({
@@ -42,11 +40,9 @@ async def export_context_to_graph(context_bus: ContextBus, output_dir: str = "ou
         "full_history": history, # include for debugging
     }
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    output_path = os.path.join(output_dir, "context_graph.json")
-    with open(output_path, 'w') as f:
-        json.dump(graph_data, f, indent=2)
+    codec = get_codec()
+    extension = "json" if codec.format == "json" else "bin"
+    output_path = os.path.join(output_dir, f"context_graph.{extension}")
+    codec.dump(graph_data, output_path, schema="context_graph")
 
     print(f"Context graph exported to {output_path}")
@@ -0,0 +1,73 @@
+"""
+Shared pytest fixtures.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubServer:
+    """Local HTTP server serving canned responses, for tests that fetch over the network.
+
+    ``routes`` maps a path to ``{"body": str, "content_type": str, "etag": str, "delay": float,
+    "status": int}``; every request is counted in ``hits`` by path.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.hits = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                import time
+
+                stub.hits[self.path] = stub.hits.get(self.path, 0) + 1
+                route = stub.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                time.sleep(route.get("delay", 0))
+                etag = route.get("etag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = route.get("body", "").encode()
+                self.send_response(route.get("status", 200))
+                self.send_header("Content-Type", route.get("content_type", "application/json"))
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
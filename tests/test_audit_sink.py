@@ -0,0 +1,61 @@
+"""
+Tests for the batched vault audit sink.
+"""
+import asyncio
+
+import pytest
+from cryptography.fernet import Fernet
+
+from zerotoship.security.audit_sink import VaultAuditSink
+
+
+def test_audit_sink_batches_encrypts_and_flushes_on_close(tmp_path):
+    path = tmp_path / "audit.log"
+    sink = VaultAuditSink(path=str(path), batch_size=10, flush_interval=0.05, fsync="always",
+                          key=Fernet.generate_key())
+    for i in range(25):
+        assert sink.submit("execution_success", {"crew_name": "ValidatorCrew", "run": i})
+    sink.flush()
+    assert sink.written == 25 and sink.batches >= 3
+    assert b"ValidatorCrew" not in path.read_bytes()  # Each batch is one encrypted line
+
+    sink.submit("execution_error", {"run": 25})
+    sink.close()  # Records still queued at shutdown are written
+    records = list(sink.read())
+    assert [r["details"]["run"] for r in records] == list(range(26))
+    assert records[-1]["event_type"] == "execution_error"
+    assert len(path.read_bytes().splitlines()) == sink.batches
+
+
+
+def test_process_sink_survives_workflows_and_reopens_after_close(tmp_path, monkeypatch):
+    from zerotoship.security import audit_sink
+
+    monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.log"))
+    monkeypatch.setenv("tractionbuild_AUDIT_KEY", Fernet.generate_key().decode())
+    monkeypatch.setattr(audit_sink, "_sink", None)
+
+    first = audit_sink.get_audit_sink()
+    first.submit("execution_success", {"run": 1})
+    audit_sink.flush_audit_sink()  # What each orchestrator does on exit
+    assert audit_sink.get_audit_sink() is first and first.written == 1
+
+    audit_sink.close_audit_sink()
+    second = audit_sink.get_audit_sink()
+    assert second is not first and second.submit("execution_success", {"run": 2})
+    audit_sink.close_audit_sink()
+    assert [r["details"]["run"] for r in second.read()] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_sinks_without_audit_key_share_the_master_key(tmp_path, monkeypatch):
+    monkeypatch.delenv("tractionbuild_AUDIT_KEY", raising=False)
+    monkeypatch.setenv("tractionbuild_MASTER_KEY", Fernet.generate_key().decode())
+    path = str(tmp_path / "audit.log")
+
+    writer = VaultAuditSink(path=path, flush_interval=0.01, overflow="drop")
+    assert await writer.submit_async("execution_success", {"run": 1})
+    await asyncio.to_thread(writer.close)
+
+    # Another worker (or the same one after a restart) reads the line
+    assert [r["details"]["run"] for r in VaultAuditSink(path=path).read()] == [1]
@@ -0,0 +1,59 @@
+"""
+Tests for the executor Autoscaler, driven by a synthetic sleeping-task workload.
+"""
+import asyncio
+
+import pytest
+
+from zerotoship.core.autoscaler import Autoscaler
+from zerotoship.core.distributed_executor import DistributedExecutor
+
+
+class SleepingRouter:
+    crew_classes = {}
+
+    async def execute(self, state, context, project_data):
+        await asyncio.sleep(0.05)
+        return {"status": "success"}, "SleepCrew"
+
+
+class RecordingGauge:
+    def __init__(self):
+        self.value = None
+
+    def set(self, value):
+        self.value = value
+
+
+@pytest.mark.asyncio
+async def test_autoscaler_grows_under_load_and_shrinks_with_hysteresis():
+    executor = DistributedExecutor(SleepingRouter(), max_workers=1, single_flight=False)
+    gauge = RecordingGauge()
+    autoscaler = Autoscaler(executor, {"up": 2.0, "down": 5.0, "min_workers": 1, "max_workers": 4,
+                                       "cooldown_seconds": 1.0}, metrics={"executor_workers": gauge})
+    await executor.start()
+
+    tasks = [asyncio.create_task(executor.schedule("IDEA_VALIDATION", {}, {"id": f"p{i % 3}"})) for i in range(20)]
+    await asyncio.sleep(0)
+
+    # Backlog above 2 tasks/worker: grow one step per evaluation, respecting the cooldown
+    assert (await autoscaler.evaluate(now=0.0)).direction == "up"
+    assert (await autoscaler.evaluate(now=0.5)).reason == "cooldown"
+    assert (await autoscaler.evaluate(now=1.0)).workers == 3
+    assert (await autoscaler.evaluate(now=2.0)).workers == 4
+    assert (await autoscaler.evaluate(now=3.0)).direction == "hold"  # At max_workers
+    assert gauge.value == 4 and len(executor.workers) == 4
+
+    await asyncio.gather(*tasks)
+
+    # Idle workers must stay idle for "down" seconds before the pool shrinks
+    assert (await autoscaler.evaluate(now=10.0)).direction == "hold"
+    assert (await autoscaler.evaluate(now=14.0)).direction == "hold"
+    assert (await autoscaler.evaluate(now=15.0)).workers == 3
+    await asyncio.sleep(0)
+    assert len(executor.workers) == 3
+    assert [d.direction for d in autoscaler.decisions] == ["up", "up", "up", "down"]
+
+    # The shrunken pool still serves work
+    assert await executor.schedule("IDEA_VALIDATION", {}, {"id": "p0"}) == ({"status": "success"}, "SleepCrew")
+    await executor.stop()
@@ -0,0 +1,71 @@
+"""
+Tests for the content-addressed BlobStore and blob offload in ContextBus.
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from zerotoship.core.blob_store import BlobStore, BlobRef
+from zerotoship.core.context_bus import ContextBus
+
+
+def test_blob_store_offloads_above_threshold(tmp_path):
+    store = BlobStore(root=str(tmp_path), threshold_bytes=100)
+    big = {"text": "x" * 500}
+
+    assert store.offload("short") == "short"
+    assert store.offload(42) == 42
+
+    ref = store.offload(big)
+    assert BlobRef.is_ref(ref)
+    assert store.offload(dict(big)) == ref  # Identical content shares one blob
+    assert len(list(tmp_path.rglob(ref.digest))) == 1
+
+    # References survive a JSON round trip and resolve to fresh copies
+    restored = json.loads(json.dumps({"full_result": ref}))
+    value = store.resolve(restored["full_result"])
+    assert value == big
+    value["text"] = "mutated"
+    assert BlobStore(root=str(tmp_path)).resolve(ref) == big
+
+    assert store.resolve_all({"items": [ref, 1]}) == {"items": [big, 1]}
+
+
+@pytest.mark.asyncio
+async def test_context_bus_keeps_references_in_snapshots(tmp_path):
+    ctx = ContextBus(blob_store=BlobStore(root=str(tmp_path), threshold_bytes=100))
+    await ctx.merge({"build": {"code": "y" * 1000}, "idea": "small"})
+
+    snap = await ctx.snapshot()
+    raw = snap.to_dict()
+    assert raw["idea"] == "small"
+    assert BlobRef.is_ref(raw["build"])
+    assert len(json.dumps(raw)) < 200
+
+    # Values are resolved lazily on access
+    assert snap["build"] == {"code": "y" * 1000}
+    assert await ctx.get("build") == {"code": "y" * 1000}
+    assert dict(snap)["build"] == {"code": "y" * 1000}
+
+
+def test_blob_store_round_trips_types_and_keeps_unencodable_values_inline(tmp_path):
+    store = BlobStore(root=str(tmp_path), threshold_bytes=100)
+    big = {"at": datetime(2025, 1, 2), "tags": {"a", "b"}, "text": "z" * 500}
+
+    ref = store.offload(big)
+    assert BlobRef.is_ref(ref)
+    assert store.resolve(ref) == big  # Same types as the inline value, not strings
+
+    class Report:
+        def __init__(self):
+            self.body = "r" * 500
+
+    report = {"report": Report()}
+    assert store.offload(report) is report
+    with pytest.raises(TypeError):
+        store.put(report)
+
+    # Blobs written as plain JSON before the codec still resolve
+    legacy = store._put_encoded(json.dumps({"text": "old" * 100}).encode())
+    assert store.resolve(legacy) == {"text": "old" * 100}
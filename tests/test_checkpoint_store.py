@@ -0,0 +1,157 @@
+"""
+Tests for workflow checkpoints and WorkflowEngine.resume.
+"""
+import pytest
+
+from zerotoship.database.checkpoint_store import SQLiteCheckpointStore
+from zerotoship.core.workflow_engine import WorkflowEngine
+from zerotoship.core.learning_memory import LearningMemory
+from zerotoship.core.crew_router import CrewRouter
+from zerotoship.core.context_bus import ContextBus
+from zerotoship.core.distributed_executor import DistributedExecutor
+from zerotoship.core.project_meta_memory import ProjectMetaMemoryManager, ProjectMetaMemory
+
+runs = []
+
+
+class ValidatorCrew:
+    def __init__(self, project_data: dict):
+        pass
+
+    async def run(self, context):
+        runs.append("ValidatorCrew")
+        return {"status": "success", "message": "validated", "data": {"validation": {"passed": True}}}
+
+
+class BrokenBuilderCrew:
+    def __init__(self, project_data: dict):
+        pass
+
+    async def run(self, context):
+        return {"status": "error", "message": "provider down", "error_category": "permanent"}
+
+
+class BuilderCrew:
+    def __init__(self, project_data: dict):
+        pass
+
+    async def run(self, context):
+        runs.append("BuilderCrew")
+        return {"status": "success", "message": "built", "data": {"build": {"status": "completed"}}}
+
+
+@pytest.mark.asyncio
+async def test_sqlite_checkpoint_store_roundtrip(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+
+    assert await store.load("p1") is None
+    await store.save("p1", {"state": "TASK_EXECUTION", "project_data": {"id": "p1"}})
+    await store.save("p1", {"state": "COMPLETED", "project_data": {"id": "p1"}})
+
+    checkpoint = await store.load("p1")
+    assert checkpoint["state"] == "COMPLETED"
+
+    await store.delete("p1")
+    assert await store.load("p1") is None
+
+
+@pytest.mark.asyncio
+async def test_registry_snapshot_keeps_resume_context(tmp_path):
+    from zerotoship.database.project_registry import ProjectRegistry
+
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    registry = ProjectRegistry(checkpoint_store=store)
+    await registry.save_snapshot("missing", {"workflow_metrics": {}})
+    assert await store.load("missing") is None  # No checkpoint is invented
+
+    await store.save("p1", {"state": "BUILD", "context": {"validation": {"passed": True}}})
+    await registry.save_snapshot("p1", {"validation": {"passed": True}, "partial": "from failed run"})
+    checkpoint = await store.load("p1")
+    assert checkpoint["context"] == {"validation": {"passed": True}}  # What resume restores
+    assert checkpoint["final_context"]["partial"] == "from failed run"
+
+
+async def _make_engine(tmp_path, project_data, crew_classes, store):
+    context_bus = ContextBus()
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    crew_router = CrewRouter(crew_classes, context_bus, meta_memory)
+    executor = DistributedExecutor(crew_router, max_workers=1)
+    await executor.start()
+    engine = WorkflowEngine(project_data, crew_router=crew_router, context_bus=context_bus,
+                            memory=LearningMemory(store_path=str(tmp_path / "store.json")),
+                            project_meta_memory=meta_memory, executor=executor, checkpoint_store=store)
+    return engine, executor
+
+
+@pytest.mark.asyncio
+async def test_workflow_engine_resume_skips_completed_states(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    runs.clear()
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    sequence = [{"state": "IDEA_VALIDATION"}, {"state": "TASK_EXECUTION"}, {"state": "COMPLETED"}]
+    project_data = {"id": "resume_project", "idea": "resume", "state": "IDEA_VALIDATION", "workflow_sequence": sequence}
+
+    engine, executor = await _make_engine(
+        tmp_path, project_data,
+        {"IDEA_VALIDATION": [ValidatorCrew], "TASK_EXECUTION": [BrokenBuilderCrew]}, store)
+    result = await engine.run()
+    await executor.stop()
+    assert result["state"] == "FAILED"
+
+    checkpoint = await store.load("resume_project")
+    assert checkpoint["state"] == "TASK_EXECUTION"
+    assert checkpoint["completed_states"] == ["IDEA_VALIDATION"]
+
+    engine, executor = await _make_engine(
+        tmp_path, {"id": "resume_project"},
+        {"IDEA_VALIDATION": [ValidatorCrew], "TASK_EXECUTION": [BuilderCrew]}, store)
+    result = await engine.resume("resume_project")
+    await executor.stop()
+
+    assert result["state"] == "COMPLETED"
+    assert result["validation"] == {"passed": True}
+    assert runs == ["ValidatorCrew", "BuilderCrew"]
+    assert any(e["name"] == "IDEA_VALIDATION_executed" for e in result["event_history"])
+    assert result["event_count"] >= len(result["event_history"])
+    checkpoint = await store.load("resume_project")
+    assert checkpoint["history_length"] >= len(checkpoint["history"])
+
+
+@pytest.mark.asyncio
+async def test_route_and_execute_checkpoints_each_transition(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    sequence = [{"state": "IDEA_VALIDATION"}, {"state": "TASK_EXECUTION"}, {"state": "COMPLETED"}]
+    project_data = {"id": "stepped", "idea": "step", "state": "IDEA_VALIDATION", "workflow_sequence": sequence}
+    engine, executor = await _make_engine(
+        tmp_path, project_data, {"IDEA_VALIDATION": [ValidatorCrew], "TASK_EXECUTION": [BuilderCrew]}, store)
+
+    await engine.route_and_execute()
+    await executor.stop()
+
+    checkpoint = await store.load("stepped")
+    assert checkpoint["state"] == "TASK_EXECUTION"
+    assert checkpoint["completed_states"] == ["IDEA_VALIDATION"]
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_resumes_from_checkpoint(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from zerotoship.main import tractionbuildOrchestrator
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PROMETHEUS_PORT", "0")
+    runs.clear()
+    sequence = [{"state": "IDEA_VALIDATION"}, {"state": "TASK_EXECUTION"}, {"state": "COMPLETED"}]
+    async with tractionbuildOrchestrator() as orchestrator:
+        orchestrator.crew_router.crew_classes.update({"IDEA_VALIDATION": [ValidatorCrew], "TASK_EXECUTION": [BrokenBuilderCrew]})
+        result = await orchestrator.execute_workflow(
+            {"id": "crashed", "idea": "resume", "workflow": "test", "state": "IDEA_VALIDATION", "workflow_sequence": sequence})
+        assert result["state"] == "FAILED"
+
+    async with tractionbuildOrchestrator() as orchestrator:  # A new worker
+        orchestrator.crew_router.crew_classes.update({"IDEA_VALIDATION": [ValidatorCrew], "TASK_EXECUTION": [BuilderCrew]})
+        result = await orchestrator.resume_workflow("crashed")
+
+    assert result["state"] == "COMPLETED"
+    assert runs == ["ValidatorCrew", "BuilderCrew"]
@@ -0,0 +1,105 @@
+"""
+Tests for the shared payload codec.
+"""
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+from zerotoship.core.codec import COMPRESSIONS, FORMATS, ZSTD_AVAILABLE, Codec, CodecError
+from zerotoship.core.learning_memory import LearningMemory
+from zerotoship.core.project_meta_memory import MemoryType, ProjectMetaMemoryManager, ProjectMetaMemory
+from zerotoship.database.checkpoint_store import SQLiteCheckpointStore
+
+
+PAYLOAD = {
+    "at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "day": date(2025, 1, 2),
+    "tags": {"a", "b"},
+    "type": MemoryType.HEURISTIC,
+    "raw": b"\x00\x01",
+    "nested": [{"__t__": "set", "v": [1]}, {3: "int key"}],
+    "text": "growth " * 500,
+}
+
+
+@pytest.mark.parametrize("format,compression", [("compact", "none"), ("compact", "zlib"), ("json", "none")])
+def test_codec_roundtrips_tagged_types_in_versioned_envelopes(format, compression):
+    codec = Codec(format=format, compression=compression)
+    blob = codec.encode(PAYLOAD, schema="checkpoint", version=2)
+
+    envelope = codec.decode_envelope(blob)
+    assert envelope.schema == "checkpoint" and envelope.version == 2
+    assert envelope.data == PAYLOAD
+    assert type(envelope.data["type"]) is MemoryType
+
+    if format == "json":
+        assert json.loads(blob)["schema"] == "checkpoint"  # Readable for debugging
+    else:
+        assert blob.startswith(b"TB")
+        assert Codec(format="json").decode(blob) == PAYLOAD  # Readers decode whatever was written
+    if compression == "zlib":
+        assert len(blob) < len(Codec(format=format, compression="none").encode(PAYLOAD))
+
+    with pytest.raises(CodecError):
+        codec.decode(blob, schema="learning_memory")
+    assert codec.decode('{"legacy": true}', schema="checkpoint") == {"legacy": True}
+
+
+@pytest.mark.parametrize("format,compression,module", [
+    ("msgpack", "none", "msgpack"), ("msgpack", "zstd", "msgpack"), ("compact", "zstd", "zstandard"),
+])
+def test_codec_roundtrips_with_optional_backends(format, compression, module):
+    pytest.importorskip(module)
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    codec = Codec(format=format, compression=compression)
+    assert (codec.format, codec.compression) == (format, compression)  # No silent fallback
+
+    blob = codec.encode(PAYLOAD, schema="checkpoint")
+    assert blob[3:5] == bytes([FORMATS.index(format), COMPRESSIONS.index(compression)])
+    assert codec.decode(blob, schema="checkpoint") == PAYLOAD
+    assert type(codec.decode(blob)["type"]) is MemoryType
+    assert Codec(format="json", compression="none").decode(blob) == PAYLOAD
+
+
+def test_codec_defaults_compress_without_zstandard():
+    assert Codec().compression == ("zstd" if ZSTD_AVAILABLE else "zlib")
+    assert Codec(compression="zstd").compression == ("zstd" if ZSTD_AVAILABLE else "zlib")
+
+
+@pytest.mark.asyncio
+async def test_stores_read_legacy_json_and_write_codec_payloads(tmp_path):
+    memory_file = tmp_path / "memory.json"
+    memory_file.write_text(json.dumps({"entries": [{
+        "id": "m1", "type": "heuristic", "priority": "high", "content": {"tip": "ship"},
+        "created_at": "2025-01-02 03:04:05", "last_accessed": "2025-01-02 03:04:05", "tags": ["growth"],
+    }]}, indent=2))
+
+    legacy = memory_file.read_bytes()
+    codec_file = tmp_path / "memory.bin"
+
+    # The legacy .json beside the store is read once; saves go to the codec file only
+    manager = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(codec_file)))
+    assert manager.memory_entries["m1"].created_at == datetime(2025, 1, 2, 3, 4, 5)
+    manager._save_memory()
+    manager._save_memory()
+    assert not codec_file.read_bytes().startswith(b"{") and memory_file.read_bytes() == legacy
+    assert (tmp_path / "memory.backup.bin").exists()
+    reloaded = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(codec_file)))
+    assert reloaded.memory_entries["m1"].tags == {"growth"}
+
+    (tmp_path / "store.json").write_text(json.dumps([{"id": "p", "text": "idea"}]))
+    learning = LearningMemory(store_path=str(tmp_path / "store.bin"))
+    await learning.load()
+    await learning.persist()
+    assert learning._entries == [{"id": "p", "text": "idea"}] and (tmp_path / "store.bin").exists()
+
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    conn = store._get_connection()
+    with conn:
+        conn.execute("INSERT INTO checkpoints VALUES (?, ?, ?, ?)", ("old", "BUILD", '{"state": "BUILD"}', ""))
+    conn.close()
+    assert await store.load("old") == {"state": "BUILD"}
+    await store.save("new", PAYLOAD)
+    assert await store.load("new") == PAYLOAD
@@ -165,6 +165,75 @@ async def test_context_bus_merge_none():
     assert snap["foo"] == "bar"
 
 
+@pytest.mark.asyncio
+async def test_context_bus_versions_and_snapshot_isolation():
+    """Test that writes publish new versions and snapshots are copy-on-write."""
+    ctx = ContextBus()
+
+    version = await ctx.set("a", 1)
+    snap = await ctx.snapshot()
+    assert snap.version == version
+
+    new_version = await ctx.merge({"a": 2, "b": 3})
+    assert new_version == version + 1
+    assert snap["a"] == 1
+    assert "b" not in snap
+
+    # Writing to a snapshot never leaks into the bus
+    snap["c"] = 4
+    assert await ctx.get("c") is None
+    assert (await ctx.snapshot()).to_dict() == {"a": 2, "b": 3}
+
+
+@pytest.mark.asyncio
+async def test_context_bus_subscribe_streams_deltas():
+    """Test that subscribers receive filtered per-key deltas."""
+    ctx = ContextBus()
+    await ctx.set("crew_a", 0)
+
+    with ctx.subscribe(prefix="crew_") as sub:
+        await ctx.set("crew_a", 1)
+        await ctx.set("other", 1)
+        await ctx.merge({"crew_b": 2, "other": 2})
+        first, second = await sub.__anext__(), await sub.__anext__()
+        await ctx.clear()
+
+    assert (first.key, first.old_version, first.new_version, first.value) == ("crew_a", 1, 2, 1)
+    assert (second.key, second.old_version, second.new_version, second.value) == ("crew_b", 3, 4, 2)
+    deleted = sorted([(d.key, d.new_version, d.deleted) async for d in sub])
+    assert deleted == [("crew_a", 5, True), ("crew_b", 5, True)]
+
+
+@pytest.mark.asyncio
+async def test_context_bus_subscription_coalesces_and_drops():
+    """Test the bounded per-subscriber buffer policy."""
+    ctx = ContextBus()
+    sub = ctx.subscribe(keys=["a", "b", "c"], maxsize=2)
+
+    await ctx.set("a", 1)
+    await ctx.set("a", 2)  # Coalesced with the pending "a" delta
+    assert sub.pending() == 1
+
+    await ctx.set("b", 1)
+    await ctx.set("c", 1)  # Buffer full: the oldest pending key ("a") is dropped
+    assert sub.dropped == 1
+
+    reader = asyncio.create_task(sub.__anext__())
+    assert (await reader).key == "b"
+    delta = await sub.__anext__()
+    assert (delta.key, delta.old_version, delta.new_version, delta.value) == ("c", 3, 4, 1)
+
+    # A waiting reader is woken by the next write, and iteration ends on close
+    waiter = asyncio.create_task(sub.__anext__())
+    await asyncio.sleep(0)
+    await ctx.set("a", 3)
+    assert (await waiter).value == 3
+    sub.close()
+    assert [d async for d in sub] == []
+    await ctx.set("a", 4)
+    assert sub.pending() == 0
+
+
 if __name__ == "__main__":
     # Run tests with pytest
     pytest.main([__file__, "-v"])
@@ -0,0 +1,90 @@
+"""
+Tests for the warm crew instance pool.
+"""
+import pytest
+
+from zerotoship.core.context_bus import ContextBus
+from zerotoship.core.crew_pool import CrewPool
+from zerotoship.core.crew_router import CrewRouter
+from zerotoship.core.project_meta_memory import ProjectMetaMemory, ProjectMetaMemoryManager
+
+
+class PooledCrew:
+    reusable = True
+    built = 0
+
+    def __init__(self, project_data):
+        PooledCrew.built += 1
+        self.project_data = project_data
+        self.broken = False
+
+    def reset(self, project_data):
+        self.project_data = project_data
+
+    def healthy(self):
+        return not self.broken
+
+    async def run(self, context):
+        self.project_data.update(context)
+        return {"status": "success", "project": self.project_data["id"], "instance": id(self)}
+
+
+@pytest.mark.asyncio
+async def test_router_reuses_warm_crews_across_projects(tmp_path):
+    PooledCrew.built = 0
+    memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    router = CrewRouter({"IDEA_VALIDATION": [PooledCrew]}, ContextBus(), memory)
+    assert router.crew_workers == {"PooledCrew": 1}
+
+    first, _ = await router.execute("IDEA_VALIDATION", {"step": 1}, {"id": "a"})
+    second, _ = await router.execute("IDEA_VALIDATION", {"step": 2}, {"id": "a"})
+    other, _ = await router.execute("IDEA_VALIDATION", {}, {"id": "b"})
+    assert first["instance"] == second["instance"] == other["instance"] and PooledCrew.built == 1
+    assert other["project"] == "b"  # Reset onto the caller's project before every run
+
+
+def test_pool_recycles_unhealthy_aged_and_surplus_instances():
+    PooledCrew.built = 0
+    pool = CrewPool(PooledCrew, size=1, max_age_seconds=3600.0, max_uses=2)
+    project = {"id": "p"}
+
+    a, b = pool.checkout(project), pool.checkout(project)  # Concurrent demand builds a second instance
+    pool.checkin(a)
+    pool.checkin(b)  # Surplus over size is dropped
+    assert pool.idle_count() == 1 and PooledCrew.built == 2
+
+    c = pool.checkout({"id": "p", "idea": "new"})
+    assert c is a and c.crew.project_data["idea"] == "new"
+    pool.checkin(c)  # Second use reaches max_uses
+    assert pool.idle_count() == 0 and pool.recycled == 1
+
+    d = pool.checkout(project)
+    d.crew.broken = True
+    pool.checkin(d)
+    assert pool.idle_count() == 0
+
+    e = pool.checkout(project)
+    pool.checkin(e, healthy=False)  # A failed run is never reused
+    pool.max_age_seconds = 0
+    f = pool.checkout(project)
+    pool.checkin(f)
+    assert pool.idle_count() == 0 and PooledCrew.built == 5
+
+
+def test_base_crew_reset_rebuilds_tasks_from_the_new_project():
+    pytest.importorskip("crewai")
+    from zerotoship.crews.base_crew import BaseCrew
+
+    class PromptCrew(BaseCrew):
+        def _create_crew(self):
+            return type("Crew", (), {"agents": ["writer"], "tasks": [f"Validate {self.get_project_context()['idea']}"]})()
+
+        async def _execute_crew(self, inputs):
+            return {}
+
+    crew = PromptCrew({"id": "a", "idea": "first"})
+    assert crew.crew.tasks == ["Validate first"] and crew.healthy()
+    vault = crew.vault_client
+    crew.reset({"id": "b", "idea": "second"})
+    assert crew.crew.tasks == ["Validate second"]  # Not the first run's prompt
+    assert crew.vault_client is vault  # Clients stay warm
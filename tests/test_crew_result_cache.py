@@ -0,0 +1,109 @@
+"""
+Tests for the content-addressed CrewResultCache and its use in CrewRouter.
+"""
+import pytest
+
+from zerotoship.core.crew_result_cache import CrewResultCache, make_cache_key
+from zerotoship.core.crew_router import CrewRouter
+from zerotoship.core.context_bus import ContextBus
+from zerotoship.core.project_meta_memory import ProjectMetaMemoryManager, ProjectMetaMemory
+
+
+class CountingCrew:
+    cache_inputs = ("idea",)
+    calls = 0
+
+    def __init__(self, project_data: dict):
+        pass
+
+    async def run(self, context):
+        CountingCrew.calls += 1
+        return {"status": "success", "message": "ok", "data": {"answer": context["idea"]}, "token_usage": 1000}
+
+
+def test_make_cache_key_uses_declared_inputs_only():
+    key = make_cache_key("IDEA_VALIDATION", CountingCrew, {"idea": "x", "timestamp": 1})
+    assert key == make_cache_key("IDEA_VALIDATION", CountingCrew, {"idea": "x", "timestamp": 2})
+    assert key != make_cache_key("IDEA_VALIDATION", CountingCrew, {"idea": "y"})
+    assert key != make_cache_key("LAUNCH", CountingCrew, {"idea": "x"})
+    assert make_cache_key("IDEA_VALIDATION", object, {"idea": "x"}) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_lru_ttl_and_disk_tier(tmp_path):
+    cache = CrewResultCache(max_entries=1, cache_dir=str(tmp_path))
+    await cache.set("a", {"status": "success"})
+    await cache.set("b", {"status": "success"})
+
+    # "a" was evicted from memory but is still on disk
+    assert await cache.get("a") == {"status": "success"}
+    assert cache.stats()["hits"] == {"memory": 0, "disk": 1}
+
+    # A fresh cache over the same directory sees the disk tier
+    assert await CrewResultCache(cache_dir=str(tmp_path)).get("b") == {"status": "success"}
+
+    expired = CrewResultCache(ttl_seconds=-1)
+    await expired.set("c", {"status": "success"})
+    assert await expired.get("c") is None
+    assert expired.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_crew_router_serves_cache_hits(tmp_path):
+    CountingCrew.calls = 0
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    router = CrewRouter({"IDEA_VALIDATION": [CountingCrew]}, ContextBus(), meta_memory, result_cache=CrewResultCache())
+
+    first, _ = await router.execute("IDEA_VALIDATION", {"idea": "x"}, {"id": "p1"})
+    second, crew_name = await router.execute("IDEA_VALIDATION", {"idea": "x"}, {"id": "p2"})
+    assert CountingCrew.calls == 1
+    assert second["cache_hit"] is True
+    assert second["data"] == first["data"]
+    assert crew_name == "CountingCrew"
+
+    # Workflows can opt out through their metadata
+    await router.execute("IDEA_VALIDATION", {"idea": "x"}, {"id": "p3", "metadata": {"cache": False}})
+    assert CountingCrew.calls == 2
+
+
+class RecordingBudgetStore:
+    def __init__(self):
+        self.records = []
+
+    def record_usage(self, record):
+        self.records.append(record)
+        return True
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_is_not_charged(tmp_path):
+    from zerotoship.core.workflow_engine import WorkflowEngine
+    from zerotoship.core.distributed_executor import DistributedExecutor
+
+    CountingCrew.calls = 0
+    budget_store = RecordingBudgetStore()
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    context_bus = ContextBus()
+    router = CrewRouter({"IDEA_VALIDATION": [CountingCrew]}, context_bus, meta_memory, result_cache=CrewResultCache())
+    executor = DistributedExecutor(router, max_workers=1)
+    await executor.start()
+    for project_id in ("p1", "p2"):
+        project_data = {"id": project_id, "idea": "x", "state": "IDEA_VALIDATION"}
+        engine = WorkflowEngine(project_data, crew_router=router, context_bus=context_bus, project_meta_memory=meta_memory,
+                                executor=executor, budget_store=budget_store)
+        await engine.handle_idea_validation()
+    await executor.stop()
+
+    assert [(r.scope, r.cost_usd, r.is_cache_hit) for r in budget_store.records] == [("p1", 0.002, False), ("p2", 0.0, True)]
+    assert engine.total_cost == 0
+
+
+def test_budget_store_is_opened_on_first_use(tmp_path, monkeypatch):
+    from zerotoship.utils import budget_store as budget_module
+
+    monkeypatch.setattr(budget_module, "_budget_store", None)
+    monkeypatch.setenv("BUDGET_DB_PATH", str(tmp_path / "budget.db"))
+    assert not (tmp_path / "budget.db").exists()
+    store = budget_module.get_budget_store()
+    assert (tmp_path / "budget.db").exists() and store.db_path == str(tmp_path / "budget.db")
+    assert budget_module.budget_store is store and budget_module.get_budget_store() is store
@@ -24,3 +24,262 @@ async def test_distributed_executor_scheduling():
     mock_crew_router.execute.assert_called_once_with("TEST_STATE", test_context, test_project_data)
     
     await executor.stop()
+
+
+class RecordingRouter:
+    """Router stub that records execution order and concurrency per state."""
+
+    def __init__(self, crew_classes=None, delay=0.05):
+        self.crew_classes = crew_classes or {}
+        self.delay = delay
+        self.order = []
+        self.running = {}
+        self.peak = {}
+        self.cancelled = []
+
+    async def execute(self, state, context, project_data):
+        self.order.append((project_data.get("id"), state))
+        self.running[state] = self.running.get(state, 0) + 1
+        self.peak[state] = max(self.peak.get(state, 0), self.running[state])
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(state)
+            raise
+        finally:
+            self.running[state] -= 1
+        return {"status": "success"}, state
+
+
+class BuilderCrew:
+    max_concurrency = 2
+
+
+@pytest.mark.asyncio
+async def test_executor_priorities_caps_and_fair_share():
+    router = RecordingRouter({"TASK_EXECUTION": [BuilderCrew]})
+    executor = DistributedExecutor(router, max_workers=4, state_priorities={"LAUNCH": "high"}, single_flight=False)
+    assert executor.scheduler.crew_limits == {"BuilderCrew": 2}
+    await executor.start()
+
+    # Occupy every worker, then queue a flood of low-value work ahead of one LAUNCH
+    blockers = [asyncio.create_task(executor.schedule("IDEA_VALIDATION", {}, {"id": "busy"})) for _ in range(4)]
+    await asyncio.sleep(0.01)
+    flood = [asyncio.create_task(executor.schedule("IDEA_VALIDATION", {}, {"id": "flood"})) for _ in range(6)]
+    others = [asyncio.create_task(executor.schedule("IDEA_VALIDATION", {}, {"id": "small"})) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    launch = asyncio.create_task(executor.schedule("LAUNCH", {}, {"id": "small"}))
+    await asyncio.gather(*blockers, *flood, *others, launch)
+
+    after_blockers = router.order[4:]
+    assert after_blockers[0] == ("small", "LAUNCH")
+    # Projects alternate instead of "small" waiting behind the whole flood
+    assert after_blockers[1:5] == [("flood", "IDEA_VALIDATION"), ("small", "IDEA_VALIDATION")] * 2
+
+    builds = [asyncio.create_task(executor.schedule("TASK_EXECUTION", {}, {"id": f"p{i}"})) for i in range(5)]
+    await asyncio.gather(*builds)
+    assert router.peak["TASK_EXECUTION"] == 2
+    await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_executor_admission_policies():
+    from zerotoship.core.executor_errors import Overloaded
+
+    router = RecordingRouter(delay=0.1)
+
+    # reject: fail fast once max_queue_size tasks are waiting
+    executor = DistributedExecutor(router, max_workers=1, max_queue_size=1, admission_policy="reject", single_flight=False)
+    await executor.start()
+    running = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    executor.check_admission("A")  # Room for one more
+    queued = await executor.try_schedule("A", {}, {"id": "p"})
+    with pytest.raises(Overloaded) as excinfo:
+        await executor.schedule("A", {}, {"id": "p"})
+    assert excinfo.value.policy == "reject" and executor.rejected == 1
+    with pytest.raises(Overloaded):
+        executor.check_admission("A")
+    await asyncio.gather(running, queued)
+    await executor.stop()
+
+    # block: wait for room, or raise after the timeout
+    executor = DistributedExecutor(router, max_workers=1, max_queue_size=1, admission_timeout=0.05, single_flight=False)
+    await executor.start()
+    running = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    queued = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    with pytest.raises(Overloaded):
+        await executor.schedule("A", {}, {"id": "p"})
+    with pytest.raises(Overloaded):
+        await executor.try_schedule("A", {}, {"id": "p"})
+    executor.admission_timeout = 1.0
+    await executor.schedule("A", {}, {"id": "p"})  # Admitted once the queued task starts
+    await asyncio.gather(running, queued)
+    await executor.stop()
+
+    # shed: a higher-priority arrival evicts the newest lower-priority task
+    executor = DistributedExecutor(router, max_workers=1, max_queue_size=1, admission_policy="shed", single_flight=False)
+    await executor.start()
+    running = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    low = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}, priority="low"))
+    await asyncio.sleep(0.01)
+    assert await executor.schedule("LAUNCH", {}, {"id": "p"}, priority="high")
+    with pytest.raises(Overloaded) as excinfo:
+        await low
+    assert excinfo.value.shed and executor.shed == 1
+    await running
+
+    # Nothing of lower priority to shed: the arrival itself is rejected
+    blocker = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    queued = await executor.try_schedule("A", {}, {"id": "p"}, priority="low")
+    with pytest.raises(Overloaded):
+        await executor.try_schedule("A", {}, {"id": "p"}, priority="low")
+    await asyncio.gather(blocker, queued)
+    await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_executor_single_flight_with_refcounted_cancellation():
+    router = RecordingRouter(delay=0.1)
+    executor = DistributedExecutor(router, max_workers=2)
+    await executor.start()
+
+    # Concurrent duplicates share one run; each caller gets its own result dict
+    results = await asyncio.gather(*[executor.schedule("A", {"idea": "x"}, {"id": "p"}) for _ in range(3)])
+    assert router.order == [("p", "A")]
+    assert executor.coalesced == 2
+    assert results[0] == results[1] and results[0][0] is not results[1][0]
+
+    # Cancelling one waiter leaves the shared run going for the other
+    first = asyncio.create_task(executor.schedule("B", {}, {"id": "p"}))
+    second = asyncio.create_task(executor.schedule("B", {}, {"id": "p"}))
+    await asyncio.sleep(0.02)
+    first.cancel()
+    assert (await second)[0] == {"status": "success"}
+    assert router.order.count(("p", "B")) == 1
+
+    # Cancelling the last waiter cancels the run itself
+    only = asyncio.create_task(executor.schedule("C", {}, {"id": "p"}))
+    await asyncio.sleep(0.02)
+    only.cancel()
+    await asyncio.sleep(0.01)
+    assert router.cancelled == ["C"] and executor.in_flight == 0
+    assert executor._inflight == {}
+
+    # Once finished, the same task runs again
+    await executor.schedule("A", {"idea": "x"}, {"id": "p"})
+    assert router.order.count(("p", "A")) == 2
+    await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_executor_single_flight_cancellation_during_admission():
+    router = RecordingRouter(delay=0.1)
+    executor = DistributedExecutor(router, max_workers=1, max_queue_size=1, admission_policy="block")
+    await executor.start()
+
+    async def fill():
+        running = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(executor.schedule("B", {}, {"id": "p"}))
+        await asyncio.sleep(0.01)
+        return running, queued
+
+    # A duplicate cancelled while the first caller still waits for room does not cancel the run
+    backlog = await fill()
+    first = asyncio.create_task(executor.schedule("C", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    duplicate = asyncio.create_task(executor.schedule("C", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    duplicate.cancel()
+    assert (await asyncio.wait_for(first, 2))[0] == {"status": "success"}
+    assert executor.coalesced == 1
+    await asyncio.gather(*backlog)
+
+    # Cancelling the caller that is waiting for room leaves the run to the duplicate
+    backlog = await fill()
+    first = asyncio.create_task(executor.schedule("D", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    duplicate = asyncio.create_task(executor.schedule("D", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert (await asyncio.wait_for(duplicate, 2))[0] == {"status": "success"}
+    assert router.order.count(("p", "C")) == 1 and router.order.count(("p", "D")) == 1
+    await asyncio.gather(*backlog)
+    await executor.stop()
+
+
+class RecordingMetric:
+    """Minimal stand-in for a Prometheus histogram or gauge."""
+
+    def __init__(self):
+        self.values = []
+        self.observed = {}
+        self._labels = None
+
+    def labels(self, **labels):
+        metric = RecordingMetric()
+        metric.observed = self.observed
+        metric._labels = tuple(sorted(labels.items()))
+        return metric
+
+    def observe(self, value):
+        self.observed.setdefault(self._labels, []).append(value)
+
+    def set(self, value):
+        self.values.append(value)
+
+
+@pytest.mark.asyncio
+async def test_executor_metrics_and_stats():
+    router = RecordingRouter(delay=0.05)
+    metrics = {name: RecordingMetric() for name in (
+        "executor_queue_wait_seconds", "executor_service_seconds",
+        "executor_queue_depth", "executor_busy_workers", "executor_saturation")}
+    executor = DistributedExecutor(router, max_workers=1, single_flight=False, metrics=metrics)
+    await executor.start()
+
+    first = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}))
+    second = asyncio.create_task(executor.schedule("A", {}, {"id": "p"}))
+    await asyncio.sleep(0.01)
+    stats = executor.stats()
+    assert stats["busy_workers"] == 1 and stats["queue_depth"] == 1 and stats["saturation"] == 1.0
+    assert stats["running"]["states"] == {"A": 1}
+    await asyncio.gather(first, second)
+
+    stats = executor.stats()
+    assert stats["completed"]["success"] == 2 and stats["busy_workers"] == 0 and stats["queue_depth"] == 0
+    assert stats["service_time_p95_seconds"] >= 0.04
+    assert stats["queue_wait_p95_seconds"] >= 0.04  # The second task waited for the first
+    labels = (("crew", "A"), ("state", "A"))
+    assert len(metrics["executor_service_seconds"].observed[labels]) == 2
+    assert max(metrics["executor_queue_wait_seconds"].observed[labels]) >= 0.04
+    assert max(metrics["executor_queue_depth"].values) == 2
+    assert metrics["executor_saturation"].values[-1] == 0.0
+    await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_task_fingerprint_respects_cache_opt_out_and_context_version():
+    from zerotoship.core.context_bus import ContextBus
+    from zerotoship.core.distributed_executor import task_fingerprint
+
+    class PlannerCrew:
+        cache_inputs = ("idea",)
+
+    # Cacheable crews coalesce across projects unless a project opted out of sharing
+    shared = task_fingerprint("PLAN", [PlannerCrew], {"idea": "x"}, {"id": "p1"})
+    assert shared == task_fingerprint("PLAN", [PlannerCrew], {"idea": "x"}, {"id": "p2"})
+    opted_out = {"id": "p2", "metadata": {"cache": False}}
+    assert task_fingerprint("PLAN", [PlannerCrew], {"idea": "x"}, opted_out) != shared
+
+    # Bus snapshots are identified by version, without encoding the context
+    bus = ContextBus()
+    await bus.set("idea", "x")
+    snapshot = await bus.snapshot()
+    assert task_fingerprint("BUILD", [], snapshot, {"id": "p1"}) == f"p1:BUILD:v{snapshot.version}"
+    assert task_fingerprint("BUILD", [], snapshot, {"id": "p2"}) != task_fingerprint("BUILD", [], snapshot, {"id": "p1"})
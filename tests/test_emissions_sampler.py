@@ -0,0 +1,44 @@
+"""
+Tests for the shared emissions sampler.
+"""
+import time
+
+import pytest
+
+from zerotoship.core.emissions_sampler import EmissionsSampler
+
+
+class StepSource:
+    """Cumulative energy source advanced by the test."""
+
+    def __init__(self):
+        self.energy = 0.0
+
+    def __call__(self):
+        return self.energy, self.energy * 0.5
+
+
+def test_interval_attribution_splits_energy_between_overlapping_runs():
+    source = StepSource()
+    sampler = EmissionsSampler(source=source, interval_seconds=3600)  # Ticks are driven manually
+    first = sampler.begin()
+    second = sampler.begin()
+    t0 = time.monotonic()
+
+    # Both runs overlap the whole first tick and split it evenly
+    source.energy = 2.0
+    sampler.sample(now=t0 + 1.0)
+    assert sampler.totals() == {"energy_consumed_kwh": 2.0, "co2_emissions_kg": 1.0, "active_runs": 2}
+
+    # Runs end before the (future) sample time, so no partial tick is charged
+    usage = sampler.end(first)
+    assert usage.energy_consumed_kwh == pytest.approx(1.0, rel=1e-3)
+    assert usage.carbon_intensity == pytest.approx(0.5)
+
+    # Only the second run remains for the next tick
+    source.energy = 5.0
+    sampler.sample(now=t0 + 2.0)
+    assert sampler.totals() == {"energy_consumed_kwh": 5.0, "co2_emissions_kg": 2.5, "active_runs": 1}
+    assert sampler.end(second).energy_consumed_kwh == pytest.approx(4.0, rel=1e-3)
+    assert sampler.totals()["active_runs"] == 0
+    sampler.stop()
@@ -0,0 +1,57 @@
+"""
+Tests for the bounded, spillable EventHistory behind ContextBus.
+"""
+import pytest
+
+from zerotoship.core.event_history import EventHistory
+from zerotoship.core.context_bus import ContextBus
+
+
+def _event(i, name):
+    return {"name": name, "data": {"i": i}, "timestamp": f"2026-01-01T00:00:{i:02d}"}
+
+
+def test_event_history_spills_and_queries(tmp_path):
+    spill_path = tmp_path / "history.jsonl"
+    history = EventHistory(max_in_memory=3, spill_path=str(spill_path))
+    for i in range(10):
+        history.append(_event(i, "IDEA_VALIDATION_executed" if i % 2 else "feedback"))
+
+    assert len(history) == 10
+    assert history.spilled == 7
+    assert len(spill_path.read_text().splitlines()) == 7
+
+    assert [e["data"]["i"] for e in history.all()] == list(range(10))
+    assert [e["data"]["i"] for e in history.query(name="*_executed")] == [1, 3, 5, 7, 9]
+    assert [e["data"]["i"] for e in history.query(name="feedback", since="2026-01-01T00:00:05")] == [6, 8]
+    assert [e["data"]["i"] for e in history.query(limit=2)] == [8, 9]
+
+    history.reset([_event(0, "restored")])
+    assert [e["name"] for e in history.all()] == ["restored"]
+    assert history.spilled == 0
+
+
+@pytest.mark.asyncio
+async def test_context_bus_history_is_bounded():
+    ctx = ContextBus(history_limit=2)
+    for state in ["IDEA_VALIDATION", "TASK_EXECUTION", "LAUNCH"]:
+        await ctx.record(f"{state}_executed", {"state": state})
+    await ctx.record("human_intervention_needed")
+
+    assert len(ctx.history._recent) == 2
+    assert len(await ctx.get_history()) == 4
+    executed = await ctx.get_history(name="*_executed")
+    assert [e["data"]["state"] for e in executed] == ["IDEA_VALIDATION", "TASK_EXECUTION", "LAUNCH"]
+
+
+@pytest.mark.asyncio
+async def test_context_bus_restores_a_history_tail():
+    ctx = ContextBus(history_limit=2)
+    await ctx.restore({"idea": "x"}, [_event(8, "BUILD_executed"), _event(9, "LAUNCH_executed")], history_length=10)
+
+    assert ctx.history_length() == 10
+    await ctx.record("COMPLETED_executed")
+    assert ctx.history_length() == 11
+    assert [e["name"] for e in await ctx.get_history(limit=2)] == ["LAUNCH_executed", "COMPLETED_executed"]
+    assert ctx.history.spilled == 1  # Spilled events are still read back
+    assert len(await ctx.get_history()) == 3
@@ -0,0 +1,70 @@
+"""
+Tests for the crew execution backends.
+"""
+import os
+import time
+import asyncio
+import threading
+
+import pytest
+
+from zerotoship.core.executor_backends import ExecutionBackends
+from zerotoship.core.crew_router import CrewRouter
+from zerotoship.core.context_bus import ContextBus
+from zerotoship.core.project_meta_memory import ProjectMetaMemoryManager, ProjectMetaMemory
+
+
+class BlockingCrew:
+    execution_backend = "thread"
+
+    def __init__(self, project_data: dict):
+        self.project_data = project_data
+
+    async def run(self, context):
+        time.sleep(0.2)  # A synchronous kickoff
+        return {"status": "success", "data": {"thread": threading.current_thread().name}}
+
+
+class ProcessCrew:
+    execution_backend = "process"
+
+    def __init__(self, project_data: dict):
+        self.project_data = project_data
+
+    async def run(self, context):
+        return {"status": "success", "data": {"pid": os.getpid(), "idea": context["idea"]}}
+
+
+@pytest.mark.asyncio
+async def test_thread_backend_keeps_event_loop_responsive(tmp_path):
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    router = CrewRouter({"TASK_EXECUTION": [BlockingCrew]}, ContextBus(), meta_memory)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    result, crew_name = await router.execute("TASK_EXECUTION", {}, {"id": "p1"})
+    ticking.cancel()
+    router.backends.shutdown()
+
+    assert crew_name == "BlockingCrew"
+    assert result["data"]["thread"].startswith("crew")
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_process_backend_runs_picklable_payloads():
+    backends = ExecutionBackends(process_workers=1)
+    result = await backends.run(ProcessCrew, {"id": "p1"}, {"idea": "x"})
+    assert result["data"] == {"pid": result["data"]["pid"], "idea": "x"}
+    assert result["data"]["pid"] != os.getpid()
+
+    with pytest.raises(TypeError):
+        await backends.run(ProcessCrew, {"id": "p1", "callback": lambda: None}, {"idea": "x"})
+    backends.shutdown()
@@ -0,0 +1,118 @@
+"""
+Tests for ExecutorNode and the in-memory TaskBroker.
+"""
+import pytest
+import asyncio
+
+from zerotoship.core.task_broker import InMemoryBroker, BrokerTask
+from zerotoship.core.executor_node import ExecutorNode
+from zerotoship.core.executor_errors import DeliveryFailed, TaskFailed
+
+
+class CountingRouter:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+
+    async def execute(self, state, context, project_data):
+        self.calls.append(state)
+        await asyncio.sleep(self.delay)
+        return {"status": "success", "state": state}, "PlaceholderCrew"
+
+
+@pytest.mark.asyncio
+async def test_idle_node_steals_work_and_heartbeats_keep_leases():
+    broker = InMemoryBroker()
+    busy_router, idle_router = CountingRouter(), CountingRouter()
+    # Leases are far shorter than a crew run, so only heartbeats keep them alive
+    busy = ExecutorNode(busy_router, broker, node_id="busy", max_workers=1, lease_seconds=0.03, reap_interval=0.01)
+    idle = ExecutorNode(idle_router, broker, node_id="idle", max_workers=1, lease_seconds=0.03, reap_interval=0.01)
+    await busy.start()
+    await idle.start()
+
+    results = await asyncio.gather(*[busy.schedule(f"S{i}", {}, {"id": "p"}) for i in range(6)])
+    assert [r[0]["state"] for r in results] == [f"S{i}" for i in range(6)]
+    assert idle.stolen > 0 and idle_router.calls
+    assert len(busy_router.calls) + len(idle_router.calls) == 6  # Nothing redelivered
+    assert broker.redelivered == 0
+    await busy.stop()
+    await idle.stop()
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_redelivered():
+    broker = InMemoryBroker(max_deliveries=2)
+    router = CountingRouter(delay=0.01)
+    node = ExecutorNode(router, broker, node_id="live", max_workers=1, lease_seconds=0.05, reap_interval=0.01)
+    await broker.register("dead")
+
+    # A node claims a task and dies without completing it or sending heartbeats
+    task = BrokerTask("t1", "A", {}, {"id": "p"}, origin="dead")
+    await broker.publish("dead", task)
+    ghost = await broker.claim("dead", lease_seconds=0.02)
+    await node.start()
+    result, crew_name = await asyncio.wait_for(broker.wait_result("t1"), 1)
+    assert result["state"] == "A" and ghost.task.deliveries == 1 and broker.redelivered == 1
+    assert not await broker.complete(ghost, result="late")  # The stale lease cannot overwrite it
+    await node.stop()
+
+    # Once max_deliveries leases have expired, the submitter gets DeliveryFailed
+    poisoned = BrokerTask("t2", "B", {}, {"id": "p"}, origin="dead")
+    await broker.publish("dead", poisoned)
+    for _ in range(2):
+        await broker.claim("dead", lease_seconds=0)
+        await broker.reap_expired()
+    with pytest.raises(DeliveryFailed):
+        await broker.wait_result("t2")
+
+
+class FailingRouter:
+    async def execute(self, state, context, project_data):
+        raise RuntimeError(f"{state} blew up")
+
+
+@pytest.mark.asyncio
+async def test_tasks_and_results_cross_the_broker_as_payloads():
+    broker = InMemoryBroker()
+    router = CountingRouter(delay=0.01)
+    node = ExecutorNode(router, broker, node_id="n", max_workers=1)
+    project_data = {"id": "p", "event_history": []}
+    await broker.register("n")
+
+    # The queued task is a snapshot of plain data, not the caller's objects
+    task = BrokerTask.create("A", {"idea": "x"}, project_data, origin="n")
+    await broker.publish("n", task)
+    project_data["event_history"].append("later")
+    lease = await broker.claim("n", lease_seconds=1)
+    assert lease.task is not task and lease.task.project_id == "p"
+    assert lease.task.project_data["event_history"] == [] and lease.task.context == {"idea": "x"}
+    await broker.complete(lease, result=[{"ok": True}, "Crew"])
+
+    # A result can be collected again, and a cancelled waiter leaves nothing behind
+    assert await broker.wait_result(task.task_id) == [{"ok": True}, "Crew"]
+    assert await broker.wait_result(task.task_id) == [{"ok": True}, "Crew"]
+    other = BrokerTask.create("B", {}, project_data, origin="n")
+    await broker.publish("n", other)
+    waiter = asyncio.create_task(broker.wait_result(other.task_id))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await node.start()
+    assert (await asyncio.wait_for(broker.wait_result(other.task_id), 1))[0]["state"] == "B"
+    await node.stop()
+
+    # Results expire after result_ttl; unknown ids are an error rather than a hang
+    await broker.reap_expired(now=float("inf"))
+    with pytest.raises(LookupError):
+        await broker.wait_result(task.task_id)
+
+
+@pytest.mark.asyncio
+async def test_crew_errors_reach_the_submitter_as_task_failed():
+    broker = InMemoryBroker()
+    node = ExecutorNode(FailingRouter(), broker, node_id="n", max_workers=1)
+    await node.start()
+    with pytest.raises(TaskFailed, match="RuntimeError: A blew up"):
+        await asyncio.wait_for(node.schedule("A", {}, {"id": "p"}), 1)
+    await node.stop()
@@ -0,0 +1,75 @@
+"""
+Tests for the ExternalDataFetcher and ContextBus.fetch_and_merge_external_data.
+"""
+import time
+
+import pytest
+
+from zerotoship.core.context_bus import ContextBus
+from zerotoship.core.external_data import ExternalDataFetcher
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_is_concurrent_with_per_source_timeouts(stub_server):
+    stub_server.routes["/a"] = {"body": '{"a": 1}', "delay": 0.3}
+    stub_server.routes["/b"] = {"body": "plain text", "content_type": "text/plain", "delay": 0.3}
+    stub_server.routes["/slow"] = {"body": "{}", "delay": 1.0}
+    fetcher = ExternalDataFetcher()
+
+    started = time.monotonic()
+    fetched = await fetcher.fetch_all([
+        stub_server.url("/a"),
+        stub_server.url("/b"),
+        {"url": stub_server.url("/slow"), "timeout": 0.1},
+        stub_server.url("/missing"),
+    ])
+    elapsed = time.monotonic() - started
+    fetcher.close()
+
+    assert fetched == {stub_server.url("/a"): {"a": 1}, stub_server.url("/b"): "plain text"}
+    assert elapsed < 0.55  # Both 0.3s sources ran concurrently; the slow one timed out
+
+
+@pytest.mark.asyncio
+async def test_fetch_uses_ttl_cache_and_etag_revalidation(stub_server):
+    stub_server.routes["/data"] = {"body": '{"v": 1}', "etag": '"v1"'}
+    fetcher = ExternalDataFetcher(ttl_seconds=60)
+    url = stub_server.url("/data")
+
+    assert await fetcher.fetch(url) == {"v": 1}
+    assert await fetcher.fetch(url) == {"v": 1}
+    assert stub_server.hits["/data"] == 1
+
+    # Once stale, the entry is revalidated and a 304 reuses the cached body
+    fetcher._cache[url]["expires_at"] = 0
+    assert await fetcher.fetch(url) == {"v": 1}
+    assert stub_server.hits["/data"] == 2
+    assert fetcher._cache[url]["expires_at"] > time.time()
+    fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_context_bus_merges_external_data(stub_server):
+    stub_server.routes["/market"] = {"body": '{"size": 42}'}
+    ctx = ContextBus(external_data_sources=[stub_server.url("/market")])
+
+    version = await ctx.set("idea", "x")
+    await ctx.fetch_and_merge_external_data()
+    assert await ctx.get("external_data") == {stub_server.url("/market"): {"size": 42}}
+
+    # A repeated fetch is served from cache and does not publish a new version
+    await ctx.fetch_and_merge_external_data()
+    assert ctx.version == version + 1
+    assert stub_server.hits["/market"] == 1
+    ctx.fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_only_success_responses_are_cached(stub_server):
+    stub_server.routes["/moved"] = {"body": "<html>moved</html>", "status": 302}
+    stub_server.routes["/bare304"] = {"body": "", "status": 304}
+    fetcher = ExternalDataFetcher()
+
+    fetched = await fetcher.fetch_all([stub_server.url("/moved"), stub_server.url("/bare304")])
+    assert fetched == {} and fetcher._cache == {}
+    fetcher.close()
@@ -0,0 +1,102 @@
+"""
+Tests for declarative crew input projection.
+"""
+import pytest
+
+from zerotoship.core.input_projection import (
+    InputGuard, UndeclaredInputRead, project_for_crew, project_inputs,
+)
+from zerotoship.core.crew_result_cache import make_cache_key
+from zerotoship.core.crew_router import CrewRouter
+from zerotoship.core.context_bus import ContextBus
+from zerotoship.core.project_meta_memory import ProjectMetaMemoryManager, ProjectMetaMemory
+
+
+PROJECT = {
+    "id": "p1",
+    "state": "LAUNCH",
+    "idea": "x",
+    "validation": {"score": 0.9, "report": "long"},
+    "build": {"api": {"status": "done", "logs": "..."}, "web": {"status": "wip", "logs": "..."}},
+    "marketing": {"copy": "..."},
+}
+
+
+class LaunchCrew:
+    input_paths = ("idea", "validation/score", "build/*/status")
+    seen = []
+
+    def __init__(self, project_data: dict):
+        self.project_data = project_data
+
+    async def run(self, context):
+        self.project_data.update(context)
+        LaunchCrew.seen.append(dict(self.project_data))
+        return {"status": "success", "message": "ok", "data": {"score": self.project_data["validation"]["score"]}}
+
+
+def test_projection_paths_cache_key_and_debug_guard(monkeypatch):
+    assert project_inputs(PROJECT, ("idea", "missing")) == {"idea": "x"}
+
+    projected = project_for_crew(LaunchCrew, PROJECT)
+    assert projected == {
+        "id": "p1", "state": "LAUNCH", "idea": "x", "validation": {"score": 0.9},
+        "build": {"api": {"status": "done"}, "web": {"status": "wip"}},
+    }
+    assert project_for_crew(object, PROJECT) == PROJECT and project_for_crew(object, PROJECT) is not PROJECT
+
+    # Undeclared fields no longer change the cache key
+    noisy = dict(PROJECT, marketing={"copy": "changed"}, build={"api": {"status": "done", "logs": "new"}, "web": {"status": "wip"}})
+    assert make_cache_key("LAUNCH", LaunchCrew, PROJECT) == make_cache_key("LAUNCH", LaunchCrew, noisy)
+    assert make_cache_key("LAUNCH", LaunchCrew, PROJECT) != make_cache_key("LAUNCH", LaunchCrew, dict(PROJECT, idea="y"))
+
+    monkeypatch.setenv("CREW_INPUT_DEBUG", "warn")
+    guarded = project_for_crew(LaunchCrew, PROJECT)
+    assert isinstance(guarded, InputGuard)
+    assert guarded["build"]["api"].get("status") == "done"
+    assert guarded.get("marketing") is None and guarded["build"]["web"].get("logs") is None
+    assert "validation" in guarded and "marketing" not in guarded  # Membership tests are not reported
+    assert guarded.undeclared_reads == {"marketing", "build/web/logs"}
+
+    monkeypatch.setenv("CREW_INPUT_DEBUG", "strict")
+    with pytest.raises(UndeclaredInputRead) as excinfo:
+        project_for_crew(LaunchCrew, PROJECT)["validation"].get("report")
+    assert excinfo.value.path == "validation/report"
+
+
+def test_project_context_follows_declared_input_paths(monkeypatch):
+    pytest.importorskip("crewai")
+    from zerotoship.crews.base_crew import BaseCrew
+
+    class IdeaCrew(BaseCrew):
+        input_paths = ("idea", "context")
+
+        def _create_crew(self):
+            return None
+
+        async def _execute_crew(self, inputs):
+            return {}
+
+    monkeypatch.setenv("CREW_INPUT_DEBUG", "warn")
+    project = dict(PROJECT, context={"market": "smb"})
+    crew = IdeaCrew(project_for_crew(IdeaCrew, project))
+    context = crew.get_project_context()
+    assert context["idea"] == "x" and context["context"] == {"market": "smb"}
+    assert "validation" not in context and crew.project_data.undeclared_reads == set()
+
+    crew.input_paths = ("idea", "context", "validation")  # Prompt reads the crew never declared are reported
+    crew.get_project_context()
+    assert crew.project_data.undeclared_reads == {"validation"}
+
+
+@pytest.mark.asyncio
+async def test_crew_router_passes_projected_inputs(tmp_path):
+    LaunchCrew.seen = []
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    router = CrewRouter({"LAUNCH": [LaunchCrew]}, ContextBus(), meta_memory)
+
+    context = dict(PROJECT, feedback_history=[1, 2, 3])
+    result, _ = await router.execute("LAUNCH", context, PROJECT)
+    assert result["data"] == {"score": 0.9}
+    assert set(LaunchCrew.seen[0]) == {"id", "state", "idea", "validation", "build"}
+    assert PROJECT["validation"] == {"score": 0.9, "report": "long"}  # The caller's data is untouched
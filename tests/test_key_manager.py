@@ -0,0 +1,39 @@
+"""
+Tests for envelope encryption of serialized crew outputs.
+"""
+from cryptography.fernet import Fernet
+
+from zerotoship.core.output_serializer import CrewOutputSerializer
+from zerotoship.security.key_manager import DataKeyManager
+
+
+def test_envelope_encryption_across_workers_rotation_and_reencrypt(tmp_path):
+    path = str(tmp_path / "keys" / "data_keys.json")
+    master = Fernet.generate_key()
+    worker_a = CrewOutputSerializer(key_manager=DataKeyManager(path=path, master_keys=[master]))
+    worker_b = CrewOutputSerializer(key_manager=DataKeyManager(path=path, master_keys=[master]))
+
+    first = worker_a.serialize_crew_output({"plan": "ship it"}, "p1")
+    assert first["metadata"]["key_id"] == "p1:1" and "ship it" not in first["encrypted_content"]
+    worker_a.serialize_crew_output({"plan": "again"}, "p1")
+    assert worker_a.key_manager.stats()["unwraps"] == 1  # The data key is cached after first use
+
+    # Another worker (or a restart) reads it through the shared key store
+    sealed = {"encrypted_content": first["encrypted_content"], "metadata": dict(first["metadata"])}
+    assert worker_b.deserialize_output(sealed) == {"plan": "ship it"}
+
+    # Rotation: new outputs use version 2, old ones stay readable until re-encrypted
+    assert worker_a.key_manager.rotate_data_key("p1") == "p1:2"
+    assert worker_a.serialize_crew_output({"plan": "v2"}, "p1")["metadata"]["key_id"] == "p1:2"
+    project_data = {"id": "p1", "outputs": [first, {"nested": sealed}], "other": 1}
+    assert worker_a.reencrypt_outputs(project_data) == 2
+    assert first["metadata"]["key_id"] == "p1:2" and sealed["metadata"]["key_id"] == "p1:2"
+    assert worker_a.reencrypt_outputs(project_data) == 0
+    worker_b.key_manager.clear_cache()
+    assert worker_b.deserialize_output(sealed) == {"plan": "ship it"}
+
+    # Master key rotation re-wraps data keys; a worker holding only the new master can read them
+    new_master = Fernet.generate_key()
+    assert worker_a.key_manager.rotate_master_key(new_master) == 2
+    fresh = CrewOutputSerializer(key_manager=DataKeyManager(path=path, master_keys=[new_master]))
+    assert fresh.deserialize_output(sealed) == {"plan": "ship it"}
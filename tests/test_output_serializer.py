@@ -0,0 +1,80 @@
+"""
+Tests for the single-pass CrewOutputSerializer.
+"""
+import json
+import hashlib
+from datetime import datetime
+from enum import Enum
+
+import pytest
+
+from cryptography.fernet import Fernet
+
+from zerotoship.core.output_serializer import CrewOutputSerializer, CrewOutput
+from zerotoship.security.key_manager import DataKeyManager
+
+
+class Phase(Enum):
+    BUILD = "build"
+
+
+class TaskResult:
+    def __init__(self, summary):
+        self.summary = summary
+        self.finished_at = datetime(2025, 1, 2, 3, 4, 5)
+
+
+def test_single_pass_anonymizes_canonicalizes_and_encodes(tmp_path):
+    keys = DataKeyManager(path=str(tmp_path / "keys.json"), master_keys=[Fernet.generate_key()])
+    serializer = CrewOutputSerializer(key_manager=keys)
+    output = CrewOutput(
+        raw="Market is 1000000000 users; contact founder@example.com",
+        json_dict={"owner_name": "Ada", "phase": Phase.BUILD, "tags": {"b", "a"}, "hosts": ["10.0.0.1", "ok"], 3: 0.5},
+        tasks_output=[TaskResult("+1 (555) 123-4567")],
+    )
+
+    content, encoded = serializer.encode(output)
+    assert encoded == json.dumps(content, sort_keys=True, separators=(",", ":")).encode()
+    assert content["raw"].startswith("anon_")  # Contains an email
+    assert content["json_dict"]["owner_name"].startswith("anon_")
+    assert content["json_dict"]["phase"] == "build" and content["json_dict"]["tags"] == ["a", "b"]
+    assert content["json_dict"]["hosts"][0].startswith("anon_") and content["json_dict"]["hosts"][1] == "ok"
+    assert content["json_dict"]["3"] == 0.5
+    task = content["tasks_output"][0]
+    assert task["summary"].startswith("anon_") and task["finished_at"] == "2025-01-02T03:04:05"
+    assert task["__type__"] == "TaskResult"
+
+    # Numbers inside prose are not mistaken for phone numbers
+    assert serializer.encode({"tam": "TAM of 1000000000 users"})[0] == {"tam": "TAM of 1000000000 users"}
+    numbers = {"pi": "3.14159265", "ratio": "0.123456789", "users": "1000000000", "day": "2025-01-02"}
+    assert serializer.encode(numbers)[0] == numbers
+    assert all(v.startswith("anon_") for v in serializer.encode(["555-123-4567", "(555) 123 4567", "555.123.4567"])[0])
+
+    result = serializer.serialize_crew_output({"b": 1, "a": [True, None]}, "p1")
+    assert "content" not in result  # Only the ciphertext is persisted
+    assert serializer.deserialize_output(result) == {"a": [True, None], "b": 1}
+    assert result["metadata"]["content_sha256"] == hashlib.sha256(b'{"a":[true,null],"b":1}').hexdigest()
+    assert serializer.validate_serialization({"b": 1}, result)
+    content, sealed = serializer.serialize_with_content({"b": 1}, "p1")
+    assert content == {"b": 1} and "content" not in sealed
+    assert serializer.validate_serialization({"b": 1}, sealed, content)
+
+
+def test_key_store_failures_never_fall_back_to_plaintext(tmp_path):
+    class BrokenKeys:
+        def encrypt(self, project_id, plaintext):
+            raise PermissionError("data/keys is not writable")
+
+    serializer = CrewOutputSerializer(key_manager=BrokenKeys())
+    with pytest.raises(PermissionError):
+        serializer.serialize_crew_output({"owner_email": "founder@example.com"}, "p1")
+
+    class Unprintable:
+        __slots__ = ()
+
+        def __str__(self):
+            raise ValueError("founder@example.com")
+
+    fallback = CrewOutputSerializer(enable_encryption=False).serialize_crew_output(Unprintable(), "p1")
+    assert fallback["metadata"]["status"] == "error"
+    assert "founder@example.com" not in str(fallback)
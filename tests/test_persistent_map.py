@@ -0,0 +1,61 @@
+"""
+Tests for the PersistentMap HAMT used by ContextBus.
+"""
+import random
+
+from zerotoship.core.persistent_map import PersistentMap
+
+
+class CollidingKey:
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        return 42
+
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.name == self.name
+
+
+def test_persistent_map_matches_dict_semantics():
+    rng = random.Random(7)
+    reference = {}
+    current = PersistentMap()
+    versions = []
+
+    for _ in range(2000):
+        key = rng.randrange(500)
+        if rng.random() < 0.2:
+            reference.pop(key, None)
+            current = current.delete(key)
+        else:
+            reference[key] = rng.random()
+            current = current.set(key, reference[key])
+        versions.append((current, dict(reference)))
+
+    for snapshot, expected in versions[::100]:
+        assert len(snapshot) == len(expected)
+        assert snapshot.to_dict() == expected
+
+
+def test_persistent_map_is_immutable_and_shares_structure():
+    base = PersistentMap({"a": 1, "b": 2})
+    updated = base.set("a", 10)
+
+    assert base["a"] == 1
+    assert updated["a"] == 10
+    assert base.set("a", base["a"]) is base
+    assert base.delete("missing") is base
+    assert updated.merge({"c": 3}).to_dict() == {"a": 10, "b": 2, "c": 3}
+
+
+def test_persistent_map_hash_collisions():
+    keys = [CollidingKey(str(i)) for i in range(5)]
+    pmap = PersistentMap()
+    for i, key in enumerate(keys):
+        pmap = pmap.set(key, i)
+
+    assert [pmap[key] for key in keys] == list(range(5))
+    pmap = pmap.delete(keys[2])
+    assert keys[2] not in pmap
+    assert len(pmap) == 4
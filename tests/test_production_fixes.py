@@ -275,7 +275,7 @@ class ProductionFixValidator:
             
             # Test the serializer directly
             test_result = output_serializer.serialize_crew_output("test content", "test_project")
-            if test_result and 'content' in test_result:
+            if test_result and ('content' in test_result or 'encrypted_content' in test_result):
                 validation['details'].append("Output serializer working correctly")
             else:
                 validation['no_errors'] = False
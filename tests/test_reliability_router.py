@@ -2,6 +2,114 @@
 Tests for the ReliabilityRouter.
 """
 import pytest
+import asyncio
 from zerotoship.core.adaptive_runtime.reliability_router import ReliabilityRouter
+from zerotoship.core.context_bus import ContextBus
+from zerotoship.core.crew_bandit import CrewBandit
+from zerotoship.core.project_meta_memory import ProjectMetaMemory, ProjectMetaMemoryManager
+from zerotoship.core.reliability_index import ReliabilityIndex
 
-# I will add tests here later.
+
+class FlakyCrew:
+    def __init__(self, project_data):
+        pass
+
+    async def run(self, context):
+        return {"status": "error", "message": "flaky"}
+
+
+class SteadyCrew:
+    def __init__(self, project_data):
+        pass
+
+    async def run(self, context):
+        return {"status": "success"}
+
+
+@pytest.mark.asyncio
+async def test_reliability_index_routes_rebuilds_and_persists(tmp_path):
+    memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    # Observations recorded by earlier runs are replayed once at startup
+    for value in (0.0, 0.2, 1.0):  # Distinct values: identical entries in the same second share an id
+        memory.add_performance_metric("crew_reliability", value, {"crew_name": "FlakyCrew"})
+    snapshot = str(tmp_path / "reliability.json")
+    router = ReliabilityRouter({"IDEA_VALIDATION": [FlakyCrew, SteadyCrew]}, ContextBus(), memory,
+                               reliability_index_path=snapshot)
+    index = router.reliability_index
+    assert index.observations == {"FlakyCrew": 3}
+    assert index.score("FlakyCrew") == pytest.approx(((0.5 * 0.95) * 0.95 + 0.01) * 0.95 + 0.05)
+
+    # Each run updates the selected crew's score without touching memory
+    memory.get_memory_entries = None
+    result, crew_name = await router.execute("IDEA_VALIDATION", {}, {})
+    assert crew_name == "SteadyCrew" and result["status"] == "success"
+    assert index.score("SteadyCrew") == pytest.approx(0.5 * 0.95 + 0.05)
+
+    # A restart loads the snapshot and only replays memory written after it
+    index.persist()
+    memory.add_performance_metric("crew_reliability", 1.0, {"crew_name": "SteadyCrew"})
+    restarted = ReliabilityRouter({"IDEA_VALIDATION": [FlakyCrew, SteadyCrew]}, ContextBus(), memory,
+                                  reliability_index_path=snapshot)
+    assert restarted.reliability_index.observations == {"FlakyCrew": 3, "SteadyCrew": 2}
+
+
+def test_rebuild_replays_per_run_outcomes_not_ratios(tmp_path):
+    memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    # A state that failed then succeeded: ratios 0.0 and 0.5, outcomes 0 and 1
+    memory.add_performance_metric("crew_reliability", 0.0, {"crew_name": "RetryCrew", "outcome": 0.0})
+    memory.add_performance_metric("crew_reliability", 0.5, {"crew_name": "RetryCrew", "outcome": 1.0})
+    memory.add_performance_metric("crew_reliability", 7.0, {"crew_name": "LegacyCrew"})  # Out-of-range legacy value
+
+    index = ReliabilityIndex()
+    assert index.rebuild(memory) == 3
+    live = ReliabilityIndex()
+    live.update("RetryCrew", 0.0)
+    live.update("RetryCrew", 1.0)
+    assert index.score("RetryCrew") == pytest.approx(live.score("RetryCrew"))
+    assert index.score("LegacyCrew") == pytest.approx(0.5 * 0.95 + 0.05)
+
+
+class SlowCrew:
+    def __init__(self, project_data):
+        pass
+
+    async def run(self, context):
+        await asyncio.sleep(0.01)
+        return {"status": "success", "token_usage": 4000}
+
+
+class FastCrew:
+    def __init__(self, project_data):
+        pass
+
+    async def run(self, context):
+        return {"status": "success", "token_usage": 1000}
+
+
+@pytest.mark.asyncio
+async def test_bandit_mode_shifts_traffic_to_fast_reliable_crew(tmp_path):
+    memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    router = ReliabilityRouter({"BUILD": [FlakyCrew, SlowCrew, FastCrew]}, ContextBus(), memory)
+    router.selection_mode = "bandit"
+    router.bandit = CrewBandit(seed=7, decay=router.bandit.decay, latency_weight=0.3, cost_weight=0.3)
+
+    chosen = [(await router.execute("BUILD", {}, {}))[1] for _ in range(60)]
+    assert set(chosen) == {"FlakyCrew", "SlowCrew", "FastCrew"}  # Every crew gets explored
+    assert chosen[-20:].count("FastCrew") >= 15
+    assert router.bandit.mean("BUILD", "FlakyCrew") < 0.5 < router.bandit.mean("BUILD", "FastCrew")
+
+
+def test_bandit_is_deterministic_for_a_seed_and_retries_recovered_crews():
+    def choices(seed):
+        bandit = CrewBandit(seed=seed, decay=0.8)
+        picks = []
+        for step in range(40):
+            crew = bandit.choose("S", ["A", "B"])
+            picks.append(crew)
+            # "A" fails for the first 20 steps, then recovers
+            bandit.update("S", crew, success=(crew == "B" or step >= 20), latency=1.0)
+        return picks
+
+    assert choices(3) == choices(3)
+    picks = choices(3)
+    assert "A" in picks[20:]  # Decayed evidence lets the recovered crew win traffic back
@@ -0,0 +1,194 @@
+"""
+Tests for WorkflowDAG compilation and DAG-parallel execution in WorkflowEngine.
+"""
+import pytest
+import asyncio
+import time
+
+from zerotoship.core.workflow_dag import compile_workflow_dag
+from zerotoship.core.workflow_engine import WorkflowEngine
+from zerotoship.core.learning_memory import LearningMemory
+from zerotoship.core.crew_router import CrewRouter
+from zerotoship.core.context_bus import ContextBus
+from zerotoship.core.distributed_executor import DistributedExecutor
+from zerotoship.core.project_meta_memory import ProjectMetaMemoryManager, ProjectMetaMemory
+
+SEQUENCE = [
+    {"state": "IDEA_VALIDATION", "crew": "ValidatorCrew"},
+    {"parallel": [
+        {"state": "MARKETING_PREPARATION", "crew": "MarketingCrew"},
+        {"state": "LAUNCH_PREPARATION", "crew": "LaunchCrew"},
+    ]},
+    {"state": "VALIDATION", "crew": "FeedbackCrew"},
+    {"state": "COMPLETED"},
+]
+
+
+class SleepyCrew:
+    def __init__(self, project_data: dict):
+        self.project_data = project_data
+
+    async def run(self, context):
+        await asyncio.sleep(0.2)
+        return {"status": "success", "message": "done", "data": {context["state"].lower(): {"ready": True}}}
+
+
+def test_compile_workflow_dag():
+    dag = compile_workflow_dag(SEQUENCE)
+
+    assert list(dag.nodes) == ["IDEA_VALIDATION", "MARKETING_PREPARATION", "LAUNCH_PREPARATION", "VALIDATION"]
+    assert dag.dependencies["MARKETING_PREPARATION"] == {"IDEA_VALIDATION"}
+    assert dag.dependencies["VALIDATION"] == {"MARKETING_PREPARATION", "LAUNCH_PREPARATION"}
+    assert dag.terminal_state == "COMPLETED"
+    assert dag.is_parallel()
+    assert dag.ready({"IDEA_VALIDATION"}, {"IDEA_VALIDATION"}) == ["MARKETING_PREPARATION", "LAUNCH_PREPARATION"]
+    assert not compile_workflow_dag([{"state": "TASK_EXECUTION"}]).is_parallel()
+
+
+@pytest.mark.asyncio
+async def test_workflow_engine_runs_parallel_states_concurrently(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project_data = {"id": "dag_project", "idea": "dag", "state": "IDEA_VALIDATION", "workflow_sequence": SEQUENCE}
+    context_bus = ContextBus()
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    crew_classes = {state: [SleepyCrew] for state in ["IDEA_VALIDATION", "MARKETING_PREPARATION", "LAUNCH_PREPARATION", "VALIDATION"]}
+    crew_router = CrewRouter(crew_classes, context_bus, meta_memory)
+    executor = DistributedExecutor(crew_router)
+    engine = WorkflowEngine(project_data, crew_router=crew_router, context_bus=context_bus,
+                            memory=LearningMemory(store_path=str(tmp_path / "store.json")),
+                            project_meta_memory=meta_memory, executor=executor)
+
+    await executor.start()
+    start = time.time()
+    result = await engine.run()
+    duration = time.time() - start
+    await executor.stop()
+
+    assert result["state"] == "COMPLETED"
+    assert result["marketing_preparation"] == {"ready": True}
+    assert result["launch_preparation"] == {"ready": True}
+    # Three dependency levels of 0.2s each; sequential execution would take 0.8s
+    assert duration < 0.75
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_execute_workflow_dispatches_the_dag(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from zerotoship.main import tractionbuildOrchestrator
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PROMETHEUS_PORT", "0")
+    async with tractionbuildOrchestrator() as orchestrator:
+        orchestrator.crew_router.crew_classes.update(
+            {state: [SleepyCrew] for state in ["IDEA_VALIDATION", "MARKETING_PREPARATION", "LAUNCH_PREPARATION", "VALIDATION"]})
+        project_data = {"id": "orchestrated", "idea": "dag", "workflow": "test", "state": "IDEA_VALIDATION",
+                        "workflow_sequence": SEQUENCE}
+        start = time.time()
+        result = await orchestrator.execute_workflow(project_data)
+        duration = time.time() - start
+
+    assert result["state"] == "COMPLETED"
+    assert result["launch_preparation"] == {"ready": True}
+    assert duration < 0.75  # MARKETING_PREPARATION and LAUNCH_PREPARATION ran side by side
+
+
+class ReviewCrew:
+    reviews = 0
+
+    def __init__(self, project_data: dict):
+        pass
+
+    async def run(self, context):
+        ReviewCrew.reviews += 1
+        return {"status": "success", "message": "reviewed", "data": {"feedback": {"approved": ReviewCrew.reviews >= 2}}}
+
+
+async def _run_engine(tmp_path, sequence, crew_classes):
+    context_bus = ContextBus()
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    crew_router = CrewRouter(crew_classes, context_bus, meta_memory)
+    executor = DistributedExecutor(crew_router)
+    engine = WorkflowEngine({"id": "loop_project", "idea": "loop", "state": sequence[0]["state"], "workflow_sequence": sequence},
+                            crew_router=crew_router, context_bus=context_bus,
+                            memory=LearningMemory(store_path=str(tmp_path / "store.json")),
+                            project_meta_memory=meta_memory, executor=executor)
+    await executor.start()
+    try:
+        return await engine.run()
+    finally:
+        await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_dag_runs_loop_iterations_and_fails_states_without_crews(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ReviewCrew.reviews = 0
+    loop = {"loop": {"state_prefix": "FEEDBACK_ITERATION", "max_iterations": 3,
+                     "break_conditions": [{"any": [{"field": "feedback.approved", "operator": "==", "value": True}]}],
+                     "sequence": [{"state": "FEEDBACK_REVIEW"}]}}
+    sequence = SEQUENCE[:2] + [loop, {"state": "COMPLETED"}]
+    crews = {state: [SleepyCrew] for state in ["IDEA_VALIDATION", "MARKETING_PREPARATION", "LAUNCH_PREPARATION"]}
+
+    result = await _run_engine(tmp_path, sequence, dict(crews, FEEDBACK_REVIEW=[ReviewCrew]))
+    assert result["state"] == "COMPLETED"
+    assert ReviewCrew.reviews == 2  # Stopped once feedback.approved held
+    assert result["feedback"] == {"approved": True}
+
+    result = await _run_engine(tmp_path, sequence, crews)
+    assert result["state"] == "FAILED"
+    assert "FEEDBACK_REVIEW" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_dag_reports_unfinished_states(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    context_bus = ContextBus()
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    crew_router = CrewRouter({"IDEA_VALIDATION": [SleepyCrew]}, context_bus, meta_memory)
+    engine = WorkflowEngine({"id": "limited", "state": "IDEA_VALIDATION"}, crew_router=crew_router,
+                            context_bus=context_bus, project_meta_memory=meta_memory)
+
+    assert await engine._run_dag(compile_workflow_dag(SEQUENCE), max_states=1) == 1
+    assert engine.project_data["state"] == "ERROR"
+    assert engine.project_data["message"] == (
+        "Workflow reached its limit of 1 states with unfinished states: MARKETING_PREPARATION, LAUNCH_PREPARATION, VALIDATION")
+
+
+@pytest.mark.asyncio
+async def test_feedback_history_publishes_new_versions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    context_bus = ContextBus()
+    meta_memory = ProjectMetaMemoryManager(ProjectMetaMemory(memory_file_path=str(tmp_path / "memory.json")))
+    crew_router = CrewRouter({"IDEA_VALIDATION": [ReviewCrew]}, context_bus, meta_memory)
+    engine = WorkflowEngine({"id": "history", "state": "IDEA_VALIDATION"}, crew_router=crew_router,
+                            context_bus=context_bus, project_meta_memory=meta_memory)
+
+    await engine._execute_crew_with_feedback("IDEA_VALIDATION")
+    before = await context_bus.snapshot()
+    with context_bus.subscribe(keys=["IDEA_VALIDATION_feedback_history"]) as sub:
+        await engine._execute_crew_with_feedback("IDEA_VALIDATION")
+        delta = await asyncio.wait_for(sub.__anext__(), timeout=1)
+
+    assert len(delta.value) == 2
+    assert len(before["IDEA_VALIDATION_feedback_history"]) == 1  # Earlier snapshots are untouched
+
+
+@pytest.mark.asyncio
+async def test_dag_applies_step_conditions_timeouts_and_retries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    marketing = {"state": "MARKETING_PREPARATION", "conditions": [
+        {"field": "idea_validation.ready", "operator": "==", "value": False}]}
+    launch = {"state": "LAUNCH_PREPARATION", "timeout": 0.05, "retry_attempts": 1}
+    sequence = [SEQUENCE[0], {"parallel": [marketing, launch]}, *SEQUENCE[2:]]
+    crews = {state: [SleepyCrew] for state in ["IDEA_VALIDATION", "MARKETING_PREPARATION", "LAUNCH_PREPARATION", "VALIDATION"]}
+
+    start = time.time()
+    result = await _run_engine(tmp_path, sequence, crews)
+    assert result["state"] == "FAILED" and "timed out after 0.05s" in result["message"]
+    assert time.time() - start < 0.6  # One 0.05s attempt, not three full runs with backoff
+    assert "marketing_preparation" not in result  # Its condition never held
+
+    launch.pop("timeout")
+    result = await _run_engine(tmp_path, sequence, crews)
+    assert result["state"] == "COMPLETED" and result["launch_preparation"] == {"ready": True}
+    assert "marketing_preparation" not in result and result["validation"] == {"ready": True}